@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+# Output column -> number of trading bars to look back
+RETURN_PERIODS = {
+    "Day %": 1,
+    "Week %": 5,
+    "Month %": 21,
+}
+HIGH_LOW_DAYS = 365  # calendar window for the 52W high/low
+
+
+def _compact(values, mask):
+    """Move each column's valid rows to the bottom, keeping their order.
+
+    Lets every symbol be indexed by "n-th last trading bar" even when symbols
+    trade on different calendars (NSE vs US indices vs crypto).
+    """
+    order = np.argsort(mask, axis=0, kind="stable")
+    return np.take_along_axis(values, order, axis=0)
+
+
+def _bars_back(compact, counts, bars):
+    """Value `bars` trading bars before each column's last one (clamped to its first bar)"""
+    n = compact.shape[0]
+    rows = np.clip(np.maximum(n - counts, n - 1 - bars), 0, n - 1)
+    return compact[rows, np.arange(compact.shape[1])]
+
+
+def compute_metrics(closes, highs=None, lows=None, opens=None, periods=RETURN_PERIODS):
+    """All per-symbol figures from wide (dates x symbols) price matrices in one vectorized pass.
+
+    Returns a DataFrame indexed by symbol with Price, Prev Close, one column per
+    entry in `periods`, and when the matching matrices are given: Intraday % (vs
+    the last bar's open), Day Low/Day High and 52W High/52W Low.
+    """
+    closes = closes.sort_index()
+    symbols = closes.columns
+    values = closes.to_numpy(dtype=float)
+    if values.size == 0:
+        return pd.DataFrame(index=symbols, columns=["Price", "Prev Close", *periods], dtype=float)
+
+    mask = ~np.isnan(values)
+    counts = mask.sum(axis=0)
+    compact = _compact(values, mask)
+
+    last = compact[-1]
+    metrics = {
+        "Price": last,
+        "Prev Close": _bars_back(compact, counts, 1),
+    }
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for column, bars in periods.items():
+            base = _bars_back(compact, counts, bars)
+            metrics[column] = (last - base) / base * 100
+
+        if opens is not None:
+            last_open = _compact(opens.reindex_like(closes).to_numpy(dtype=float), mask)[-1]
+            metrics["Intraday %"] = (last - last_open) / last_open * 100
+
+    if highs is not None and lows is not None:
+        high_values = highs.reindex_like(closes).to_numpy(dtype=float)
+        low_values = lows.reindex_like(closes).to_numpy(dtype=float)
+        metrics["Day Low"] = _compact(low_values, mask)[-1]
+        metrics["Day High"] = _compact(high_values, mask)[-1]
+
+        in_window = np.asarray(closes.index >= closes.index[-1] - pd.Timedelta(days=HIGH_LOW_DAYS))
+        with np.errstate(invalid="ignore"):
+            metrics["52W High"] = _nan_reduce(np.fmax, high_values[in_window])
+            metrics["52W Low"] = _nan_reduce(np.fmin, low_values[in_window])
+
+    result = pd.DataFrame(metrics, index=symbols)
+    result.loc[counts == 0] = np.nan
+    return result
+
+
+def _nan_reduce(ufunc, values):
+    """Column-wise max/min ignoring NaN, NaN for all-NaN columns (no RuntimeWarning)"""
+    if len(values) == 0:
+        return np.full(values.shape[1], np.nan)
+    return ufunc.reduce(values, axis=0)
+
+
+def compute_frame_metrics(frame, periods=RETURN_PERIODS):
+    """compute_metrics for a wide (field, symbol) OHLCV frame from market_data"""
+    if frame is None or frame.empty:
+        return compute_metrics(pd.DataFrame(dtype=float), periods=periods)
+    fields = frame.columns.get_level_values(0)
+    return compute_metrics(
+        frame["Close"],
+        highs=frame["High"] if "High" in fields else None,
+        lows=frame["Low"] if "Low" in fields else None,
+        opens=frame["Open"] if "Open" in fields else None,
+        periods=periods,
+    )
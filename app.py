@@ -1,32 +1,21 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-from supabase_helper import add_to_watchlist, get_watchlist, remove_from_watchlist
+from supabase_helper import add_to_watchlist, get_watchlist, remove_from_watchlist, get_all_watchlist_symbols
 from streamlit_autorefresh import st_autorefresh
+from market_data import fetch_history, compute_watchlist_metrics, summarize_symbols
+from market_calendar import get_calendar
+from formatting import styled_table
+from quote_snapshot import QuoteSnapshot
+from quote_summary import get_quote_summaries
+from reference_store import get_reference_store
+from refresh_scheduler import get_scheduler
+from nse_lists import REFRESH_SECONDS
+from symbol_master import get_symbol_index
+from universe import get_market_quotes, get_universe, refresh_nse_lists
+from instrumentation import set_page
 
-# Predefined list of popular NSE stocks for autocomplete
-POPULAR_NSE_STOCKS = {
-    "RELIANCE.NS": "Reliance Industries",
-    "TCS.NS": "Tata Consultancy Services",
-    "HDFCBANK.NS": "HDFC Bank",
-    "INFY.NS": "Infosys",
-    "ICICIBANK.NS": "ICICI Bank",
-    "ITC.NS": "ITC Limited",
-    "SBIN.NS": "State Bank of India",
-    "BHARTIARTL.NS": "Bharti Airtel",
-    "LT.NS": "Larsen & Toubro",
-    "KOTAKBANK.NS": "Kotak Mahindra Bank",
-    "HCLTECH.NS": "HCL Technologies",
-    "ASIANPAINT.NS": "Asian Paints",
-    "MARUTI.NS": "Maruti Suzuki",
-    "TITAN.NS": "Titan Company",
-    "BAJFINANCE.NS": "Bajaj Finance",
-    "ONGC.NS": "Oil & Natural Gas Corporation",
-    "NTPC.NS": "NTPC Limited",
-    "POWERGRID.NS": "Power Grid Corporation",
-    "ULTRACEMCO.NS": "UltraTech Cement",
-    "WIPRO.NS": "Wipro Limited"
-}
+# Search results shown after pressing the search button
+SEARCH_LIMIT = 30
 
 # Initialize session states
 if 'search_results' not in st.session_state:
@@ -36,33 +25,41 @@ if 'selected_stock' not in st.session_state:
 if 'watchlist' not in st.session_state:
     st.session_state.watchlist = []
 
-def color_percent(val):
-    try:
-        val_float = float(val.strip('%+'))
-        color = 'green' if val_float >= 0 else 'red'
-        return f'color: {color}'
-    except:
-        return ''
+def get_company_name(symbol):
+    """Company name from the symbol master or the reference store (never from upstream)"""
+    name = get_symbol_index().name(symbol)
+    if name is None:
+        name = get_reference_store().get(symbol, {}).get('longName')
+    return name or symbol
+
+def refresh_reference_data():
+    """Re-fetch stale static fields for every watchlist symbol (runs on the background refresh scheduler)"""
+    return get_reference_store().refresh(get_all_watchlist_symbols())
+
+def build_watchlist_metrics():
+    """Snapshot of the watchlist columns for the union of all users' watchlists (runs on the background refresh scheduler)"""
+    return QuoteSnapshot.from_frame(compute_watchlist_metrics(fetch_history(get_all_watchlist_symbols(), period="1y")))
 
 def get_autocomplete_suggestions(search_term):
-    """Get autocomplete suggestions from predefined list"""
-    if not search_term or len(search_term) < 2:
-        return {}
-    
-    search_term_lower = search_term.lower()
-    return {k: v for k, v in POPULAR_NSE_STOCKS.items() 
-            if search_term_lower in v.lower() or search_term_lower in k.lower()}
+    """Get autocomplete suggestions from the local symbol master"""
+    return get_symbol_index().search(search_term)
 
 def search_nse_stocks(search_term):
-    """Search for NSE stocks using Yahoo Finance with autocomplete"""
-    suggestions = get_autocomplete_suggestions(search_term)
+    """Search the symbol master, asking Yahoo Finance only for symbols it doesn't know"""
+    suggestions = get_symbol_index().search(search_term, limit=SEARCH_LIMIT)
+    if suggestions:
+        return suggestions
     
-    # Also try direct Yahoo Finance search
+    # Fall back to a direct Yahoo Finance lookup (e.g. a listing newer than the symbol master)
     try:
-        ticker = yf.Ticker(f"{search_term.upper()}.NS")
-        info = ticker.info
-        if 'symbol' in info and info['symbol'].endswith('.NS'):
-            suggestions[info['symbol']] = info.get('longName', info['symbol'])
+        symbol = f"{search_term.strip().upper()}.NS"
+        store = get_reference_store()
+        if store.stale([symbol]):
+            fields = dict(store.iter_refresh([symbol])).get(symbol)
+        else:
+            fields = store.get(symbol)
+        if fields:
+            suggestions[symbol] = fields['longName']
     except:
         pass
     
@@ -116,19 +113,28 @@ def stock_search_component():
         st.markdown("---")
         st.markdown("### Search Results")
         
+        # One bulk price request for every result; sectors come from the profile cache
+        try:
+            summaries = get_quote_summaries().summaries(st.session_state.search_results)
+        except Exception:
+            summaries = {}
+            st.warning("Couldn't fetch price data")
+        pending = {}  # symbol -> placeholder for a sector not cached yet
+
         for symbol, name in st.session_state.search_results.items():
+            summary = summaries.get(symbol, {})
             col1, col2 = st.columns([4, 1])
             with col1:
                 st.markdown(f"**{name}**")
                 st.markdown(f"*{symbol}*")
                 
-                try:
-                    stock = yf.Ticker(symbol)
-                    info = stock.info
-                    st.write(f"**Current Price:** ₹{info.get('currentPrice', 'N/A')}")
-                    st.write(f"**Sector:** {info.get('sector', 'N/A')}")
-                except:
-                    st.warning("Couldn't fetch price data")
+                price = summary.get("price")
+                st.write(f"**Current Price:** ₹{price:,.2f}" if price is not None else "**Current Price:** N/A")
+                if summary.get("sector"):
+                    st.write(f"**Sector:** {summary['sector']}")
+                else:
+                    pending[symbol] = st.empty()
+                    pending[symbol].write("**Sector:** …")
             
             with col2:
                 if symbol in st.session_state.watchlist:
@@ -143,11 +149,16 @@ def stock_search_component():
                         st.session_state.watchlist = get_watchlist(st.session_state.user)
                         st.success(f"Added {name} to watchlist!")
                         st.rerun()
+        
+        # Fill in the missing sectors as their profiles arrive, after every row is on screen
+        for symbol, profile in get_quote_summaries().iter_profiles(pending):
+            pending[symbol].write(f"**Sector:** {profile.get('sector') or 'N/A'}")
     
     return None
 
 # --- Main App ---
 st.set_page_config(page_title="NSE Stock Watchlist", layout="wide")
+set_page("watchlist")
 st_autorefresh(interval=600000, key="datarefresh")
 
 # --- Top bar layout ---
@@ -179,39 +190,48 @@ with top_col3:
 # --- Market Snapshot Section ---
 st.subheader("🌐 Global & Commodity Market Snapshot")
 
-index_symbols = {
-    "NIFTY 50": "^NSEI",
-    "SENSEX": "^BSESN",
-    "NASDAQ": "^IXIC",
-    "DOW JONES": "^DJI",
-    "GOLD": "GC=F",
-    "SILVER": "SI=F",
-    "CRUDE OIL": "CL=F"
-}
-
-index_data = []
-for name, symbol in index_symbols.items():
-    try:
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period="1mo")
-        current = hist["Close"][-1]
-        previous = hist["Close"][-2]
-        day_change = ((current - previous) / previous) * 100
-        week_change = ((hist["Close"][-1] - hist["Close"][-5]) / hist["Close"][-5]) * 100 if len(hist) >= 5 else 0
-        month_change = ((hist["Close"][-1] - hist["Close"][0]) / hist["Close"][0]) * 100 if len(hist) > 0 else 0
+def build_index_data(quotes):
+    """Index/commodity snapshot rows, projected from the shared market snapshot"""
+    instruments = get_universe().tagged("snapshot")
+    metrics = quotes.select(i.symbol for i in instruments).frame(index=True)
+    
+    index_data, failed = [], {}
+    for instrument in instruments:
+        symbol, name = instrument.symbol, instrument.name
+        if symbol not in metrics.index or pd.isna(metrics.loc[symbol, "Price"]):
+            failed[name] = "no price data"
+            continue
+        row = metrics.loc[symbol]
         index_data.append({
             "Index": name,
-            "Current Price": f"{current:.2f}",
-            "Day Change (%)": f"{day_change:+.2f}%",
-            "1-Week Change (%)": f"{week_change:+.2f}%",
-            "1-Month Change (%)": f"{month_change:+.2f}%"
+            "Current Price": row['Price'],
+            "Day Change (%)": row['Day %'],
+            "1-Week Change (%)": row['Week %'],
+            "1-Month Change (%)": row['Month %']
         })
-    except Exception as e:
-        st.warning(f"Could not load {name}: {e}")
+    return {'rows': index_data, 'errors': failed}
+
+# Static company fields are refreshed in the background, never on a page's critical path
+get_scheduler().register("reference_data", refresh_reference_data)
+get_scheduler().register("nse_lists", refresh_nse_lists, lambda: REFRESH_SECONDS)
+market_snapshot = get_market_quotes()
+if market_snapshot.value is None:
+    st.warning(f"Could not load market data: {market_snapshot.error}")
+    index_snapshot = {'rows': [], 'errors': {}}
+else:
+    index_snapshot = build_index_data(market_snapshot.value)
+for name, error in index_snapshot['errors'].items():
+    st.warning(f"Could not load {name}: {error}")
+index_data = index_snapshot['rows']
 
-st.dataframe(pd.DataFrame(index_data).style.applymap(color_percent, subset=[
-    "Day Change (%)", "1-Week Change (%)", "1-Month Change (%)"
-]), use_container_width=True)
+index_changes = ["Day Change (%)", "1-Week Change (%)", "1-Month Change (%)"]
+st.dataframe(styled_table(
+    pd.DataFrame(index_data, columns=["Index", "Current Price", *index_changes]),
+    {"Current Price": "{:.2f}", **{column: "{:+.2f}%" for column in index_changes}},
+    index_changes,
+    positive='color: green',
+    negative='color: red'
+), use_container_width=True)
 
 # --- Search Stocks Section ---
 stock_search_component()
@@ -265,72 +285,58 @@ else:
     </style>
     """, unsafe_allow_html=True)
 
-    # Prepare data for the table
+    # Prepare data for the table: only this user's rows of the shared snapshot of every watchlist
     watchlist_data = []
-    for symbol in st.session_state.watchlist:
+    quotes = get_scheduler().ensure("watchlists", build_watchlist_metrics).value
+    if quotes is None:
+        metrics = compute_watchlist_metrics(None)
+    else:
+        metrics = quotes.select(st.session_state.watchlist).frame(index=True)
+    if get_calendar().is_open() and st.session_state.watchlist:
+        # Live prices from the intraday bar engine, Day % against the previous close
         try:
-            stock = yf.Ticker(symbol)
-            info = stock.info
-            company_name = info.get('longName', symbol)
-            
-            # Get price data
-            hist_1d = stock.history(period="1d")
-            hist_1wk = stock.history(period="7d")
-            hist_1y = stock.history(period="1y")
-
-            if not hist_1d.empty:
-                current_price = hist_1d["Close"][-1]
-                previous_close = hist_1d["Open"][0] if len(hist_1d) > 0 else current_price
-                day_change = ((current_price - previous_close) / previous_close) * 100
-            else:
-                current_price = info.get('currentPrice', 0)
-                day_change = 0
-
-            if not hist_1wk.empty:
-                week_change = ((hist_1wk["Close"][-1] - hist_1wk["Close"][0]) / hist_1wk["Close"][0]) * 100
-            else:
-                week_change = 0
-
-            if not hist_1y.empty:
-                month_change = ((hist_1y["Close"][-1] - hist_1y["Close"][0]) / hist_1y["Close"][0]) * 100
-                high_52 = hist_1y["High"].max()
-                low_52 = hist_1y["Low"].min()
-            else:
-                month_change = 0
-                high_52 = info.get('fiftyTwoWeekHigh', 0)
-                low_52 = info.get('fiftyTwoWeekLow', 0)
-
-            watchlist_data.append({
-                "Company": company_name,
-                "Price (₹)": current_price,
-                "Day %": day_change,
-                "Week %": week_change,
-                "Month %": month_change,
-                "52W High": high_52,
-                "52W Low": low_52
-            })
+            live = summarize_symbols(st.session_state.watchlist, market_open=True)
+            metrics = pd.concat([live[metrics.columns], metrics.drop(live.index, errors="ignore")])
+        except Exception as e:
+            st.error(f"Error fetching live watchlist prices: {str(e)}")
+    missing = [symbol for symbol in st.session_state.watchlist if symbol not in metrics.index]
+    if missing:
+        # Symbols added since the last refresh: one bulk 1y download
+        try:
+            metrics = pd.concat([metrics, compute_watchlist_metrics(fetch_history(missing, period="1y"))])
         except Exception as e:
-            st.error(f"Error fetching {symbol}: {str(e)}")
+            st.error(f"Error fetching watchlist prices: {str(e)}")
+
+    for symbol in st.session_state.watchlist:
+        if symbol not in metrics.index:
+            st.error(f"Error fetching {symbol}: no price data")
+            continue
+        row = metrics.loc[symbol]
+        watchlist_data.append({
+            "Company": get_company_name(symbol),
+            "Price (₹)": row["Price"],
+            "Day %": row["Day %"],
+            "Week %": row["Week %"],
+            "Month %": row["Month %"],
+            "52W High": row["52W High"],
+            "52W Low": row["52W Low"]
+        })
 
     if watchlist_data:
         # Create DataFrame
         df = pd.DataFrame(watchlist_data)
         
         # Style the DataFrame
-        def style_change(val):
-            if isinstance(val, (int, float)):
-                color = 'green' if val >= 0 else 'red'
-                return f'color: {color}; font-weight: bold'
-            return ''
-        
-        styled_df = df.style.format({
+        styled_df = styled_table(df, {
             "Price (₹)": "₹{:,.2f}",
             "Day %": "{:+.2f}%",
             "Week %": "{:+.2f}%",
             "Month %": "{:+.2f}%",
             "52W High": "₹{:,.2f}",
             "52W Low": "₹{:,.2f}"
-        }).applymap(style_change, subset=["Day %", "Week %", "Month %"])
+        }, ["Day %", "Week %", "Month %"],
+            positive='color: green; font-weight: bold',
+            negative='color: red; font-weight: bold')
         
         # Display the styled DataFrame
         st.dataframe(
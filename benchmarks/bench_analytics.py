@@ -0,0 +1,60 @@
+"""Per-row scalar change math (the old page loops) vs analytics.compute_metrics.
+
+Run from the repo root:  python -m benchmarks.bench_analytics
+"""
+import time
+
+import pandas as pd
+
+from analytics import compute_metrics
+from benchmarks.fixtures import synthetic_history
+
+SIZES = [50, 500, 2000]
+
+
+def legacy_loop(frames):
+    """The per-symbol pattern previously repeated across app.py and the pages"""
+    rows = []
+    for symbol, hist in frames.items():
+        current = hist["Close"].iloc[-1]
+        previous = hist["Close"].iloc[-2]
+        day_change = ((current - previous) / previous) * 100
+        week_change = ((current - hist["Close"].iloc[-6]) / hist["Close"].iloc[-6]) * 100
+        month_change = ((current - hist["Close"].iloc[-22]) / hist["Close"].iloc[-22]) * 100
+        rows.append({
+            "Symbol": symbol,
+            "Price": current,
+            "Day %": day_change,
+            "Week %": week_change,
+            "Month %": month_change,
+            "52W High": hist["High"].max(),
+            "52W Low": hist["Low"].min(),
+            "Day Range": f"{hist['Low'].iloc[-1]:.2f} - {hist['High'].iloc[-1]:.2f}",
+        })
+    return pd.DataFrame(rows)
+
+
+def best_of(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    for size in SIZES:
+        frames = {f"SYM{i}": synthetic_history(i) for i in range(size)}
+        closes = pd.DataFrame({symbol: hist["Close"] for symbol, hist in frames.items()})
+        highs = pd.DataFrame({symbol: hist["High"] for symbol, hist in frames.items()})
+        lows = pd.DataFrame({symbol: hist["Low"] for symbol, hist in frames.items()})
+
+        legacy = best_of(lambda: legacy_loop(frames))
+        vectorized = best_of(lambda: compute_metrics(closes, highs=highs, lows=lows))
+        print(f"{size:5d} symbols  loop {legacy * 1000:8.1f} ms  vectorized {vectorized * 1000:6.1f} ms  "
+              f"speedup {legacy / vectorized:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
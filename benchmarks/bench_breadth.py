@@ -0,0 +1,66 @@
+"""Market breadth refresh time vs universe size (Nifty 50/100/200/500-sized).
+
+Each universe is loaded the way the gainers page does it: concurrent bulk
+chunks through the cached, stored data source stack, then compute_breadth.
+Only the Nifty 50 list is bundled, so the universes are synthetic symbols of
+each index's size spread over SECTORS sectors. Every upstream request costs
+LATENCY seconds. Reports cold (empty caches) and warm (cached) refresh times
+and upstream calls, next to the legacy loader's five serial per-symbol requests.
+
+Run from the repo root:  python -m benchmarks.bench_breadth
+"""
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+import fetch_pool
+from benchmarks.fixtures import CountingDataSource, SyntheticDataSource
+from history_store import HistoryStore
+from market_cache import MarketDataCache
+from market_breadth import breadth_chunk_size, compute_breadth
+from market_data import CachedDataSource, StoredDataSource, get_data_source, iter_summaries, set_data_source
+
+UNIVERSES = {"Nifty 50": 50, "Nifty 100": 100, "Nifty 200": 200, "Nifty 500": 500}
+SECTORS = 20
+LATENCY = 0.2  # seconds per upstream request
+LEGACY_CALLS_PER_SYMBOL = 5
+
+
+def refresh(sectors):
+    symbols = list(sectors)
+    frames = [summaries for _, summaries, error in iter_summaries(symbols, chunk_size=breadth_chunk_size(len(symbols)))
+              if error is None and not summaries.empty]
+    return compute_breadth(pd.concat(frames), sectors)
+
+
+def timed(sectors):
+    start = time.perf_counter()
+    breadth = refresh(sectors)
+    return time.perf_counter() - start, breadth
+
+
+def main():
+    previous = get_data_source()
+    # Measure the pipeline, not the Yahoo politeness limit
+    fetch_pool.HOST_RATE_LIMITS = {}
+    print(f"{'universe':10} {'stocks':>6} {'cold s':>7} {'warm ms':>8} {'calls':>6} {'legacy s':>9} {'sectors':>8}")
+    try:
+        for label, size in UNIVERSES.items():
+            sectors = {f"SYM{i}.NS": f"Sector {i % SECTORS}" for i in range(size)}
+            source = CountingDataSource(SyntheticDataSource(), latency=LATENCY)
+            store = HistoryStore(os.path.join(tempfile.mkdtemp(), "history"))
+            set_data_source(CachedDataSource(StoredDataSource(source, store), MarketDataCache()))
+            cold, breadth = timed(sectors)
+            warm, _ = timed(sectors)
+            stocks = breadth["totals"]["Stocks"]
+            legacy = stocks * LEGACY_CALLS_PER_SYMBOL * LATENCY
+            print(f"{label:10} {stocks:6d} {cold:7.2f} {warm * 1000:8.0f} {source.total:6d} "
+                  f"{legacy:9.0f} {len(breadth['sectors']):8d}")
+    finally:
+        set_data_source(previous)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Cold vs warm time to build the 25-ETF returns table from the on-disk history store.
+
+Run from the repo root:  python -m benchmarks.bench_etf_returns
+"""
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.fixtures import CountingDataSource, synthetic_history
+from history_store import HistoryStore
+from market_cache import MarketDataCache
+from market_data import CachedDataSource, FixtureDataSource, StoredDataSource, get_data_source, set_data_source
+from returns_table import ReturnsTable
+
+SYMBOLS = [f"ETF{i}.NS" for i in range(25)]
+DAYS = 15 * 252  # ~15 years of daily bars per ETF
+
+
+def main():
+    today = pd.Timestamp.today().normalize()
+    upstream = CountingDataSource(FixtureDataSource(
+        {symbol: synthetic_history(i, DAYS, end=today) for i, symbol in enumerate(SYMBOLS)}
+    ))
+    store = HistoryStore(tempfile.mkdtemp())
+    previous = get_data_source()
+    set_data_source(CachedDataSource(StoredDataSource(upstream, store), MarketDataCache()))
+    try:
+        table = ReturnsTable(store)
+        for label in ("cold", "warm", "warm"):
+            start = time.perf_counter()
+            df = table.performance(SYMBOLS)
+            elapsed = time.perf_counter() - start
+            print(f"{label}: {elapsed * 1000:7.1f} ms  rows={len(df)}  upstream calls so far={upstream.total}")
+
+        # Simulate a process restart: new table, empty memory cache, same disk store
+        set_data_source(CachedDataSource(StoredDataSource(upstream, HistoryStore(store.directory)), MarketDataCache()))
+        start = time.perf_counter()
+        ReturnsTable(HistoryStore(store.directory)).performance(SYMBOLS)
+        print(f"restart: {(time.perf_counter() - start) * 1000:5.1f} ms  upstream calls so far={upstream.total}")
+    finally:
+        set_data_source(previous)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Wall-clock time for 37 symbols (the global markets page) fetched serially vs through fetch_all.
+
+Run from the repo root:  python -m benchmarks.bench_fetch_pool
+"""
+import time
+
+from benchmarks.fixtures import CountingDataSource, synthetic_source
+from fetch_pool import fetch_all
+
+SYMBOLS = [f"SYM{i}" for i in range(37)]
+LATENCY = 0.05  # simulated upstream round trip, seconds
+
+
+def main():
+    source = CountingDataSource(synthetic_source(SYMBOLS), latency=LATENCY)
+
+    start = time.perf_counter()
+    for symbol in SYMBOLS:
+        source.history(symbol, period="1d")
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results, errors = fetch_all(lambda symbol: source.history(symbol, period="1d"), SYMBOLS, host=None)
+    pooled = time.perf_counter() - start
+
+    print(f"{len(SYMBOLS)} symbols @ {LATENCY * 1000:.0f} ms: serial {serial:.2f}s  "
+          f"pooled {pooled:.2f}s  ({len(results)} ok, {len(errors)} errors)")
+
+
+if __name__ == "__main__":
+    main()
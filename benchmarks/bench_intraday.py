@@ -0,0 +1,67 @@
+"""Intraday bar engine: tick ingest cost and live-quote reads vs re-pulling the day's 5m bars.
+
+Replays a synthetic session (one print every 10 s for 50 symbols) from a CSV
+through ReplayFeed.
+
+Run from the repo root:  python -m benchmarks.bench_intraday
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fixtures import CountingDataSource, synthetic_source
+from intraday import BarEngine, ReplayFeed
+
+SYMBOLS = [f"SYM{i}.NS" for i in range(50)]
+SESSION_SECONDS = 375 * 60
+PRINT_EVERY = 10  # seconds
+REFRESHES = 20
+
+
+def write_replay(path):
+    open_at = pd.Timestamp("2025-06-30 09:15", tz="Asia/Kolkata").timestamp()
+    stamps = open_at + np.arange(0, SESSION_SECONDS, PRINT_EVERY)
+    rng = np.random.default_rng(0)
+    frames = []
+    for i, symbol in enumerate(SYMBOLS):
+        frames.append(pd.DataFrame({
+            "timestamp": stamps,
+            "symbol": symbol,
+            "price": 100 + i + rng.standard_normal(len(stamps)).cumsum() * 0.05,
+            "volume": rng.integers(1, 500, len(stamps)),
+        }))
+    pd.concat(frames).sort_values("timestamp", kind="stable").to_csv(path, index=False)
+    return len(stamps) * len(SYMBOLS)
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "replay.csv")
+    prints = write_replay(path)
+
+    engine = BarEngine(ReplayFeed(path, speed=None))
+    start = time.perf_counter()
+    engine.pump(SYMBOLS)
+    ingest = time.perf_counter() - start
+    print(f"ingest: {prints:,} prints in {ingest * 1000:.0f} ms ({ingest / prints * 1e6:.2f} us/print)")
+
+    start = time.perf_counter()
+    for _ in range(REFRESHES):
+        engine.quotes(SYMBOLS)
+    engine_read = (time.perf_counter() - start) / REFRESHES
+    print(f"engine refresh: {engine_read * 1000:6.2f} ms for {len(SYMBOLS)} quotes, 0 upstream calls")
+
+    # The old live path: every refresh re-pulls each symbol's 5m bars for the day
+    legacy = CountingDataSource(synthetic_source(SYMBOLS, days=75))
+    start = time.perf_counter()
+    for _ in range(REFRESHES):
+        for symbol in SYMBOLS:
+            float(legacy.history(symbol, period="1d", interval="5m")["Close"].iloc[-1])
+    legacy_read = (time.perf_counter() - start) / REFRESHES
+    print(f"legacy refresh: {legacy_read * 1000:6.2f} ms, {legacy.total // REFRESHES} upstream calls")
+
+
+if __name__ == "__main__":
+    main()
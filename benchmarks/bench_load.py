@@ -0,0 +1,189 @@
+"""Load test: N concurrent sessions per page script through Streamlit's AppTest.
+
+yfinance is replaced by a replay of recorded responses (see
+benchmarks/record_fixtures.py), or by synthetic series if no recording has been
+made, and Supabase by an in-memory fake (see benchmarks/fixtures.py). Each session does a first run (plus login on app.py)
+and then one rerun per autorefresh tick. Reports p50/p95 rerun latency,
+upstream calls per session and peak RSS for every script. Scripts run one
+after another in the same process, sharing caches the way a server does.
+
+Run from the repo root:  python -m benchmarks.bench_load [--sessions 8] [--ticks 3] [script ...]
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Keep the on-disk stores away from the real ones; must happen before the app modules load
+_STORE = tempfile.mkdtemp(prefix="nse-load-")
+os.environ["NSE_HISTORY_DIR"] = os.path.join(_STORE, "history")
+os.environ["NSE_FUNDAMENTALS_DIR"] = os.path.join(_STORE, "fundamentals")
+os.environ["NSE_REFERENCE_DB"] = os.path.join(_STORE, "reference.sqlite3")
+os.environ["NSE_ARCHIVES_URL"] = ""  # no symbol list downloads
+
+import numpy as np
+import yfinance as yf
+from streamlit.logger import set_log_level
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest, app_test, local_script_runner
+
+import fetch_pool
+import supabase_helper
+from benchmarks.fixtures import (
+    CountingDataSource, FakeSupabaseClient, FixtureTicker, RecordedTicker, Recording, SyntheticDataSource,
+)
+from intraday import BarPollFeed
+from market_data import CachedDataSource, StoredDataSource, YahooDataSource, set_data_source, set_quote_feed
+
+SCRIPTS = [
+    "app.py",
+    "pages/nifty_gainers.py",
+    "pages/etf_performance.py",
+    "pages/global_markets.py",
+    "pages/stock_detail_page.py",
+    "pages/diagnostics.py",
+]
+SESSIONS = 8
+TICKS = 3  # autorefresh reruns per session after the first run
+TIMEOUT = 120  # seconds per script run
+WATCHLIST = ["RELIANCE.NS", "TCS.NS", "INFY.NS", "HDFCBANK.NS", "ITC.NS"]
+
+
+class Upstream:
+    """Fixture providers wired into the app, with one call counter over all of them"""
+
+    def __init__(self):
+        self.recording = Recording.load()
+        if self.recording is not None:
+            # The real Yahoo data source, parsing replayed yfinance responses
+            self.source = CountingDataSource(YahooDataSource())
+            self.ticker = RecordedTicker
+            RecordedTicker.recording = self.recording
+        else:
+            self.source = CountingDataSource(SyntheticDataSource())
+            self.ticker = FixtureTicker
+            FixtureTicker.source = self.source.inner
+        self.ticker.calls = Counter()
+        self.supabase = FakeSupabaseClient()
+
+    def install(self, users):
+        set_data_source(CachedDataSource(StoredDataSource(self.source)))
+        set_quote_feed(BarPollFeed(self.source))
+        yf.Ticker = self.ticker
+        if self.recording is not None:
+            yf.download = self.recording.download
+        table = self.supabase.table("watchlists").table
+        table.rows = [{"user_id": user, "symbol": symbol} for user in users for symbol in WATCHLIST]
+        supabase_helper.supabase = self.supabase
+        supabase_helper.watchlists = supabase_helper.WatchlistCache(self.supabase)
+
+    def total(self):
+        statements = sum(sum(t.statements.values()) for t in self.supabase.tables.values())
+        return self.source.total + sum(self.ticker.calls.values()) + statements
+
+
+class _PerRunRuntime:
+    """Absorbs AppTest's per-run `Runtime._instance` set/reset so it cannot clobber other sessions"""
+    _instance = None
+
+
+def share_runtime():
+    """Let AppTest sessions run concurrently, sharing one runtime and script cache like a server.
+
+    AppTest installs a mock Runtime singleton at the start of each run and clears
+    it at the end, and compiles the script with a fresh ScriptCache each time;
+    run from several threads, the first breaks runs still in flight and the
+    second trips CPython's non-thread-safe AST constructor.
+    """
+    runtime = app_test.MagicMock(spec=Runtime)
+    runtime.media_file_mgr = app_test.MediaFileManager(app_test.MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = app_test.DataframeSourceManager()
+    runtime.cache_storage_manager = app_test.MemoryCacheStorageManager()
+    runtime.bidi_component_registry = app_test.BidiComponentManager()
+    Runtime._instance = runtime
+    app_test.Runtime = _PerRunRuntime
+    script_cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_session(script, user, ticks):
+    """Latencies of every run of one session, and the exceptions it raised"""
+    at = AppTest.from_file(os.path.join(ROOT, script), default_timeout=TIMEOUT)
+    latencies, errors = [], []
+
+    def timed(step):
+        start = time.perf_counter()
+        step()
+        latencies.append(time.perf_counter() - start)
+        errors.extend(e.value for e in at.exception)
+
+    timed(at.run)
+    if script == "app.py":
+        at.text_input(key="login_input").input(user)
+        timed(at.button(key="login_btn").click().run)
+    for _ in range(ticks):
+        timed(at.run)
+    return latencies, errors
+
+
+def load_script(script, upstream, sessions, ticks):
+    calls_before = upstream.total()
+    users = [f"load-user-{i}" for i in range(sessions)]
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        results = list(pool.map(lambda user: run_session(script, user, ticks), users))
+    latencies = np.array([t for session, _ in results for t in session]) * 1000
+    errors = [e for _, session_errors in results for e in session_errors]
+    return {
+        "runs": len(latencies),
+        "p50": float(np.percentile(latencies, 50)),
+        "p95": float(np.percentile(latencies, 95)),
+        "calls": (upstream.total() - calls_before) / sessions,
+        "rss": peak_rss_mb(),
+        "errors": errors,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=SESSIONS)
+    parser.add_argument("--ticks", type=int, default=TICKS)
+    parser.add_argument("scripts", nargs="*", default=SCRIPTS)
+    args = parser.parse_args(argv)
+
+    # Measure the app, not the Yahoo politeness limit
+    fetch_pool.HOST_RATE_LIMITS = {}
+    os.chdir(ROOT)  # pages open logo.jpg relative to the working directory
+    share_runtime()
+    upstream = Upstream()
+    upstream.install([f"load-user-{i}" for i in range(args.sessions)])
+
+    set_log_level("error")  # deprecation chatter from every rerun
+    if upstream.recording is None:
+        print("No recorded yfinance responses (python -m benchmarks.record_fixtures): using synthetic data")
+    else:
+        print(f"Replaying yfinance {upstream.recording.data['yfinance']} responses recorded {upstream.recording.data['recorded']}")
+    print(f"{args.sessions} sessions x (1 + {args.ticks} reruns), baseline peak RSS {peak_rss_mb():.0f} MB")
+    print(f"{'script':30} {'runs':>5} {'p50 ms':>8} {'p95 ms':>8} {'calls/session':>14} {'peak RSS MB':>12}")
+    failed = False
+    for script in args.scripts:
+        result = load_script(script, upstream, args.sessions, args.ticks)
+        print(f"{script:30} {result['runs']:5d} {result['p50']:8.0f} {result['p95']:8.0f} "
+              f"{result['calls']:14.1f} {result['rss']:12.0f}")
+        for error in dict.fromkeys(result["errors"]):
+            failed = True
+            print(f"    exception: {error}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
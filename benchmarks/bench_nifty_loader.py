@@ -0,0 +1,57 @@
+"""Upstream calls per Nifty 50 refresh: legacy five-call loader vs bulk single-fetch loader.
+
+Run from the repo root:  python -m benchmarks.bench_nifty_loader
+"""
+import time
+
+import fetch_pool
+from benchmarks.fixtures import CountingDataSource, synthetic_source
+from intraday import BarPollFeed
+from market_data import get_bar_engine, get_data_source, set_data_source, set_quote_feed, summarize_symbols
+
+SYMBOLS = [f"SYM{i}.NS" for i in range(50)]
+
+
+def legacy_load(source, market_open):
+    """Replays the request pattern of the old nifty_gainers.load_all_data"""
+    for symbol in SYMBOLS:
+        if market_open:
+            source.history(symbol, period="1d", interval="5m")
+            source.history(symbol, period="2d")
+        else:
+            source.history(symbol, period="5d")
+        source.history(symbol, period="1y")
+        source.history(symbol, period="5d")
+        source.history(symbol, period="1mo")
+
+
+def current_load(market_open):
+    summarize_symbols(SYMBOLS, market_open=market_open)
+
+
+def main():
+    previous, previous_feed = get_data_source(), get_bar_engine().feed
+    # Measure compute, not the Yahoo politeness limit
+    fetch_pool.HOST_RATE_LIMITS = {}
+    try:
+        for market_open in (False, True):
+            legacy = CountingDataSource(synthetic_source(SYMBOLS))
+            legacy_load(legacy, market_open)
+
+            counting = CountingDataSource(synthetic_source(SYMBOLS))
+            set_data_source(counting)
+            set_quote_feed(BarPollFeed(counting))
+            start = time.perf_counter()
+            current_load(market_open)
+            elapsed = time.perf_counter() - start
+
+            state = "open" if market_open else "closed"
+            print(f"market {state:6}  legacy calls: {legacy.total:4d}  "
+                  f"new calls: {counting.total:4d}  compute: {elapsed * 1000:.1f} ms")
+    finally:
+        set_data_source(previous)
+        set_quote_feed(previous_feed)
+
+
+if __name__ == "__main__":
+    main()
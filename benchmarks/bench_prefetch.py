@@ -0,0 +1,61 @@
+"""Detail-page switch latency with and without speculative prefetch.
+
+Simulates a user stepping through adjacent selectbox entries, pausing between
+picks; each switch needs the same two cache entries the Overview needs.
+
+Run from the repo root:  python -m benchmarks.bench_prefetch
+"""
+import time
+
+from fetch_pool import fetch_all
+from market_cache import MarketDataCache
+from prefetcher import Prefetcher
+
+SYMBOLS = [f"SYM{i}.NS" for i in range(12)]
+DATASETS = ("info", "hist")
+LATENCY = 0.3  # simulated upstream round trip, seconds
+THINK_TIME = 2.0  # user pause between switches
+NEIGHBOURS = 2
+
+
+def fetch(symbol, name):
+    time.sleep(LATENCY)
+    return symbol, name
+
+
+def open_page(cache, symbol):
+    """Foreground load of the Overview datasets, like StockDetails.load"""
+    start = time.perf_counter()
+    fetch_all(lambda name: cache.get_or_fetch((symbol, "detail", name), lambda: fetch(symbol, name)),
+              DATASETS, host=None)
+    return time.perf_counter() - start
+
+
+def run(prefetch):
+    cache = MarketDataCache(ttl=lambda symbol: 3600)
+    prefetcher = Prefetcher(per_minute=60, burst=4)
+    timings = []
+    for i, symbol in enumerate(SYMBOLS[:6]):
+        timings.append(open_page(cache, symbol))
+        if prefetch:
+            neighbours = [SYMBOLS[j] for step in range(1, NEIGHBOURS + 1) for j in (i + step, i - step)
+                          if 0 <= j < len(SYMBOLS)]
+            prefetcher.schedule(
+                (s, lambda s=s: [cache.get_or_fetch((s, "detail", n), lambda n=n: fetch(s, n)) for n in DATASETS])
+                for s in neighbours if (s, "detail", "info") not in cache
+            )
+        time.sleep(THINK_TIME)
+    return timings, prefetcher.started
+
+
+def main():
+    for prefetch in (False, True):
+        timings, started = run(prefetch)
+        switches = timings[1:]
+        print(f"prefetch={'on ' if prefetch else 'off'}  first {timings[0] * 1000:4.0f} ms  "
+              f"switches avg {sum(switches) / len(switches) * 1000:4.0f} ms  "
+              f"max {max(switches) * 1000:4.0f} ms  ({started} prefetch jobs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Ranked pages over a quote snapshot: partial selection (QuoteView.top) vs a full sort.
+
+For universes the size of the Nifty 50, the Nifty 500 and the full NSE list,
+times the first page of top gainers (10 rows) and a page deep in the list
+three ways: pandas sort_values on a DataFrame copy (the old per-session
+pattern), QuoteView.sort + page, and QuoteView.top.
+
+Run from the repo root:  python -m benchmarks.bench_query
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from quote_snapshot import QuoteSnapshot
+
+UNIVERSES = {"Nifty 50": 50, "Nifty 500": 500, "NSE": 2000, "NSE x25": 50000}
+ROWS_PER_PAGE = 10
+COLUMN = "Daily Change (%)"
+REPEAT = 200
+
+
+def timed(func):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        result = func()
+    return (time.perf_counter() - start) / REPEAT * 1e6, result
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'universe':10} {'page':>6} {'pandas us':>10} {'sort us':>9} {'top us':>8}")
+    for label, size in UNIVERSES.items():
+        frame = pd.DataFrame({
+            "Symbol": [f"SYM{i}.NS" for i in range(size)],
+            COLUMN: rng.normal(0, 2, size).round(2),
+            "Current Price": rng.uniform(10, 5000, size).round(2),
+        })
+        quotes = QuoteSnapshot.from_frame(frame, "Symbol")
+        view = quotes.view()
+        for page in (0, size // ROWS_PER_PAGE // 2):
+            start, stop = page * ROWS_PER_PAGE, (page + 1) * ROWS_PER_PAGE
+            legacy, expected = timed(lambda: frame.copy().sort_values(COLUMN, ascending=False, kind="stable")
+                                     .iloc[start:stop])
+            full, _ = timed(lambda: view.sort(COLUMN).page(start, stop))
+            partial, result = timed(lambda: view.top(COLUMN, stop, start=start))
+            assert result.symbols == list(expected["Symbol"])
+            print(f"{label:10} {page + 1:6d} {legacy:10.0f} {full:9.0f} {partial:8.0f}")
+
+
+if __name__ == "__main__":
+    main()
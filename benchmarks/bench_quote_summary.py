@@ -0,0 +1,79 @@
+"""Search results: per-row Ticker.info on every rerun vs the batched quote summary service.
+
+Renders a page of 30 search results five times (the first search plus four
+reruns from Add/Remove clicks) against fixture providers with a fixed
+per-request latency.
+
+Run from the repo root:  python -m benchmarks.bench_quote_summary
+"""
+import os
+import tempfile
+import time
+
+import yfinance as yf
+
+import fetch_pool
+from benchmarks.fixtures import CountingDataSource, FixtureTicker, SyntheticDataSource
+from market_data import CachedDataSource, get_data_source, set_data_source
+from quote_summary import QuoteSummaryService
+from reference_store import ReferenceStore
+
+SYMBOLS = [f"SYM{i}.NS" for i in range(30)]
+RERUNS = 5
+LATENCY = 0.05  # seconds per upstream request
+
+
+class SlowTicker(FixtureTicker):
+    @property
+    def info(self):
+        time.sleep(LATENCY)
+        return FixtureTicker.info.fget(self)
+
+
+def legacy_render():
+    for symbol in SYMBOLS:
+        info = yf.Ticker(symbol).info
+        info.get("currentPrice"), info.get("sector")
+
+
+def service_render(service):
+    summaries = service.summaries(SYMBOLS)
+    pending = [s for s in SYMBOLS if not summaries[s]["sector"]]
+    first_paint = time.perf_counter()
+    for _ in service.iter_profiles(pending):
+        pass
+    return first_paint
+
+
+def main():
+    previous_source, previous_ticker = get_data_source(), yf.Ticker
+    fetch_pool.HOST_RATE_LIMITS = {}
+    try:
+        yf.Ticker = SlowTicker
+        FixtureTicker.calls.clear()
+        start = time.perf_counter()
+        for _ in range(RERUNS):
+            legacy_render()
+        legacy_time = (time.perf_counter() - start) / RERUNS
+        print(f"per-row info:  {legacy_time * 1000:7.0f} ms/render, "
+              f"{sum(FixtureTicker.calls.values())} upstream calls over {RERUNS} renders")
+
+        source = CountingDataSource(SyntheticDataSource(), latency=LATENCY)
+        set_data_source(CachedDataSource(source))
+        FixtureTicker.calls.clear()
+        service = QuoteSummaryService(ReferenceStore(os.path.join(tempfile.mkdtemp(), "reference.sqlite3")))
+        paints, totals = [], []
+        for _ in range(RERUNS):
+            start = time.perf_counter()
+            paints.append(service_render(service) - start)
+            totals.append(time.perf_counter() - start)
+        calls = sum(FixtureTicker.calls.values()) + source.total
+        print(f"batched:       {totals[0] * 1000:7.0f} ms first render ({paints[0] * 1000:.0f} ms to first paint), "
+              f"{sum(totals[1:]) / (RERUNS - 1) * 1000:.0f} ms/rerun, {calls} upstream calls over {RERUNS} renders")
+    finally:
+        yf.Ticker = previous_ticker
+        set_data_source(previous_source)
+
+
+if __name__ == "__main__":
+    main()
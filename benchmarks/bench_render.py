@@ -0,0 +1,97 @@
+"""Per-rerun render time: per-cell .apply/applymap callbacks vs the vectorized formatting helpers.
+
+Run from the repo root:  python -m benchmarks.bench_render
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from formatting import change_arrow_html, format_numbers, html_table, styled_table
+
+ROWS = [50, 500, 2000]
+CHANGES = ["Daily Change (%)", "Weekly Change (%)", "Monthly Change (%)"]
+PRICES = ["Current Price", "52-Week High", "52-Week Low"]
+
+
+def sample(rows):
+    rng = np.random.default_rng(rows)
+    data = {"Company": [f"CO{i}" for i in range(rows)]}
+    for column in PRICES:
+        data[column] = rng.random(rows) * 5000
+    for column in CHANGES:
+        data[column] = rng.standard_normal(rows) * 3
+    return pd.DataFrame(data)
+
+
+def legacy_html(df):
+    """nifty_gainers before: one Python callback per cell"""
+    def format_change(value):
+        value = float(value)
+        color = "green" if value >= 0 else "red"
+        arrow = "↑" if value >= 0 else "↓"
+        return f"<span style='color: {color}'>{arrow} {abs(value):.2f}%</span>"
+
+    display_df = df.copy()
+    for column in PRICES:
+        display_df[column] = display_df[column].apply(lambda value: f"₹{float(value):,.2f}")
+    for column in CHANGES:
+        display_df[column] = display_df[column].apply(format_change)
+    return display_df.to_html(escape=False, index=False)
+
+
+def vectorized_html(df):
+    display_df = df.copy()
+    for column in PRICES:
+        display_df[column] = format_numbers(display_df[column], prefix="₹")
+    for column in CHANGES:
+        display_df[column] = change_arrow_html(display_df[column])
+    return html_table(display_df)
+
+
+def legacy_styler(df):
+    """app.py / etf_performance before: Styler.format + per-cell applymap"""
+    def style_change(val):
+        if isinstance(val, (int, float)):
+            return f"color: {'green' if val >= 0 else 'red'}; font-weight: bold;"
+        return ''
+
+    styler = df.style.format({**{c: "₹{:,.2f}" for c in PRICES}, **{c: "{:+.2f}%" for c in CHANGES}})
+    styler = getattr(styler, "map", None) and styler.map(style_change, subset=CHANGES) \
+        or styler.applymap(style_change, subset=CHANGES)
+    return styler
+
+
+def vectorized_styler(df):
+    return styled_table(df, {**{c: "₹{:,.2f}" for c in PRICES}, **{c: "{:+.2f}%" for c in CHANGES}}, CHANGES)
+
+
+def render_styler(styler):
+    # What st.dataframe does with a Styler
+    styler._compute()
+    styler._translate(False, False)
+
+
+def best_of(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    for rows in ROWS:
+        df = sample(rows)
+        assert legacy_html(df) == vectorized_html(df)
+        html_old = best_of(lambda: legacy_html(df))
+        html_new = best_of(lambda: vectorized_html(df))
+        sty_old = best_of(lambda: render_styler(legacy_styler(df)))
+        sty_new = best_of(lambda: render_styler(vectorized_styler(df)))
+        print(f"{rows:5d} rows  html table {html_old:7.1f} -> {html_new:6.1f} ms   "
+              f"styled dataframe {sty_old:7.1f} -> {sty_new:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Quote snapshot memory: one shared QuoteSnapshot plus per-session views vs a DataFrame per session.
+
+Builds a table shaped like the Nifty page (text company name, a dozen float
+columns) for a 2000-symbol universe and holds it for 100 sessions, each with
+its own sorted page, the way session_state used to hold a DataFrame copy.
+
+Run from the repo root:  python -m benchmarks.bench_snapshot
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from quote_snapshot import QuoteSnapshot
+
+SYMBOLS = 2000
+SESSIONS = 100
+VALUE_COLUMNS = ["Current Price", "Previous Close", "Daily Change (%)", "Weekly Change (%)",
+                 "Monthly Change (%)", "52W High", "52W Low", "Day High", "Day Low", "Volume"]
+
+
+def build_frame():
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        "Symbol": [f"SYM{i}.NS" for i in range(SYMBOLS)],
+        "Company": [f"Company {i} Limited" for i in range(SYMBOLS)],
+    })
+    for column in VALUE_COLUMNS:
+        frame[column] = rng.uniform(-5, 5000, SYMBOLS).round(2)
+    return frame
+
+
+def main():
+    frame = build_frame()
+
+    start = time.perf_counter()
+    copies = [frame.sort_values("Daily Change (%)", ascending=False).copy() for _ in range(SESSIONS)]
+    legacy_time = time.perf_counter() - start
+    legacy_bytes = sum(int(c.memory_usage(deep=True).sum()) for c in copies)
+
+    start = time.perf_counter()
+    quotes = QuoteSnapshot.from_frame(frame, "Symbol", labels=["Company"])
+    views = [quotes.view().sort("Daily Change (%)") for _ in range(SESSIONS)]
+    snapshot_time = time.perf_counter() - start
+    snapshot_bytes = quotes.nbytes + sum(v.rows.nbytes for v in views)
+
+    print(f"{SYMBOLS} symbols x {SESSIONS} sessions")
+    print(f"DataFrame per session: {legacy_bytes / 2**20:7.2f} MB  {legacy_time * 1000:7.1f} ms")
+    print(f"snapshot + views:      {snapshot_bytes / 2**20:7.2f} MB  {snapshot_time * 1000:7.1f} ms "
+          f"(snapshot {quotes.nbytes / 2**10:.0f} KB, {views[0].rows.nbytes / 2**10:.1f} KB per view)")
+    page = views[0].page(0, 50).frame()
+    expected = copies[0].head(50).reset_index(drop=True)
+    assert (page["Symbol"] == expected["Symbol"]).all()
+    assert np.allclose(page["Current Price"], expected["Current Price"], atol=0.01)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Time to first rows on a cold Nifty 50 load: one blocking bulk fetch vs streamed chunks.
+
+One symbol is made slow to stand in for a lagging upstream response; with
+streaming only its chunk waits for it.
+
+Run from the repo root:  python -m benchmarks.bench_streaming
+"""
+import threading
+import time
+
+import fetch_pool
+from benchmarks.fixtures import CountingDataSource, synthetic_source
+from market_data import get_data_source, iter_summaries, set_data_source, summarize_symbols
+
+SYMBOLS = [f"SYM{i}.NS" for i in range(50)]
+SLOW_SYMBOL = SYMBOLS[-1]
+LATENCY = 0.05  # seconds per bulk request
+SLOW_LATENCY = 1.0  # extra seconds for any request that includes SLOW_SYMBOL
+
+
+class SlowSymbolSource(CountingDataSource):
+    def download(self, symbols, period="1y", interval="1d"):
+        if SLOW_SYMBOL in symbols:
+            threading.Event().wait(SLOW_LATENCY)
+        return super().download(symbols, period=period, interval=interval)
+
+
+def blocking_load():
+    start = time.perf_counter()
+    summarize_symbols(SYMBOLS)
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+def streamed_load():
+    start = time.perf_counter()
+    first = None
+    for chunk, summaries, error in iter_summaries(SYMBOLS):
+        if first is None and summaries is not None and not summaries.empty:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def main():
+    previous = get_data_source()
+    # Measure the fetch pattern, not the Yahoo politeness limit
+    fetch_pool.HOST_RATE_LIMITS = {}
+    try:
+        for label, load in (("blocking", blocking_load), ("streamed", streamed_load)):
+            source = SlowSymbolSource(synthetic_source(SYMBOLS), latency=LATENCY)
+            set_data_source(source)
+            first, total = load()
+            print(f"{label:9} first rows: {first * 1000:7.1f} ms  all rows: {total * 1000:7.1f} ms  "
+                  f"calls: {source.total}")
+    finally:
+        set_data_source(previous)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Per-keystroke suggestion latency from the symbol index vs a linear substring scan.
+
+Run from the repo root:  python -m benchmarks.bench_symbol_search
+"""
+import time
+
+from symbol_master import SymbolIndex, load_symbols
+
+LITERAL = ["re", "rel", "tata", "tata con", "hdfc", "bank", "nifty", "m&m"]
+TYPOS = ["relaince", "infosis", "asain paints"]
+UNIVERSE = 2000  # pad the bundled master with synthetic listings up to the full NSE size
+REPEAT = 200
+
+
+def linear(rows, term):
+    """What app.py used to do over its 20-entry dict, applied to the whole master"""
+    term = term.lower()
+    return {s: n for s, n, _, _ in rows if term in n.lower() or term in s.lower()}
+
+
+def timed(func, queries):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        for query in queries:
+            func(query)
+    return (time.perf_counter() - start) / (REPEAT * len(queries)) * 1e3
+
+
+def main():
+    rows = load_symbols()
+    rows += [(f"SYN{i}.NS", f"Synthetic Listing {i} Limited", "EQ", 0) for i in range(UNIVERSE - len(rows))]
+    start = time.perf_counter()
+    index = SymbolIndex(rows)
+    build = (time.perf_counter() - start) * 1e3
+
+    print(f"{len(index)} symbols, index built in {build:.1f} ms")
+    print(f"linear scan: {timed(lambda q: linear(rows, q), LITERAL):.3f} ms/query (cannot match typos)")
+    print(f"index:       {timed(index.search, LITERAL):.3f} ms/query literal, "
+          f"{timed(index.search, TYPOS):.3f} ms/query with typos")
+    for query in LITERAL + TYPOS:
+        print(f"  {query!r:16} {list(index.search(query))[:4]}")
+
+
+if __name__ == "__main__":
+    main()
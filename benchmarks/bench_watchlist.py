@@ -0,0 +1,59 @@
+"""Supabase statements for a typical search session: legacy re-select per change vs the write-through cache.
+
+Run from the repo root:  python -m benchmarks.bench_watchlist
+"""
+from benchmarks.fixtures import FakeSupabaseClient
+from supabase_helper import WatchlistCache
+
+USER = "bench"
+SYMBOLS = [f"SYM{i}.NS" for i in range(10)]
+
+
+def legacy(client):
+    """What app.py used to do: write, then re-select the whole watchlist"""
+    table = client.table
+    for symbol in SYMBOLS:
+        table("watchlists").insert({"user_id": USER, "symbol": symbol}).execute()
+        table("watchlists").select("symbol").eq("user_id", USER).execute()
+    for symbol in SYMBOLS[:5]:
+        table("watchlists").delete().eq("user_id", USER).eq("symbol", symbol).execute()
+        table("watchlists").select("symbol").eq("user_id", USER).execute()
+
+
+def cached(client):
+    watchlists = WatchlistCache(client)
+    for symbol in SYMBOLS:
+        watchlists.add(USER, symbol)
+        watchlists.get(USER)
+    for symbol in SYMBOLS[:5]:
+        watchlists.remove(USER, symbol)
+        watchlists.get(USER)
+    return watchlists
+
+
+def main():
+    old, new, bulk = FakeSupabaseClient(), FakeSupabaseClient(), FakeSupabaseClient()
+    legacy(old)
+    watchlists = cached(new)
+    assert watchlists.get(USER) == SYMBOLS[5:]
+
+    watchlists = WatchlistCache(bulk)
+    watchlists.add_many(USER, SYMBOLS)
+    watchlists.remove_many(USER, SYMBOLS[:5])
+    assert watchlists.get(USER) == SYMBOLS[5:]
+
+    # A failed write reconciles the local list with the table
+    bulk.tables["watchlists"].fail_next = True
+    try:
+        watchlists.add(USER, "FAIL.NS")
+    except RuntimeError:
+        pass
+    assert watchlists.get(USER) == SYMBOLS[5:]
+
+    for name, client in [("legacy", old), ("write-through", new), ("bulk", bulk)]:
+        statements = client.tables["watchlists"].statements
+        print(f"{name:>13}: {sum(statements.values()):3d} statements  {dict(statements)}")
+
+
+if __name__ == "__main__":
+    main()
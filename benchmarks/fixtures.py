@@ -0,0 +1,342 @@
+"""Recorded and synthetic market data and call-counting helpers shared by the benchmarks"""
+import gzip
+import os
+import pickle
+import threading
+import zlib
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from history_store import SESSION_PERIODS, period_start
+from market_data import OHLCV_FIELDS, DataSource, FixtureDataSource
+
+RECORDING = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recorded", "yfinance.pkl.gz")
+# yf.Ticker attributes the pages read, recorded per symbol
+TICKER_ATTRIBUTES = ["info", "financials", "balance_sheet", "cashflow", "quarterly_financials", "major_holders"]
+
+
+def synthetic_history(seed, days=260, end=None):
+    """Deterministic random-walk daily OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=end or pd.Timestamp("2025-06-30"), periods=days)
+    close = 100 + rng.standard_normal(days).cumsum()
+    return pd.DataFrame({
+        "Open": close + rng.standard_normal(days) * 0.2,
+        "High": close + 1,
+        "Low": close - 1,
+        "Close": close,
+        "Volume": rng.integers(1_000, 100_000, days),
+    }, index=index)
+
+
+def synthetic_source(symbols, days=260):
+    """FixtureDataSource with one synthetic series per symbol"""
+    return FixtureDataSource({symbol: synthetic_history(i, days) for i, symbol in enumerate(symbols)})
+
+
+def symbol_seed(symbol):
+    """Stable per-symbol random seed"""
+    return zlib.crc32(symbol.encode())
+
+
+class SyntheticDataSource(FixtureDataSource):
+    """FixtureDataSource that makes up a deterministic series for any symbol on first use"""
+
+    def __init__(self, days=260, end=None):
+        super().__init__()
+        self.days = days
+        self.end = end or pd.Timestamp.today().normalize()
+
+    def history(self, symbol, period="1y", interval="1d"):
+        if symbol not in self.frames:
+            self.frames[symbol] = synthetic_history(symbol_seed(symbol), self.days, end=self.end)
+        return super().history(symbol, period=period, interval=interval)
+
+
+def _slice_period(frame, period):
+    """Rows of a recorded frame that a request for period would have returned on the recording day"""
+    if frame.empty:
+        return frame.copy()
+    days = pd.Index(frame.index.date)
+    if period in SESSION_PERIODS:
+        start = days.unique()[-SESSION_PERIODS[period]:][0]
+    else:
+        start = period_start(period, today=days[-1])
+    return frame[days >= start].copy() if start is not None else frame.copy()
+
+
+class Recording:
+    """yfinance responses saved by benchmarks.record_fixtures, replayed in the shape
+    yfinance returned them (MultiIndex columns, tz-aware indexes, NaN rows and gaps).
+
+    Requests are answered as if made on the recording day: a period is cut from
+    the recorded window, and a symbol that was not recorded gets what yfinance
+    gives for an unknown one (NaN columns in a download, empty frames otherwise).
+    """
+
+    def __init__(self, data):
+        self.data = data
+
+    @classmethod
+    def load(cls, path=RECORDING):
+        """The recording at path (None if none has been made)"""
+        if not os.path.exists(path):
+            return None
+        with gzip.open(path, "rb") as f:
+            return cls(pickle.load(f))
+
+    def download(self, tickers, period="1mo", interval="1d", **kwargs):
+        """Replacement for yf.download"""
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        recorded = self.data["download"].get(interval)
+        if recorded is None:
+            return pd.DataFrame()
+        fields = recorded.columns.get_level_values(0).unique()
+        frame = recorded.reindex(columns=pd.MultiIndex.from_product([fields, tickers], names=recorded.columns.names))
+        return _slice_period(frame.dropna(how="all"), period)
+
+    def ticker(self, symbol, name):
+        """A recorded yf.Ticker attribute (None if it was not recorded)"""
+        return self.data["tickers"].get(symbol, {}).get(name)
+
+
+SECTORS = ["Financial Services", "Technology", "Energy", "Consumer Defensive", "Healthcare", "Industrials"]
+STATEMENT_ITEMS = ["Total Revenue", "Operating Income", "Net Income", "Total Assets", "Free Cash Flow"]
+
+
+class FixtureTicker:
+    """Stand-in for yf.Ticker serving made-up info, statements and holders.
+
+    Prices come from `source` so they agree with the history the pages show;
+    every attribute read is counted in FixtureTicker.calls.
+    """
+
+    source = SyntheticDataSource()
+    calls = Counter()
+    _lock = threading.Lock()
+
+    def __init__(self, symbol):
+        self.ticker = symbol
+        self.rng = np.random.default_rng(symbol_seed(symbol))
+
+    def _record(self, name):
+        with self._lock:
+            self.calls[name] += 1
+
+    def history(self, period="1y", interval="1d", **kwargs):
+        self._record("history")
+        return self.source.history(self.ticker, period=period, interval=interval)
+
+    @property
+    def info(self):
+        self._record("info")
+        hist = self.source.history(self.ticker)
+        last, prev = float(hist["Close"].iloc[-1]), float(hist["Close"].iloc[-2])
+        return {
+            "symbol": self.ticker,
+            "longName": f"{self.ticker.split('.')[0].title()} Ltd",
+            "shortName": self.ticker.split(".")[0],
+            "sector": SECTORS[symbol_seed(self.ticker) % len(SECTORS)],
+            "industry": "Diversified",
+            "country": "India",
+            "currentPrice": last,
+            "previousClose": prev,
+            "dayHigh": float(hist["High"].iloc[-1]),
+            "dayLow": float(hist["Low"].iloc[-1]),
+            "fiftyTwoWeekHigh": float(hist["High"].max()),
+            "fiftyTwoWeekLow": float(hist["Low"].min()),
+            "volume": int(hist["Volume"].iloc[-1]),
+            "averageVolume": int(hist["Volume"].mean()),
+            "marketCap": int(last * 1e9),
+            "trailingPE": 20 + self.rng.random() * 10,
+            "priceToBook": 2 + self.rng.random() * 3,
+            "beta": 0.8 + self.rng.random() * 0.4,
+            "dividendYield": self.rng.random() * 2,
+            "bookValue": last / 3,
+            "totalRevenue": int(last * 1e8),
+            "profitMargins": 0.1,
+            "operatingMargins": 0.15,
+            "returnOnEquity": 0.12,
+            "payoutRatio": 0.3,
+            "fullTimeEmployees": 10_000,
+            "longBusinessSummary": "Synthetic company used by the load-test fixtures.",
+        }
+
+    def _statement(self, name, periods, months):
+        self._record(name)
+        columns = pd.date_range(end=pd.Timestamp("2025-03-31"), periods=periods, freq=f"{months}ME")[::-1]
+        values = self.rng.random((len(STATEMENT_ITEMS), periods)) * 1e10
+        return pd.DataFrame(values, index=STATEMENT_ITEMS, columns=columns)
+
+    @property
+    def financials(self):
+        return self._statement("financials", 4, 12)
+
+    @property
+    def balance_sheet(self):
+        return self._statement("balance_sheet", 4, 12)
+
+    @property
+    def cashflow(self):
+        return self._statement("cashflow", 4, 12)
+
+    @property
+    def quarterly_financials(self):
+        return self._statement("quarterly_financials", 5, 3)
+
+    @property
+    def major_holders(self):
+        self._record("major_holders")
+        return pd.DataFrame(
+            {"Value": [0.5, 0.25, 0.6, 1200]},
+            index=["insidersPercentHeld", "institutionsPercentHeld", "institutionsFloatPercentHeld", "institutionsCount"],
+        )
+
+
+class RecordedTicker:
+    """Stand-in for yf.Ticker replaying `recording`; every attribute read is counted
+    in RecordedTicker.calls"""
+
+    recording = None
+    calls = Counter()
+    _lock = threading.Lock()
+
+    def __init__(self, symbol):
+        self.ticker = symbol
+
+    def _replay(self, name, empty):
+        with self._lock:
+            self.calls[name] += 1
+        value = self.recording.ticker(self.ticker, name)
+        return empty if value is None else value.copy()
+
+    def history(self, period="1mo", interval="1d", **kwargs):
+        hist = self._replay("history", pd.DataFrame(columns=OHLCV_FIELDS))
+        return _slice_period(hist, period) if interval == "1d" else pd.DataFrame(columns=OHLCV_FIELDS)
+
+    @property
+    def info(self):
+        return self._replay("info", {})
+
+    @property
+    def financials(self):
+        return self._replay("financials", pd.DataFrame())
+
+    @property
+    def balance_sheet(self):
+        return self._replay("balance_sheet", pd.DataFrame())
+
+    @property
+    def cashflow(self):
+        return self._replay("cashflow", pd.DataFrame())
+
+    @property
+    def quarterly_financials(self):
+        return self._replay("quarterly_financials", pd.DataFrame())
+
+    @property
+    def major_holders(self):
+        return self._replay("major_holders", pd.DataFrame())
+
+
+class CountingDataSource(DataSource):
+    """Wraps another data source and counts upstream calls"""
+
+    def __init__(self, inner, latency=0.0):
+        self.inner = inner
+        self.latency = latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def _record(self, key):
+        with self._lock:
+            self.calls[key] += 1
+        if self.latency:
+            threading.Event().wait(self.latency)
+
+    def history(self, symbol, period="1y", interval="1d"):
+        self._record("history")
+        return self.inner.history(symbol, period=period, interval=interval)
+
+    def download(self, symbols, period="1y", interval="1d"):
+        self._record("download")
+        return DataSource.download(self.inner, symbols, period=period, interval=interval)
+
+    @property
+    def total(self):
+        return sum(self.calls.values())
+
+
+class _FakeResult:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class _FakeQuery:
+    """Just enough of the supabase-py query builder for the watchlist helpers"""
+
+    def __init__(self, table):
+        self.table = table
+        self.action = None
+        self.rows = None
+        self.head = False
+        self.filters = []
+
+    def select(self, *columns, count=None, head=False):
+        self.action, self.head = "select", head
+        return self
+
+    def insert(self, rows):
+        self.action, self.rows = "insert", rows if isinstance(rows, list) else [rows]
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row[column] == value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row[column] in values)
+        return self
+
+    def _matches(self, row):
+        return all(f(row) for f in self.filters)
+
+    def execute(self):
+        table = self.table
+        table.statements[self.action] += 1
+        if table.fail_next:
+            table.fail_next = False
+            raise RuntimeError("fake supabase failure")
+        if self.action == "insert":
+            table.rows.extend(dict(row) for row in self.rows)
+            return _FakeResult(self.rows)
+        matched = [row for row in table.rows if self._matches(row)]
+        if self.action == "delete":
+            table.rows = [row for row in table.rows if not self._matches(row)]
+            return _FakeResult(matched)
+        return _FakeResult([] if self.head else [dict(row) for row in matched], len(matched))
+
+
+class FakeTable:
+    def __init__(self):
+        self.rows = []
+        self.statements = Counter()
+        self.fail_next = False
+
+
+class FakeSupabaseClient:
+    """In-memory stand-in for the Supabase client's table API; counts executed statements"""
+
+    def __init__(self):
+        self.tables = {}
+
+    def table(self, name):
+        return _FakeQuery(self.tables.setdefault(name, FakeTable()))
@@ -0,0 +1,68 @@
+"""Record the yfinance responses the load test replays (see fixtures.Recording).
+
+Makes the same calls the app makes, with the same arguments, and pickles what
+yfinance returned as-is: bulk downloads with their (Price, Ticker) columns and
+holiday NaN rows, tz-aware Ticker.history frames, info dicts, and statements
+with the gaps Yahoo leaves in them. Covers the load-test watchlist, the Nifty 50
+and every catalogue instrument; statements and Ticker.history only for the
+watchlist and the Nifty 50. Needs network access.
+
+Run from the repo root:  python -m benchmarks.record_fixtures [--output PATH]
+"""
+import argparse
+import gzip
+import os
+import pickle
+from datetime import datetime, timezone
+
+import yfinance as yf
+
+from benchmarks.fixtures import RECORDING, TICKER_ATTRIBUTES
+from universe import CONSTITUENTS_DIR, CONSTITUENT_FILES, get_universe, load_constituents
+
+WATCHLIST = ["RELIANCE.NS", "TCS.NS", "INFY.NS", "HDFCBANK.NS", "ITC.NS"]
+DAILY_PERIOD = "2y"  # longest daily window replayed; 'max' requests get all of it
+HISTORY_PERIOD = "1y"  # Ticker.history, as the stock detail page asks for it
+
+
+def download(symbols, period, interval):
+    """yf.download called the way YahooDataSource.download calls it"""
+    return yf.download(symbols, period=period, interval=interval, group_by="column",
+                       auto_adjust=False, progress=False, threads=True)
+
+
+def record():
+    nifty50 = [i.symbol for i in load_constituents(os.path.join(CONSTITUENTS_DIR, CONSTITUENT_FILES["nifty50"]), "nifty50")]
+    detailed = list(dict.fromkeys(WATCHLIST + nifty50))
+    symbols = list(dict.fromkeys(detailed + [i.symbol for i in get_universe()]))
+
+    tickers = {}
+    for symbol in detailed:
+        ticker = yf.Ticker(symbol)
+        tickers[symbol] = {name: getattr(ticker, name) for name in TICKER_ATTRIBUTES}
+        tickers[symbol]["history"] = ticker.history(period=HISTORY_PERIOD, auto_adjust=False)
+    return {
+        "recorded": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "yfinance": yf.__version__,
+        "download": {
+            "1d": download(symbols, DAILY_PERIOD, "1d"),
+            "1m": download(symbols, "1d", "1m"),
+        },
+        "tickers": tickers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=RECORDING)
+    args = parser.parse_args()
+    data = record()
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with gzip.open(args.output, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"{args.output}: {len(data['download']['1d'].columns.get_level_values(1).unique())} symbols, "
+          f"{len(data['tickers'])} with details, recorded {data['recorded']}")
+
+
+if __name__ == "__main__":
+    main()
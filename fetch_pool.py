@@ -0,0 +1,125 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from instrumentation import current_page, page_scope
+
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except ImportError:  # running outside Streamlit (benchmarks, scripts)
+    add_script_run_ctx = get_script_run_ctx = None
+
+# Configuration
+MAX_IN_FLIGHT = 8  # concurrent upstream requests per fetch_all call
+YAHOO_HOST = "query1.finance.yahoo.com"
+HOST_RATE_LIMITS = {
+    YAHOO_HOST: 10,  # requests started per second
+}
+
+
+class RateLimiter:
+    """Token bucket limiting how many calls per second may start against one host"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+_in_flight = 0  # fetch_all calls currently running func
+_in_flight_lock = threading.Lock()
+
+
+def in_flight():
+    """Number of foreground fetches currently running through fetch_all"""
+    return _in_flight
+
+
+def get_rate_limiter(host):
+    """Shared per-process rate limiter for a host (None if the host is unlimited)"""
+    rate = HOST_RATE_LIMITS.get(host)
+    if not rate:
+        return None
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = RateLimiter(rate)
+        return _limiters[host]
+
+
+def fetch_iter(func, keys, max_workers=MAX_IN_FLIGHT, host=YAHOO_HOST):
+    """Run func(key) for every key on a bounded thread pool, yielding (key, value, error)
+    in completion order so callers can show results while slower keys are still running.
+
+    Exactly one of value/error is set. Closing the generator early cancels keys
+    that have not started yet.
+    """
+    keys = list(keys)
+    if not keys:
+        return
+
+    limiter = get_rate_limiter(host)
+    ctx = get_script_run_ctx(suppress_warning=True) if get_script_run_ctx else None
+    page = current_page()
+
+    def run(key):
+        global _in_flight
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        if limiter is not None:
+            limiter.acquire()
+        with _in_flight_lock:
+            _in_flight += 1
+        try:
+            with page_scope(page):
+                return func(key)
+        finally:
+            with _in_flight_lock:
+                _in_flight -= 1
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(keys))))
+    try:
+        futures = {pool.submit(run, key): key for key in keys}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def fetch_all(func, keys, max_workers=MAX_IN_FLIGHT, host=YAHOO_HOST, on_progress=None):
+    """Run func(key) for every key on a bounded thread pool.
+
+    Returns (results, errors): dicts keyed by key holding the return value or the
+    raised exception. on_progress(done, total) is called from the calling thread,
+    so it can safely drive st.progress.
+    """
+    keys = list(keys)
+    results, errors = {}, {}
+    for done, (key, value, error) in enumerate(fetch_iter(func, keys, max_workers, host), start=1):
+        if error is None:
+            results[key] = value
+        else:
+            errors[key] = error
+        if on_progress:
+            on_progress(done, len(keys))
+    return results, errors
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+POSITIVE_STYLE = 'color: green; font-weight: bold;'
+NEGATIVE_STYLE = 'color: red; font-weight: bold;'
+
+
+def _floats(values):
+    return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+
+
+def _with_index(values, items):
+    index = values.index if isinstance(values, pd.Series) else None
+    return pd.Series(items, index=index, dtype=object)
+
+
+def format_numbers(values, decimals=2, prefix="", suffix="", signed=False, thousands=True, na="N/A"):
+    """Format a whole column of numbers in one pass, e.g. ₹1,234.50 or +1.25%"""
+    arr = _floats(values)
+    fmt = f"{prefix}{{:{'+' if signed else ''}{',' if thousands else ''}.{decimals}f}}{suffix}".format
+    text = list(map(fmt, arr.tolist()))
+    for i in np.flatnonzero(np.isnan(arr)):
+        text[i] = na
+    return _with_index(values, text)
+
+
+def change_styles(values, positive=POSITIVE_STYLE, negative=NEGATIVE_STYLE):
+    """CSS for a column of changes: green when >= 0, red otherwise, blank when not numeric"""
+    arr = _floats(values)
+    styles = np.where(np.isnan(arr), "", np.where(arr >= 0, positive, negative))
+    return _with_index(values, styles)
+
+
+def styled_table(df, formats, change_columns=(), positive=POSITIVE_STYLE, negative=NEGATIVE_STYLE):
+    """Styler for st.dataframe: per-column format strings, change columns coloured in one callback.
+
+    The data stays numeric so column sorting in st.dataframe still works.
+    """
+    change_columns = list(change_columns)
+    styles = pd.DataFrame(
+        {column: change_styles(df[column], positive, negative).to_numpy() for column in change_columns},
+        index=df.index,
+    )
+    return df.style.format(formats).apply(lambda _: styles, axis=None, subset=change_columns)
+
+
+def change_arrow_html(values):
+    """<span> with colour and ↑/↓ arrow for each change, N/A when missing"""
+    up = "<span style='color: green'>↑ {:.2f}%</span>".format
+    down = "<span style='color: red'>↓ {:.2f}%</span>".format
+    html = [up(v) if v >= 0 else down(-v) if v < 0 else "N/A" for v in _floats(values).tolist()]
+    return _with_index(values, html)
+
+
+def change_class_html(values):
+    """<span class='positive|negative'>+1.23%</span> for each change, N/A when missing"""
+    up = "<span class='positive'>{:+.2f}%</span>".format
+    down = "<span class='negative'>{:+.2f}%</span>".format
+    html = [up(v) if v >= 0 else down(v) if v < 0 else "N/A" for v in _floats(values).tolist()]
+    return _with_index(values, html)
+
+
+def day_range_html(values):
+    """Colour the low/high halves of 'low - high' range strings"""
+    cell = "<span class='day-range-low'>{}</span> - <span class='day-range-high'>{}</span>".format
+    html = [cell(*v.split(" - ", 1)) if isinstance(v, str) and " - " in v else v for v in values]
+    return _with_index(values, html)
+
+
+def html_table(df):
+    """Same markup as df.to_html(escape=False, index=False), built with one string join"""
+    header = "".join(f"      <th>{column}</th>\n" for column in df.columns)
+    body = "".join(
+        "    <tr>\n" + "".join(f"      <td>{cell}</td>\n" for cell in row) + "    </tr>\n"
+        for row in df.itertuples(index=False, name=None)
+    )
+    return (
+        '<table border="1" class="dataframe">\n'
+        "  <thead>\n"
+        '    <tr style="text-align: right;">\n'
+        f"{header}"
+        "    </tr>\n"
+        "  </thead>\n"
+        "  <tbody>\n"
+        f"{body}"
+        "  </tbody>\n"
+        "</table>"
+    )
@@ -0,0 +1,150 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# Configuration
+STORE_DIR = os.environ.get(
+    "NSE_FUNDAMENTALS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".market_data", "fundamentals")
+)
+
+# Statement -> months between reporting periods
+STATEMENT_PERIODS = {
+    "financials": 12,
+    "balance_sheet": 12,
+    "cashflow": 12,
+    "quarterly_results": 3,
+}
+# Days after a period ends by which results are due (SEBI LODR: 45 quarterly, 60 annual)
+REPORTING_LAG_DAYS = {3: 45, 12: 60}
+RECHECK_SECONDS = 24 * 60 * 60  # how often to look for a period that is due but not yet published
+
+
+def next_refresh(latest, statement, now=None):
+    """Epoch time after which a statement whose newest column is `latest` may have a new period"""
+    now = now or time.time()
+    if latest is None:
+        return now + RECHECK_SECONDS
+    months = STATEMENT_PERIODS[statement]
+    period_end = pd.Timestamp(latest) + pd.offsets.MonthEnd(months)
+    due = (period_end + pd.Timedelta(days=REPORTING_LAG_DAYS[months])).timestamp()
+    # Once the next period is due, keep checking daily until it shows up
+    return max(due, now + RECHECK_SECONDS) if due <= now else due
+
+
+class FundamentalsStore:
+    """Financial statements on disk as compressed .npz (values, line items, period dates), one per
+    symbol and statement.
+
+    A JSON index records each statement's newest period and when a newer one can
+    first be expected; until then reads never touch the network.
+    """
+
+    def __init__(self, directory=STORE_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._index = None
+
+    def _path(self, symbol, statement):
+        safe = "".join(c if c.isalnum() or c in "-_.=" else f"%{ord(c):02X}" for c in symbol)
+        return os.path.join(self.directory, f"{safe}.{statement}.npz")
+
+    def _index_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(self._index_path()) as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self):
+        tmp = self._index_path() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp, self._index_path())
+
+    def meta(self, symbol, statement):
+        with self._lock:
+            return dict(self._load_index().get(symbol, {}).get(statement, {}))
+
+    def is_fresh(self, symbol, statement):
+        return self.meta(symbol, statement).get("expires", 0) > time.time()
+
+    def read(self, symbol, statement):
+        """Stored statement as a DataFrame (line items x period dates), None if absent"""
+        try:
+            with np.load(self._path(symbol, statement), allow_pickle=False) as data:
+                return pd.DataFrame(data["values"], index=pd.Index(data["items"]),
+                                    columns=pd.DatetimeIndex(data["periods"]))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def write(self, symbol, statement, frame):
+        """Store a freshly fetched statement and schedule its next refresh"""
+        frame = _to_statement(frame)
+        latest = frame.columns.max() if len(frame.columns) else None
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(symbol, statement)
+            tmp = path + ".tmp.npz"
+            np.savez_compressed(
+                tmp,
+                values=frame.to_numpy(dtype="f8"),
+                items=np.asarray(frame.index.astype(str), dtype=str),
+                periods=frame.columns.values.astype("datetime64[D]"),
+            )
+            os.replace(tmp, path)
+
+            entry = self._load_index().setdefault(symbol, {}).setdefault(statement, {})
+            entry["latest"] = latest.date().isoformat() if latest is not None else None
+            entry["expires"] = next_refresh(latest, statement)
+            self._save_index()
+        return frame
+
+    def get_or_fetch(self, symbol, statement, fetch):
+        """Stored statement while no new period is due, otherwise fetch() and store it.
+
+        A failed or empty fetch keeps serving the stored statement.
+        """
+        if self.is_fresh(symbol, statement):
+            frame = self.read(symbol, statement)
+            if frame is not None:
+                return frame
+        try:
+            fetched = fetch()
+        except Exception:
+            # Serve the last known statement rather than nothing
+            frame = self.read(symbol, statement)
+            if frame is None:
+                raise
+            return frame
+        if fetched is None or fetched.empty:
+            # An empty answer (often Yahoo throttling) is no reason to drop a stored statement
+            frame = self.read(symbol, statement)
+            return frame if frame is not None else _to_statement(fetched)
+        return self.write(symbol, statement, fetched)
+
+
+def _to_statement(frame):
+    """Numeric line items x period-end dates, newest period first (yfinance's layout)"""
+    if frame is None or frame.empty:
+        return pd.DataFrame(index=pd.Index([], dtype=str), columns=pd.DatetimeIndex([]), dtype=float)
+    frame = frame.apply(pd.to_numeric, errors="coerce")
+    frame.columns = pd.to_datetime(frame.columns).tz_localize(None).normalize()
+    return frame.sort_index(axis=1, ascending=False)
+
+
+_store = FundamentalsStore()
+
+
+def get_fundamentals_store():
+    """The process-wide on-disk fundamentals store"""
+    return _store
@@ -0,0 +1,216 @@
+import json
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from market_cache import market_ttl
+
+# Configuration
+STORE_DIR = os.environ.get(
+    "NSE_HISTORY_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".market_data", "history")
+)
+
+BAR_DTYPE = np.dtype([
+    ("date", "datetime64[D]"),
+    ("Open", "f8"),
+    ("High", "f8"),
+    ("Low", "f8"),
+    ("Close", "f8"),
+    ("Volume", "f8"),
+])
+PRICE_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Periods Yahoo counts in trading sessions rather than calendar days
+SESSION_PERIODS = {"1d": 1, "2d": 2, "5d": 5}
+# Calendar span of every other period yfinance accepts (None = all history)
+CALENDAR_PERIODS = {
+    "7d": 7, "1wk": 7, "1mo": 31, "3mo": 92, "6mo": 183,
+    "1y": 366, "2y": 731, "5y": 1827, "10y": 3653, "max": None,
+}
+# Candidate periods for fetching the missing tail, smallest first
+TAIL_PERIODS = [("5d", 5), ("1mo", 31), ("3mo", 92), ("1y", 366), ("5y", 1827), ("max", None)]
+
+
+def period_start(period, today=None):
+    """First calendar date covered by a yfinance period string (None = unbounded)"""
+    today = today or date.today()
+    if period == "ytd":
+        return date(today.year, 1, 1)
+    if period in SESSION_PERIODS:
+        return today - timedelta(days=SESSION_PERIODS[period] * 2 + 4)
+    days = CALENDAR_PERIODS.get(period)
+    return today - timedelta(days=days) if days else None
+
+
+def tail_period(last_date, today=None):
+    """Smallest yfinance period that reaches back to last_date"""
+    gap = ((today or date.today()) - last_date).days + 1
+    for period, days in TAIL_PERIODS:
+        if days is None or days >= gap:
+            return period
+    return "max"
+
+
+class HistoryStore:
+    """Per-symbol daily bars on disk as structured NumPy arrays, read back memory-mapped.
+
+    A small JSON index records, per symbol, how far back the stored bars are known
+    to be complete ('since', or 'max' with the date of the first bar in 'first')
+    and until when they are fresh ('expires').
+    """
+
+    def __init__(self, directory=STORE_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._index = None
+
+    def _path(self, symbol):
+        safe = "".join(c if c.isalnum() or c in "-_.=" else f"%{ord(c):02X}" for c in symbol)
+        return os.path.join(self.directory, f"{safe}.npy")
+
+    def _index_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(self._index_path()) as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self):
+        tmp = self._index_path() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp, self._index_path())
+
+    def meta(self, symbol):
+        with self._lock:
+            return dict(self._load_index().get(symbol, {}))
+
+    def bars(self, symbol):
+        """Stored bars as a read-only memory-mapped structured array (None if absent)"""
+        try:
+            return np.load(self._path(symbol), mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+    def last_date(self, symbol):
+        bars = self.bars(symbol)
+        if bars is None or len(bars) == 0:
+            return None
+        return bars["date"][-1].astype(object)
+
+    def read(self, symbol, period="max"):
+        """Stored bars for a period as an OHLCV DataFrame indexed by date"""
+        bars = self.bars(symbol)
+        if bars is None or len(bars) == 0:
+            return pd.DataFrame(columns=PRICE_FIELDS)
+        if period in SESSION_PERIODS:
+            bars = bars[-SESSION_PERIODS[period]:]
+        else:
+            start = period_start(period)
+            if start is not None:
+                bars = bars[bars["date"] >= np.datetime64(start, "D")]
+        frame = pd.DataFrame({field: np.asarray(bars[field]) for field in PRICE_FIELDS},
+                             index=pd.DatetimeIndex(np.asarray(bars["date"]), name="Date"))
+        return frame
+
+    def is_fresh(self, symbol):
+        return self.meta(symbol).get("expires", 0) > time.time()
+
+    def expire(self, symbols):
+        """Mark symbols stale so the next read fetches their tail"""
+        with self._lock:
+            index = self._load_index()
+            for symbol in symbols:
+                if symbol in index:
+                    index[symbol]["expires"] = 0
+            if self._index:
+                self._save_index()
+
+    def forget_coverage(self, symbols):
+        """Drop what the index says about how far back symbols are complete, so the next
+        read fetches their full period again (the stored bars are kept and merged)"""
+        with self._lock:
+            index = self._load_index()
+            for symbol in symbols:
+                if symbol in index:
+                    index[symbol].pop("since", None)
+                    index[symbol].pop("first", None)
+            if self._index:
+                self._save_index()
+
+    def covers(self, symbol, period):
+        """True if the stored bars reach back at least as far as `period` needs"""
+        since = self.meta(symbol).get("since")
+        if since is None:
+            return False
+        if since == "max":
+            return True
+        start = period_start(period)
+        return start is not None and start >= date.fromisoformat(since)
+
+    def write(self, symbol, frame, period):
+        """Merge freshly fetched bars for `period` into the store; new rows win on overlap.
+
+        An empty fetch (failed or throttled) changes nothing: coverage and
+        freshness are only recorded once bars were actually written.
+        """
+        new = _to_bars(frame)
+        if len(new) == 0:
+            return
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            old = self.bars(symbol)
+            if old is not None and len(old):
+                old = np.asarray(old[old["date"] < new["date"][0]])
+                new = np.concatenate([old, new])
+
+            path = self._path(symbol)
+            tmp = path + ".tmp.npy"
+            np.save(tmp, new)
+            os.replace(tmp, path)
+
+            index = self._load_index()
+            entry = index.setdefault(symbol, {})
+            start = period_start(period)
+            if start is None:
+                entry["since"] = "max"
+                entry["first"] = str(new["date"][0])  # where the full history starts
+            elif entry.get("since") != "max":
+                since = entry.get("since")
+                if since is None or start < date.fromisoformat(since):
+                    entry["since"] = start.isoformat()
+            entry["expires"] = time.time() + market_ttl(symbol)
+            self._save_index()
+
+
+def _to_bars(frame):
+    if frame is None or frame.empty:
+        return np.empty(0, dtype=BAR_DTYPE)
+    index = frame.index
+    if getattr(index, "tz", None) is not None:
+        index = index.tz_localize(None)
+    bars = np.empty(len(frame), dtype=BAR_DTYPE)
+    bars["date"] = index.values.astype("datetime64[D]")
+    for field in PRICE_FIELDS:
+        bars[field] = frame[field].to_numpy(dtype="f8") if field in frame.columns else np.nan
+    # One bar per day, latest wins
+    _, last = np.unique(bars["date"][::-1], return_index=True)
+    return bars[len(bars) - 1 - last]
+
+
+_store = HistoryStore()
+
+
+def get_store():
+    """The process-wide on-disk history store"""
+    return _store
@@ -0,0 +1,203 @@
+import bisect
+import contextvars
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+# Configuration
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]  # seconds
+LATENCY_BUDGET = 1.0  # seconds; upstream calls slower than this are flagged on the diagnostics page
+RECENT_ERRORS = 50  # exceptions kept for the diagnostics page
+BATCH = "*"  # symbol label for calls covering many symbols (bulk downloads, whole-table selects)
+
+_page = contextvars.ContextVar("page", default="background")
+
+
+def set_page(name):
+    """Label every upstream call made by this script run with the page name"""
+    _page.set(name)
+
+
+def current_page():
+    return _page.get()
+
+
+@contextmanager
+def page_scope(name):
+    """Label calls made inside the block (worker threads, background jobs) with name"""
+    token = _page.set(name)
+    try:
+        yield
+    finally:
+        _page.reset(token)
+
+
+def size_of(value):
+    """Approximate payload size in bytes of an upstream result"""
+    if value is None:
+        return 0
+    if hasattr(value, "memory_usage"):
+        try:
+            usage = value.memory_usage(index=True, deep=True)
+            return int(usage.sum() if hasattr(usage, "sum") else usage)
+        except (TypeError, ValueError):
+            return 0
+    if isinstance(value, dict):
+        return len(repr(value))
+    data = getattr(value, "data", None)  # Supabase APIResponse
+    return len(repr(data)) if data is not None else 0
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus layout)"""
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Estimate by linear interpolation inside the bucket holding the q-th observation"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                low = self.bounds[i - 1] if i else 0.0
+                high = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return low + (high - low) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+
+class SymbolStats:
+    """Totals for one (operation, page, symbol)"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.bytes = 0
+
+
+class Metrics:
+    """Process-wide record of upstream calls and cache lookups.
+
+    Latency histograms are kept per (operation, page); call/error/byte totals per
+    (operation, page, symbol); cache hits and misses per (page, symbol).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.histograms = defaultdict(Histogram)  # (operation, page) -> Histogram
+            self.symbols = defaultdict(SymbolStats)  # (operation, page, symbol) -> SymbolStats
+            self.cache = defaultdict(lambda: [0, 0])  # (page, symbol) -> [hits, misses]
+            self.errors = deque(maxlen=RECENT_ERRORS)  # (time, operation, page, symbol, message)
+
+    def observe(self, operation, symbol, seconds, error=None, nbytes=0, page=None):
+        page = page or current_page()
+        with self._lock:
+            self.histograms[(operation, page)].observe(seconds)
+            stats = self.symbols[(operation, page, symbol)]
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.bytes += nbytes
+            if error is not None:
+                stats.errors += 1
+                self.errors.append((time.time(), operation, page, symbol, f"{type(error).__name__}: {error}"))
+
+    def record_cache(self, symbol, hit, page=None):
+        page = page or current_page()
+        with self._lock:
+            self.cache[(page, symbol)][0 if hit else 1] += 1
+
+    def snapshot(self):
+        """Copies of the current tables, safe to read without the lock"""
+        with self._lock:
+            histograms = {}
+            for key, h in self.histograms.items():
+                copy = Histogram(h.bounds)
+                copy.counts, copy.count, copy.sum = list(h.counts), h.count, h.sum
+                histograms[key] = copy
+            symbols = {key: vars(stats).copy() for key, stats in self.symbols.items()}
+            return {
+                'started': self.started,
+                'histograms': histograms,
+                'symbols': symbols,
+                'cache': {key: tuple(v) for key, v in self.cache.items()},
+                'errors': list(self.errors),
+            }
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """The process-wide metrics registry"""
+    return _metrics
+
+
+def upstream(operation, symbol, func):
+    """Call func() and record its latency, payload size and any exception"""
+    start = time.perf_counter()
+    try:
+        value = func()
+    except Exception as e:
+        _metrics.observe(operation, symbol, time.perf_counter() - start, error=e)
+        raise
+    _metrics.observe(operation, symbol, time.perf_counter() - start, nbytes=size_of(value))
+    return value
+
+
+def _labels(**labels):
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+def prometheus_text(snapshot=None):
+    """Prometheus text exposition format (version 0.0.4) of every metric"""
+    snapshot = snapshot or _metrics.snapshot()
+    lines = [
+        "# HELP nse_upstream_request_duration_seconds Latency of upstream calls.",
+        "# TYPE nse_upstream_request_duration_seconds histogram",
+    ]
+    for (operation, page), h in sorted(snapshot['histograms'].items()):
+        cumulative = 0
+        for bound, n in zip(h.bounds + ["+Inf"], h.counts):
+            cumulative += n
+            lines.append(f"nse_upstream_request_duration_seconds_bucket"
+                         f"{_labels(operation=operation, page=page, le=bound)} {cumulative}")
+        lines.append(f"nse_upstream_request_duration_seconds_sum{_labels(operation=operation, page=page)} {h.sum}")
+        lines.append(f"nse_upstream_request_duration_seconds_count{_labels(operation=operation, page=page)} {h.count}")
+
+    counters = [
+        ("nse_upstream_requests_total", "Upstream calls.", "calls"),
+        ("nse_upstream_errors_total", "Upstream calls that raised.", "errors"),
+        ("nse_upstream_response_bytes_total", "Approximate bytes returned by upstream calls.", "bytes"),
+        ("nse_upstream_seconds_total", "Time spent in upstream calls.", "seconds"),
+    ]
+    for name, help_text, field in counters:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for (operation, page, symbol), stats in sorted(snapshot['symbols'].items()):
+            lines.append(f"{name}{_labels(operation=operation, page=page, symbol=symbol)} {stats[field]}")
+
+    lines += ["# HELP nse_cache_requests_total Market data cache lookups.", "# TYPE nse_cache_requests_total counter"]
+    for (page, symbol), (hits, misses) in sorted(snapshot['cache'].items()):
+        lines.append(f"nse_cache_requests_total{_labels(page=page, symbol=symbol, result='hit')} {hits}")
+        lines.append(f"nse_cache_requests_total{_labels(page=page, symbol=symbol, result='miss')} {misses}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,323 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# Configuration
+BAR_INTERVALS = {"1m": 60, "5m": 300}  # interval -> bar length in seconds
+BARS_KEPT = {"1m": 400, "5m": 80}  # ring buffer capacity per interval (a session is 375 minutes)
+FEED_POLL_SECONDS = 15  # minimum gap between feed polls for the same symbol
+IST_OFFSET = 5 * 60 * 60 + 30 * 60  # seconds east of UTC; NSE sessions never cross IST midnight
+REPLAY_FILE = os.environ.get("NSE_QUOTE_REPLAY")  # serve quotes from this file instead of Yahoo
+REPLAY_SPEED = float(os.environ.get("NSE_QUOTE_REPLAY_SPEED", "1"))  # replay seconds per wall second
+
+BAR_DTYPE = np.dtype([
+    ("time", "i8"),  # bar start, epoch seconds
+    ("Open", "f8"),
+    ("High", "f8"),
+    ("Low", "f8"),
+    ("Close", "f8"),
+    ("Volume", "f8"),
+])
+
+
+def session_day(timestamp):
+    """IST calendar day number of an epoch timestamp"""
+    return int((timestamp + IST_OFFSET) // 86400)
+
+
+class BarRing:
+    """Fixed-capacity ring of OHLCV bars; appending past capacity overwrites the oldest.
+
+    The bar still forming is kept as a plain list and written to the array once
+    the next bar starts, so most updates never touch numpy.
+    """
+
+    def __init__(self, seconds, capacity):
+        self.seconds = seconds
+        self.bars = np.zeros(capacity - 1, dtype=BAR_DTYPE)
+        self.count = 0  # closed bars ever written since the last clear
+        self.current = None  # [start, open, high, low, close, volume]
+
+    def __len__(self):
+        return min(self.count, len(self.bars)) + (self.current is not None)
+
+    def clear(self):
+        self.count = 0
+        self.current = None
+
+    def update(self, timestamp, open_, high, low, close, volume):
+        """Merge a trade (or a slice of a bar) into the bar covering timestamp"""
+        start = int(timestamp) - int(timestamp) % self.seconds
+        current = self.current
+        if current is not None:
+            if start == current[0]:
+                if high > current[2]:
+                    current[2] = high
+                if low < current[3]:
+                    current[3] = low
+                current[4] = close
+                current[5] += volume
+                return
+            if start < current[0]:
+                return  # late print for a bar already closed
+            self.bars[self.count % len(self.bars)] = tuple(current)
+            self.count += 1
+        self.current = [start, open_, high, low, close, volume]
+
+    def to_array(self):
+        """Bars oldest first"""
+        n = min(self.count, len(self.bars))
+        if self.count <= len(self.bars):
+            closed = self.bars[:n]
+        else:
+            head = self.count % len(self.bars)
+            closed = np.concatenate([self.bars[head:], self.bars[:head]])
+        if self.current is None:
+            return closed.copy()
+        return np.concatenate([closed, np.array([tuple(self.current)], dtype=BAR_DTYPE)])
+
+
+class SymbolBars:
+    """Running day statistics and rolling bars for one symbol"""
+
+    def __init__(self, intervals=BAR_INTERVALS, kept=BARS_KEPT):
+        self.rings = {name: BarRing(seconds, kept[name]) for name, seconds in intervals.items()}
+        self.day = None
+        self.prev_close = None
+        self.reset_day(None)
+
+    def reset_day(self, day):
+        if self.day is not None and self.last is not None:
+            self.prev_close = self.last
+        self.day = day
+        self.open = self.high = self.low = self.last = None
+        self.updated = None
+        self.volume = 0.0
+        self.turnover = 0.0
+        for ring in self.rings.values():
+            ring.clear()
+
+    def update(self, timestamp, open_, high, low, close, volume):
+        day = session_day(timestamp)
+        if day != self.day:
+            if self.day is not None and day < self.day:
+                return  # print from an earlier session
+            self.reset_day(day)
+        if self.open is None:
+            self.open, self.high, self.low = open_, high, low
+        else:
+            self.high = max(self.high, high)
+            self.low = min(self.low, low)
+        self.last = close
+        self.updated = max(self.updated or timestamp, timestamp)
+        self.volume += volume
+        self.turnover += (high + low + close) / 3 * volume
+        for ring in self.rings.values():
+            ring.update(timestamp, open_, high, low, close, volume)
+
+    @property
+    def vwap(self):
+        return self.turnover / self.volume if self.volume else self.last
+
+
+class BarEngine:
+    """Process-wide intraday state built incrementally from a quote feed.
+
+    Every update is O(1) per symbol, and so is reading last price, previous
+    close, VWAP and day range; live views read these instead of re-pulling the
+    whole day's bars on each refresh. pump(symbols) polls the feed for anything
+    new, at most once per FEED_POLL_SECONDS per symbol.
+    """
+
+    def __init__(self, feed=None, poll_seconds=FEED_POLL_SECONDS):
+        self.feed = feed
+        self.poll_seconds = poll_seconds
+        self.updates = 0
+        self._symbols = {}  # symbol -> SymbolBars
+        self._polled = {}  # symbol -> monotonic time of the last poll
+        self._lock = threading.Lock()
+
+    def _bars(self, symbol):
+        bars = self._symbols.get(symbol)
+        if bars is None:
+            bars = self._symbols[symbol] = SymbolBars()
+        return bars
+
+    def on_trade(self, symbol, timestamp, price, volume=0.0):
+        self.on_bar(symbol, timestamp, price, price, price, price, volume)
+
+    def on_bar(self, symbol, timestamp, open_, high, low, close, volume=0.0):
+        with self._lock:
+            self._bars(symbol).update(timestamp, open_, high, low, close, volume)
+            self.updates += 1
+
+    def seed_prev_close(self, symbol, prev_close):
+        """Previous session close from daily history (used until the engine sees a rollover)"""
+        with self._lock:
+            bars = self._bars(symbol)
+            if bars.prev_close is None:
+                bars.prev_close = prev_close
+
+    def pump(self, symbols):
+        """Feed every quote published since the last poll of symbols into the engine"""
+        if self.feed is None:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            due = [s for s in dict.fromkeys(symbols) if now - self._polled.get(s, -self.poll_seconds) >= self.poll_seconds]
+            for symbol in due:
+                self._polled[symbol] = now
+        if not due:
+            return 0
+        count = 0
+        for symbol, timestamp, open_, high, low, close, volume in self.feed.poll(due):
+            self.on_bar(symbol, timestamp, open_, high, low, close, volume)
+            count += 1
+        return count
+
+    def quote(self, symbol):
+        """Last price, previous close, change, VWAP and day range, or None before the first print"""
+        with self._lock:
+            bars = self._symbols.get(symbol)
+            if bars is None or bars.last is None:
+                return None
+            prev = bars.prev_close
+            return {
+                "last": bars.last,
+                "prev_close": prev,
+                "change": (bars.last - prev) / prev * 100 if prev else None,
+                "open": bars.open,
+                "day_high": bars.high,
+                "day_low": bars.low,
+                "vwap": bars.vwap,
+                "volume": bars.volume,
+                "updated": bars.updated,
+            }
+
+    def quotes(self, symbols):
+        """quote() for many symbols as a DataFrame indexed by symbol (symbols without prints left out)"""
+        rows = {symbol: self.quote(symbol) for symbol in dict.fromkeys(symbols)}
+        return pd.DataFrame.from_dict({s: q for s, q in rows.items() if q}, orient="index")
+
+    def bars(self, symbol, interval="5m"):
+        """Today's rolling bars for symbol as an OHLCV frame indexed by IST bar start"""
+        with self._lock:
+            bars = self._symbols.get(symbol)
+            array = bars.rings[interval].to_array() if bars else np.zeros(0, dtype=BAR_DTYPE)
+        frame = pd.DataFrame({field: array[field] for field in BAR_DTYPE.names[1:]})
+        frame.index = pd.to_datetime(array["time"], unit="s", utc=True).tz_convert("Asia/Kolkata")
+        return frame
+
+
+class QuoteFeed:
+    """Interface for anything that can supply intraday prints"""
+
+    def poll(self, symbols):
+        """Prints published since the last poll for symbols, as
+        (symbol, epoch seconds, open, high, low, close, volume) tuples, each symbol's in time order"""
+        raise NotImplementedError
+
+
+class ReplayFeed(QuoteFeed):
+    """Replays recorded prints from a CSV with timestamp, symbol, price and volume columns
+    (or open/high/low/close bars in place of price).
+
+    Replay time starts at the first print and advances `speed` seconds per wall
+    second; speed=None releases the whole file on the first poll.
+    """
+
+    def __init__(self, path, speed=REPLAY_SPEED, clock=time.monotonic):
+        frame = pd.read_csv(path)
+        stamps = frame["timestamp"]
+        if not pd.api.types.is_numeric_dtype(stamps):
+            stamps = pd.to_datetime(stamps).map(pd.Timestamp.timestamp)
+        frame["timestamp"] = stamps.astype(float)
+        frame = frame.sort_values("timestamp", kind="stable").reset_index(drop=True)
+        price = frame["price"] if "price" in frame.columns else frame["close"]
+        frame = frame.assign(
+            open=frame.get("open", price), high=frame.get("high", price), low=frame.get("low", price),
+            close=price if "price" in frame.columns else frame["close"],
+            volume=frame["volume"].astype(float) if "volume" in frame.columns else 0.0,
+        )
+        self.start = float(frame["timestamp"].iloc[0]) if len(frame) else 0.0
+        self.prints = {}  # symbol -> (times, rows) in time order
+        for symbol, group in frame.groupby("symbol", sort=False):
+            rows = list(zip(group["symbol"], group["timestamp"], group["open"], group["high"],
+                            group["low"], group["close"], group["volume"]))
+            self.prints[symbol] = (group["timestamp"].to_numpy(), rows)
+        self.speed = speed
+        self.clock = clock
+        self._started = None
+        self._cursor = {}  # symbol -> index of the next print not yet released
+
+    def replay_time(self):
+        if self.speed is None:
+            return float("inf")
+        if self._started is None:
+            self._started = self.clock()
+        return self.start + (self.clock() - self._started) * self.speed
+
+    def poll(self, symbols):
+        now = self.replay_time()
+        prints = []
+        for symbol in symbols:
+            if symbol not in self.prints:
+                continue
+            times, rows = self.prints[symbol]
+            start = self._cursor.get(symbol, 0)
+            end = int(np.searchsorted(times, now, side="right"))
+            prints.extend(rows[start:end])
+            self._cursor[symbol] = end
+        return prints
+
+
+class BarPollFeed(QuoteFeed):
+    """Intraday bars from one bulk download per poll, emitting only what is new.
+
+    `source` is a market_data DataSource. Yahoo has no incremental endpoint, so
+    the request still covers the day, but bars already seen are skipped and the
+    bar still forming is re-sent as a delta (price move and extra volume).
+    """
+
+    def __init__(self, source, interval="1m"):
+        self.source = source
+        self.interval = interval
+        self._seen = {}  # symbol -> (bar start, volume seen) of the last bar emitted
+
+    def poll(self, symbols):
+        frame = self.source.download(symbols, period="1d", interval=self.interval)
+        if frame is None or frame.empty:
+            return []
+        index = pd.DatetimeIndex(frame.index)
+        if index.tz is None:
+            index = index.tz_localize("UTC")
+        all_starts = ((index - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)).to_numpy(dtype=float)
+        fields = frame.columns.get_level_values(0)
+        matrices = {field: frame[field] for field in ("Open", "High", "Low", "Close", "Volume") if field in fields}
+
+        prints = []
+        for symbol in symbols:
+            if symbol not in matrices["Close"].columns:
+                continue
+            columns = {field: m[symbol].to_numpy(dtype=float) for field, m in matrices.items()}
+            valid = ~np.isnan(columns["Close"])
+            last_start, last_volume = self._seen.get(symbol, (None, 0.0))
+            if last_start is not None:
+                valid &= all_starts >= last_start
+            if not valid.any():
+                continue
+            starts = all_starts[valid]
+            volumes = np.nan_to_num(columns["Volume"][valid]) if "Volume" in columns else np.zeros(len(starts))
+            emitted = volumes.copy()
+            if starts[0] == last_start:
+                emitted[0] = max(emitted[0] - last_volume, 0.0)  # the bar still forming last time
+            prints.extend(zip(
+                [symbol] * len(starts), starts,
+                columns["Open"][valid], columns["High"][valid], columns["Low"][valid], columns["Close"][valid],
+                emitted,
+            ))
+            self._seen[symbol] = (starts[-1], volumes[-1])
+        return prints
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from fetch_pool import MAX_IN_FLIGHT
+from market_data import STREAM_CHUNK
+
+# Configuration
+# Index tag -> label; a universe is offered once its constituent list is installed
+# (see universe.CONSTITUENT_FILES)
+BREADTH_UNIVERSES = {
+    "nifty50": "Nifty 50",
+    "nifty100": "Nifty 100",
+    "nifty200": "Nifty 200",
+    "nifty500": "Nifty 500",
+}
+SECTOR_COLUMNS = ["Sector", "Stocks", "Advances", "Declines", "Unchanged", "Advancing (%)",
+                  "Avg Change (%)", "New 52W Highs", "New 52W Lows"]
+
+
+def breadth_chunk_size(count, max_in_flight=MAX_IN_FLIGHT):
+    """Symbols per bulk request so a universe loads in one round of concurrent requests.
+
+    Never below STREAM_CHUNK, so small universes still stream in several pieces.
+    """
+    return max(STREAM_CHUNK, -(-count // max_in_flight))
+
+
+def compute_breadth(summaries, sectors):
+    """Advance/decline counts, new 52W highs/lows and per-sector breadth.
+
+    summaries is a summarize_symbols frame (indexed by symbol) and sectors maps
+    symbol -> sector. A new 52W high/low is a session whose high/low is the
+    52-week extreme; symbols without a day change count towards nothing.
+    """
+    change = summaries["Day %"].to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        flags = pd.DataFrame({
+            "Advances": change > 0,
+            "Declines": change < 0,
+            "Unchanged": change == 0,
+            "New 52W Highs": summaries["Day High"].to_numpy(dtype=float) >= summaries["52W High"].to_numpy(dtype=float),
+            "New 52W Lows": summaries["Day Low"].to_numpy(dtype=float) <= summaries["52W Low"].to_numpy(dtype=float),
+        }, index=summaries.index)
+    flags["Sector"] = [sectors.get(symbol) or "Other" for symbol in summaries.index]
+    flags["Change"] = change
+
+    totals = flags.drop(columns=["Sector", "Change"]).sum().astype(int).to_dict()
+    totals["Stocks"] = len(flags)
+    totals["A/D Ratio"] = totals["Advances"] / totals["Declines"] if totals["Declines"] else float("nan")
+
+    grouped = flags.groupby("Sector", sort=False)
+    by_sector = grouped[["Advances", "Declines", "Unchanged", "New 52W Highs", "New 52W Lows"]].sum().astype(int)
+    by_sector["Stocks"] = grouped.size()
+    by_sector["Avg Change (%)"] = grouped["Change"].mean()
+    counted = by_sector["Advances"] + by_sector["Declines"] + by_sector["Unchanged"]
+    by_sector["Advancing (%)"] = by_sector["Advances"] / counted.where(counted > 0) * 100
+    by_sector = by_sector.reset_index()[SECTOR_COLUMNS]
+    return {"totals": totals, "sectors": by_sector.sort_values("Advancing (%)", ascending=False, kind="stable")}
@@ -0,0 +1,180 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from instrumentation import get_metrics
+from market_calendar import IST, get_calendar, is_nse_symbol
+
+# Configuration
+OPEN_TTL = 60  # seconds, while NSE is trading
+CLOSED_TTL = 6 * 60 * 60  # seconds, after close while end-of-day data may still be revised
+MAX_ENTRIES = 2048
+
+
+def market_ttl(symbol=None, now=None):
+    """Cache lifetime in seconds for symbol (an NSE instrument if None).
+
+    NSE instruments: short while NSE is open, long otherwise (but never past the
+    next open). Once the last session closed more than CLOSED_TTL ago nothing
+    moves until the next open, so weekends and holidays keep data for the whole
+    closure. Everything else (foreign indices, futures, currencies, crypto)
+    trades on its own hours, so it always gets OPEN_TTL.
+    """
+    if symbol is not None and not is_nse_symbol(symbol):
+        return OPEN_TTL
+    calendar = get_calendar()
+    now = now.astimezone(IST) if now else datetime.now(IST)
+    if calendar.is_open(now):
+        return OPEN_TTL
+    until_open = calendar.seconds_until_open(now)
+    if (now - calendar.last_close(now)).total_seconds() >= CLOSED_TTL:
+        return max(OPEN_TTL, until_open)
+    return max(OPEN_TTL, min(CLOSED_TTL, until_open))
+
+
+class _Flight(threading.Event):
+    """An in-flight fetch_once call; set when it finishes, done if it returned"""
+
+    def __init__(self):
+        super().__init__()
+        self.done = False
+        self.value = None
+
+
+class MarketDataCache:
+    """Thread-safe LRU cache with per-entry expiry and single-flight fetching.
+
+    Keys are (symbol, period, interval) tuples; ttl(symbol) gives an entry's lifetime. Concurrent misses for the same key
+    wait on the first caller's fetch instead of hitting upstream themselves.
+    Cached values are shared between sessions and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=market_ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._inflight = {}  # key -> threading.Event (a _Flight for fetch_once)
+        self._lock = threading.Lock()
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def get(self, key, default=None):
+        """Cached value for key, or default if missing/expired"""
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        get_metrics().record_cache(key[0], found)
+        return value if found else default
+
+    def __contains__(self, key):
+        """True if key holds an unexpired value (does not count as a hit or miss)"""
+        with self._lock:
+            return self._lookup(key)[0]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl(key[0]), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_fetch(self, key, fetch, keep=None):
+        """Return the cached value for key, calling fetch() once on a miss.
+
+        If keep is given, a fetched value is only cached when keep(value) is true.
+        """
+        while True:
+            with self._lock:
+                found, value = self._lookup(key)
+                if found:
+                    self.hits += 1
+                    get_metrics().record_cache(key[0], True)
+                    return value
+                waiter = self._inflight.get(key)
+                if waiter is None:
+                    self.misses += 1
+                    get_metrics().record_cache(key[0], False)
+                    waiter = self._inflight[key] = threading.Event()
+                    break
+            # Another thread is fetching this key; wait and re-check
+            waiter.wait()
+
+        try:
+            value = fetch()
+            if keep is None or keep(value):
+                self.put(key, value)
+            return value
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            waiter.set()
+
+    def fetch_once(self, key, fetch):
+        """Call fetch() for a key that is not cached as a whole (e.g. one bulk download),
+        sharing the call and its result with concurrent callers for the same key"""
+        while True:
+            with self._lock:
+                flight = self._inflight.get(key)
+                if flight is None:
+                    flight = self._inflight[key] = _Flight()
+                    break
+            flight.wait()
+            if flight.done:
+                return flight.value
+            # The fetch we waited on failed; try it ourselves
+
+        try:
+            flight.value = fetch()
+            flight.done = True
+            return flight.value
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.set()
+
+    def invalidate(self, symbols=None):
+        """Drop every entry for the given symbols (or everything)"""
+        with self._lock:
+            if symbols is None:
+                self._entries.clear()
+                return
+            symbols = set(symbols)
+            for key in [k for k in self._entries if k[0] in symbols]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+
+_cache = MarketDataCache()
+
+
+def get_cache():
+    """The process-wide market data cache shared by every Streamlit session"""
+    return _cache
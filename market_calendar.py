@@ -0,0 +1,188 @@
+import csv
+import os
+import threading
+from datetime import date, datetime, time, timedelta
+
+import pytz
+
+# Configuration
+IST = pytz.timezone('Asia/Kolkata')
+MARKET_OPEN_TIME = (9, 15)  # 9:15 AM IST
+MARKET_CLOSE_TIME = (15, 30)  # 3:30 PM IST
+CALENDAR_CSV = os.environ.get(
+    "NSE_CALENDAR_CSV",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "nse_calendar.csv")
+)
+CALENDAR_MARGIN_DAYS = 400  # precomputed days on either side of the dates in the file
+NSE_SUFFIXES = (".NS", ".BO")  # NSE and BSE listings, which both trade NSE hours
+NSE_INDEX_PREFIXES = ("^NSE", "^CNX", "^BSESN")  # Indian indices
+
+# Session states
+OPEN, BEFORE_OPEN, AFTER_CLOSE, CLOSED = "open", "before_open", "after_close", "closed"
+
+
+def _clock(value):
+    hour, minute = value.split(":")
+    return time(int(hour), int(minute))
+
+
+def load_exceptions(path=CALENDAR_CSV):
+    """{date: ([(open, close), ...], note)} from the bundled calendar file.
+
+    A row without times is a holiday; rows with times replace that day's regular
+    hours, which covers special weekend sessions, Muhurat trading and half-days
+    alike (a day may have several rows for a split session).
+    """
+    days = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            day = date.fromisoformat(row["date"].strip())
+            windows, note = days.setdefault(day, ([], row.get("note", "").strip()))
+            if row.get("open") and row.get("close"):
+                windows.append((_clock(row["open"]), _clock(row["close"])))
+    return days
+
+
+class MarketCalendar:
+    """NSE trading calendar precomputed day by day, so every lookup is an index into a list.
+
+    Inside the precomputed range (the dates in the calendar file, padded by
+    CALENDAR_MARGIN_DAYS) holidays and special sessions are exact; outside it
+    only weekends are closed.
+    """
+
+    def __init__(self, exceptions=None, margin_days=CALENDAR_MARGIN_DAYS):
+        self.exceptions = load_exceptions() if exceptions is None else exceptions
+        known = list(self.exceptions) or [datetime.now(IST).date()]
+        self.first = min(known) - timedelta(days=margin_days)
+        self.last = max(known) + timedelta(days=margin_days)
+        days = (self.last - self.first).days + 1
+
+        self._sessions = []  # day index -> [(open datetime, close datetime), ...]
+        for i in range(days):
+            self._sessions.append(self._build_sessions(self.first + timedelta(days=i)))
+        # Day index -> index of the nearest trading day strictly before/after it (None past the ends)
+        self._prev, self._next = [None] * days, [None] * days
+        last = None
+        for i in range(days):
+            self._prev[i] = last
+            if self._sessions[i]:
+                last = i
+        last = None
+        for i in reversed(range(days)):
+            self._next[i] = last
+            if self._sessions[i]:
+                last = i
+
+    def _build_sessions(self, day):
+        if day in self.exceptions:
+            windows = self.exceptions[day][0]
+        elif day.weekday() >= 5:
+            windows = []
+        else:
+            windows = [(time(*MARKET_OPEN_TIME), time(*MARKET_CLOSE_TIME))]
+        return [(IST.localize(datetime.combine(day, o)), IST.localize(datetime.combine(day, c))) for o, c in windows]
+
+    def _index(self, day):
+        i = (day - self.first).days
+        return i if 0 <= i < len(self._sessions) else None
+
+    def sessions(self, day):
+        """Trading windows on day as (open, close) IST datetimes; empty when closed"""
+        i = self._index(day)
+        return self._sessions[i] if i is not None else self._build_sessions(day)
+
+    def is_trading_day(self, day):
+        return bool(self.sessions(day))
+
+    def note(self, day):
+        """Why day is special (holiday or special session name), or '' for a regular day"""
+        entry = self.exceptions.get(day)
+        return entry[1] if entry else ""
+
+    def previous_trading_day(self, day):
+        """Nearest trading day strictly before day"""
+        i = self._index(day)
+        if i is not None and self._prev[i] is not None:
+            return self.first + timedelta(days=self._prev[i])
+        day -= timedelta(days=1)
+        while not self.is_trading_day(day):
+            day -= timedelta(days=1)
+        return day
+
+    def next_trading_day(self, day):
+        """Nearest trading day strictly after day"""
+        i = self._index(day)
+        if i is not None and self._next[i] is not None:
+            return self.first + timedelta(days=self._next[i])
+        day += timedelta(days=1)
+        while not self.is_trading_day(day):
+            day += timedelta(days=1)
+        return day
+
+    def _now(self, now):
+        return now.astimezone(IST) if now else datetime.now(IST)
+
+    def session_state(self, now=None):
+        """OPEN, BEFORE_OPEN / AFTER_CLOSE (a trading day, outside its hours) or CLOSED"""
+        now = self._now(now)
+        sessions = self.sessions(now.date())
+        if not sessions:
+            return CLOSED
+        if any(o <= now <= c for o, c in sessions):
+            return OPEN
+        return BEFORE_OPEN if now < sessions[-1][0] else AFTER_CLOSE
+
+    def is_open(self, now=None):
+        return self.session_state(now) == OPEN
+
+    def last_trading_day(self, now=None):
+        """Most recent day whose first session has started (today once the bell has rung)"""
+        now = self._now(now)
+        sessions = self.sessions(now.date())
+        if sessions and now >= sessions[0][0]:
+            return now.date()
+        return self.previous_trading_day(now.date())
+
+    def next_open(self, now=None):
+        """Start of the next session after now (now itself while a session is open)"""
+        now = self._now(now)
+        for o, c in self.sessions(now.date()):
+            if o <= now <= c:
+                return now
+            if o > now:
+                return o
+        return self.sessions(self.next_trading_day(now.date()))[0][0]
+
+    def last_close(self, now=None):
+        """End of the most recent session that closed at or before now"""
+        now = self._now(now)
+        for o, c in reversed(self.sessions(now.date())):
+            if c <= now:
+                return c
+        return self.sessions(self.previous_trading_day(now.date()))[-1][1]
+
+    def seconds_until_open(self, now=None):
+        """0 while a session is open"""
+        now = self._now(now)
+        return max(0.0, (self.next_open(now) - now).total_seconds())
+
+
+def is_nse_symbol(symbol):
+    """True if symbol trades on the NSE calendar (as opposed to a foreign index, future,
+    currency or crypto pair)"""
+    return symbol.endswith(NSE_SUFFIXES) or symbol.startswith(NSE_INDEX_PREFIXES)
+
+
+_calendar = None
+_calendar_lock = threading.Lock()
+
+
+def get_calendar():
+    """The process-wide NSE calendar, built from CALENDAR_CSV on first use"""
+    global _calendar
+    if _calendar is None:
+        with _calendar_lock:
+            if _calendar is None:
+                _calendar = MarketCalendar()
+    return _calendar
@@ -0,0 +1,299 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+import yfinance as yf
+
+from market_cache import get_cache
+from market_calendar import IST
+from history_store import get_store, tail_period
+from analytics import compute_frame_metrics, compute_metrics
+from fetch_pool import fetch_iter
+from instrumentation import BATCH, upstream
+from intraday import REPLAY_FILE, BarEngine, BarPollFeed, ReplayFeed
+
+OHLCV_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+STREAM_CHUNK = 8  # symbols per bulk request when results are streamed to the page
+
+
+class DataSource:
+    """Interface for anything that can supply OHLCV history"""
+
+    def history(self, symbol, period="1y", interval="1d"):
+        """Return a single-symbol OHLCV frame indexed by date"""
+        raise NotImplementedError
+
+    def download(self, symbols, period="1y", interval="1d"):
+        """Return a wide (field, symbol) OHLCV frame for many symbols"""
+        frames = {}
+        for symbol in symbols:
+            hist = self.history(symbol, period=period, interval=interval)
+            if hist is not None and not hist.empty:
+                frames[symbol] = hist
+        return combine_frames(frames)
+
+
+class YahooDataSource(DataSource):
+    """Live data from Yahoo Finance"""
+
+    def history(self, symbol, period="1y", interval="1d"):
+        # Unadjusted like download(): both paths write into the same history store
+        return upstream("yf.history", symbol, lambda: yf.Ticker(symbol).history(
+            period=period, interval=interval, auto_adjust=False))
+
+    def download(self, symbols, period="1y", interval="1d"):
+        symbols = list(symbols)
+        if not symbols:
+            return pd.DataFrame()
+        frame = upstream("yf.download", BATCH, lambda: yf.download(
+            symbols,
+            period=period,
+            interval=interval,
+            group_by="column",
+            auto_adjust=False,
+            progress=False,
+            threads=True,
+        ))
+        return normalize_download(frame, symbols)
+
+
+class FixtureDataSource(DataSource):
+    """Serves recorded OHLCV frames, either from a dict or from <dir>/<symbol>.csv"""
+
+    def __init__(self, frames=None, directory=None):
+        self.frames = dict(frames or {})
+        self.directory = directory
+
+    def history(self, symbol, period="1y", interval="1d"):
+        if symbol not in self.frames and self.directory:
+            path = os.path.join(self.directory, f"{symbol}.csv")
+            if os.path.exists(path):
+                self.frames[symbol] = pd.read_csv(path, index_col=0, parse_dates=True)
+        hist = self.frames.get(symbol)
+        return hist.copy() if hist is not None else pd.DataFrame(columns=OHLCV_FIELDS)
+
+
+class CachedDataSource(DataSource):
+    """Serves history from the process-wide market data cache, fetching misses from `inner`"""
+
+    def __init__(self, inner, cache=None):
+        self.inner = inner
+        self.cache = cache or get_cache()
+
+    def history(self, symbol, period="1y", interval="1d"):
+        # An empty frame is usually a failed or throttled request: never keep it
+        return self.cache.get_or_fetch(
+            (symbol, period, interval),
+            lambda: self.inner.history(symbol, period=period, interval=interval),
+            keep=lambda hist: hist is not None and not hist.empty,
+        )
+
+    def download(self, symbols, period="1y", interval="1d"):
+        frames, missing = {}, []
+        for symbol in dict.fromkeys(symbols):
+            hist = self.cache.get((symbol, period, interval))
+            if hist is None or hist.empty:
+                missing.append(symbol)
+            else:
+                frames[symbol] = hist
+
+        if missing:
+            # One bulk request for every symbol not already cached, shared by every
+            # session that misses on the same symbols at the same time
+            def fetch_missing():
+                wide = self.inner.download(missing, period=period, interval=interval)
+                fetched = {}
+                for symbol in missing:
+                    fetched[symbol] = split_symbol(wide, symbol)
+                    if not fetched[symbol].empty:
+                        self.cache.put((symbol, period, interval), fetched[symbol])
+                return fetched
+
+            frames.update(self.cache.fetch_once(("download", tuple(missing), period, interval), fetch_missing))
+
+        return combine_frames({symbol: hist for symbol, hist in frames.items() if not hist.empty})
+
+
+class StoredDataSource(DataSource):
+    """Serves daily bars from the on-disk history store, fetching only the missing tail from `inner`.
+
+    Intraday intervals are passed straight through to `inner`.
+    """
+
+    def __init__(self, inner, store=None):
+        self.inner = inner
+        self.store = store or get_store()
+
+    def _fetch_period(self, symbol, period):
+        """Period to request upstream for symbol, or None if the store already has it"""
+        if not self.store.covers(symbol, period):
+            return period
+        if self.store.is_fresh(symbol):
+            return None
+        last = self.store.last_date(symbol)
+        return tail_period(last) if last else period
+
+    def history(self, symbol, period="1y", interval="1d"):
+        if interval != "1d":
+            return self.inner.history(symbol, period=period, interval=interval)
+        fetch_period = self._fetch_period(symbol, period)
+        if fetch_period:
+            self.store.write(symbol, self.inner.history(symbol, period=fetch_period, interval=interval), fetch_period)
+        return self.store.read(symbol, period)
+
+    def download(self, symbols, period="1y", interval="1d"):
+        if interval != "1d":
+            return self.inner.download(symbols, period=period, interval=interval)
+        symbols = list(dict.fromkeys(symbols))
+
+        # Group symbols by how much history they are missing: one bulk request per group
+        groups = {}
+        for symbol in symbols:
+            fetch_period = self._fetch_period(symbol, period)
+            if fetch_period:
+                groups.setdefault(fetch_period, []).append(symbol)
+        for fetch_period, group in groups.items():
+            wide = self.inner.download(group, period=fetch_period, interval=interval)
+            for symbol in group:
+                self.store.write(symbol, split_symbol(wide, symbol), fetch_period)
+
+        frames = {symbol: self.store.read(symbol, period) for symbol in symbols}
+        return combine_frames({symbol: hist for symbol, hist in frames.items() if not hist.empty})
+
+
+_data_source = CachedDataSource(StoredDataSource(YahooDataSource()))
+
+
+def get_data_source():
+    """Return the data source used by the app"""
+    return _data_source
+
+
+def set_data_source(source):
+    """Swap the data source (e.g. a FixtureDataSource in tests)"""
+    global _data_source
+    _data_source = source
+
+
+# Live 1-minute bars go straight to Yahoo: the engine itself is the intraday cache
+_bar_engine = BarEngine(ReplayFeed(REPLAY_FILE) if REPLAY_FILE else BarPollFeed(YahooDataSource()))
+
+
+def get_bar_engine():
+    """Return the intraday bar engine used by live views"""
+    return _bar_engine
+
+
+def set_quote_feed(feed):
+    """Swap the feed behind the bar engine (e.g. a ReplayFeed in tests)"""
+    _bar_engine.feed = feed
+
+
+def combine_frames(frames):
+    """Join per-symbol OHLCV frames into one wide (field, symbol) frame"""
+    if not frames:
+        return pd.DataFrame()
+    wide = pd.concat(
+        {symbol: hist[[c for c in OHLCV_FIELDS if c in hist.columns]] for symbol, hist in frames.items()},
+        axis=1,
+    )
+    return wide.swaplevel(0, 1, axis=1).sort_index(axis=1)
+
+
+def normalize_download(frame, symbols):
+    """Make sure a yf.download result always has (field, symbol) columns"""
+    if frame is None or frame.empty:
+        return pd.DataFrame()
+    if not isinstance(frame.columns, pd.MultiIndex):
+        frame = pd.concat({symbols[0]: frame}, axis=1).swaplevel(0, 1, axis=1)
+    return frame.dropna(how="all")
+
+
+def split_symbol(frame, symbol):
+    """Single-symbol OHLCV frame out of a wide (field, symbol) frame"""
+    if frame is None or frame.empty or symbol not in frame.columns.get_level_values(1):
+        return pd.DataFrame(columns=OHLCV_FIELDS)
+    return frame.xs(symbol, axis=1, level=1).dropna(how="all")
+
+
+def fetch_history(symbols, period="1y", interval="1d"):
+    """Fetch one wide OHLCV frame for all symbols in a single bulk request"""
+    return get_data_source().download(symbols, period=period, interval=interval)
+
+
+def compute_watchlist_metrics(frame):
+    """Day/Week/Month change and 52W range for every symbol in a wide frame"""
+    columns = ["Price", "Day %", "Week %", "Month %", "52W High", "52W Low"]
+    if frame is None or frame.empty:
+        return pd.DataFrame(columns=columns)
+    return compute_frame_metrics(frame)[columns].dropna(subset=["Price"])
+
+
+def summarize_symbols(symbols, market_open=False):
+    """Price, period changes and 52W range for many symbols from one bulk 1y daily download.
+
+    During market hours the last price and day range come from the intraday bar
+    engine; every other figure is a slice of the daily series. Returns a
+    DataFrame indexed by symbol (symbols with fewer than two bars are dropped).
+    """
+    columns = ["Price", "Prev Close", "Day %", "Week %", "Month %", "Day High", "Day Low", "52W High", "52W Low"]
+    symbols = list(dict.fromkeys(symbols))
+    frame = fetch_history(symbols, period="1y")
+    if frame is None or frame.empty:
+        return pd.DataFrame(columns=columns)
+
+    closes, highs, lows = frame["Close"].copy(), frame["High"].copy(), frame["Low"].copy()
+    if "Volume" in frame.columns.get_level_values(0):
+        closes = closes.where(frame["Volume"] != 0)
+
+    if market_open:
+        live = live_quotes(closes)
+        if not live.empty:
+            prices = live["last"]
+            today = pd.Timestamp(datetime.fromtimestamp(live["updated"].max(), IST).date())
+            if closes.index.tz is not None:
+                today = today.tz_localize(closes.index.tz)
+            # Today's daily bar may not be published yet
+            for matrix in (closes, highs, lows):
+                if today not in matrix.index:
+                    matrix.loc[today] = float("nan")
+            closes.loc[today, prices.index] = prices.values
+            highs.loc[today, prices.index] = highs.loc[today, prices.index].fillna(live["day_high"]).clip(lower=live["day_high"]).values
+            lows.loc[today, prices.index] = lows.loc[today, prices.index].fillna(live["day_low"]).clip(upper=live["day_low"]).values
+
+    metrics = compute_metrics(closes, highs=highs, lows=lows)
+    return metrics[columns][closes.notna().sum() >= 2]
+
+
+def live_quotes(closes):
+    """Bar engine quotes for the symbols (columns) of a daily close matrix.
+
+    Brings the engine up to date with one feed poll and seeds each symbol's
+    previous close from the last daily bar before today.
+    """
+    engine = get_bar_engine()
+    symbols = list(closes.columns)
+    engine.pump(symbols)
+    quotes = engine.quotes(symbols)
+    if quotes.empty:
+        return quotes
+    today = datetime.now(IST).date()
+    dates = closes.index.tz_localize(None) if closes.index.tz is not None else closes.index
+    before = closes[dates.date < today].ffill()
+    if not before.empty:
+        for symbol in quotes.index[quotes["prev_close"].isna()]:
+            if pd.notna(before[symbol].iloc[-1]):
+                engine.seed_prev_close(symbol, float(before[symbol].iloc[-1]))
+    return engine.quotes(symbols)
+
+
+def iter_summaries(symbols, market_open=False, chunk_size=STREAM_CHUNK):
+    """summarize_symbols over chunks of symbols fetched concurrently.
+
+    Yields (chunk, summaries, error) as each chunk completes, fastest first, so
+    a page can show the first rows while slow symbols are still loading.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    chunks = [tuple(symbols[i:i + chunk_size]) for i in range(0, len(symbols), chunk_size)]
+    yield from fetch_iter(lambda chunk: summarize_symbols(chunk, market_open=market_open), chunks)
+
@@ -0,0 +1,120 @@
+import csv
+import os
+import shutil
+import time
+
+import requests
+
+from fetch_pool import fetch_all
+from instrumentation import upstream
+
+# Configuration
+ARCHIVES_URL = os.environ.get("NSE_ARCHIVES_URL", "https://nsearchives.nseindia.com/content")  # "" disables downloads
+ARCHIVES_HOST = "nsearchives.nseindia.com"
+LISTS_DIR = os.environ.get(
+    "NSE_LISTS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".market_data", "nse_lists")
+)
+# List name -> path under ARCHIVES_URL (NSE's download names)
+LISTS = {
+    "equities": "equities/EQUITY_L.csv",
+    "etfs": "equities/eq_etfseclist.csv",
+    "nifty50": "indices/ind_nifty50list.csv",
+    "nifty100": "indices/ind_nifty100list.csv",
+    "nifty200": "indices/ind_nifty200list.csv",
+    "nifty500": "indices/ind_nifty500list.csv",
+}
+SYMBOL_LISTS = ["equities", "etfs"]  # the lists the symbol master is built from
+INDEX_LISTS = ["nifty50", "nifty100", "nifty200", "nifty500"]  # constituent lists, named by universe tag
+REFRESH_SECONDS = 7 * 24 * 3600  # new listings and delistings are picked up within a week
+REQUEST_TIMEOUT = 30
+# NSE rejects requests that don't look like they come from a browser
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept": "text/csv,*/*",
+}
+
+
+def list_path(name, directory=LISTS_DIR):
+    return os.path.join(directory, os.path.basename(LISTS[name]))
+
+
+def downloaded(name, directory=LISTS_DIR):
+    """Path of the cached copy of a list (None if it was never downloaded)"""
+    path = list_path(name, directory)
+    return path if os.path.exists(path) else None
+
+
+def is_stale(name, directory=LISTS_DIR, max_age=REFRESH_SECONDS):
+    try:
+        return time.time() - os.path.getmtime(list_path(name, directory)) > max_age
+    except OSError:
+        return True
+
+
+def fetch_list(name, directory=LISTS_DIR):
+    """Download one list into directory, replacing the cached copy only with a valid CSV"""
+    url = f"{ARCHIVES_URL}/{LISTS[name]}"
+    response = upstream("nse.list", name, lambda: requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT))
+    response.raise_for_status()
+    text = response.content.decode("utf-8-sig")
+    header = next(csv.reader([text.split("\n", 1)[0]]), [])
+    # A blocked request gets an HTML page with status 200
+    if "symbol" not in (column.strip().lower() for column in header):
+        raise ValueError(f"{url} did not return a symbol list")
+
+    os.makedirs(directory, exist_ok=True)
+    path = list_path(name, directory)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    os.replace(tmp, path)
+    return path
+
+
+def refresh_lists(names, directory=LISTS_DIR, max_age=REFRESH_SECONDS):
+    """Download the lists among names that are missing or older than max_age.
+
+    Returns (refreshed, errors): the names downloaded and {name: exception} for
+    the ones that failed, whose cached copies are kept as they were.
+    """
+    if not ARCHIVES_URL:
+        return [], {}
+    names = [name for name in names if is_stale(name, directory, max_age)]
+    results, errors = fetch_all(lambda name: fetch_list(name, directory), names, host=ARCHIVES_HOST)
+    return list(results), errors
+
+
+def write_symbol_master(path, rows):
+    """Write rows of (symbol, name, type, popularity) in the bundled CSV format"""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["symbol", "name", "type", "popularity"])
+        for symbol, name, kind, popularity in rows:
+            writer.writerow([symbol, name, kind, f"{popularity:g}"])
+    os.replace(tmp, path)
+
+
+def main():
+    """Regenerate the bundled symbol master and index constituent files from freshly
+    downloaded lists (run from the repo root:  python -m nse_lists)"""
+    from symbol_master import SYMBOLS_CSV, load_symbol_master
+    from universe import CONSTITUENTS_DIR
+
+    _, errors = refresh_lists(LISTS, max_age=0)
+    for name, error in errors.items():
+        raise SystemExit(f"Could not download the {name} list: {error}")
+    rows = load_symbol_master()
+    write_symbol_master(SYMBOLS_CSV, rows)
+    print(f"{SYMBOLS_CSV}: {len(rows)} symbols")
+    os.makedirs(CONSTITUENTS_DIR, exist_ok=True)
+    for name in INDEX_LISTS:
+        path = os.path.join(CONSTITUENTS_DIR, os.path.basename(LISTS[name]))
+        shutil.copyfile(list_path(name), path)
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+from instrumentation import LATENCY_BUDGET, get_metrics, prometheus_text, set_page
+from market_cache import get_cache
+
+OVER_BUDGET_STYLE = 'background-color: #FFEBEE; color: #B71C1C;'
+
+def latency_table(snapshot):
+    """One row per (operation, page): call count and latency percentiles in ms"""
+    rows = []
+    for (operation, page), h in snapshot['histograms'].items():
+        rows.append({
+            'Operation': operation,
+            'Page': page,
+            'Calls': h.count,
+            'Mean (ms)': h.sum / h.count * 1000,
+            'p50 (ms)': h.quantile(0.50) * 1000,
+            'p95 (ms)': h.quantile(0.95) * 1000,
+            'p99 (ms)': h.quantile(0.99) * 1000,
+        })
+    df = pd.DataFrame(rows)
+    return df.sort_values('p95 (ms)', ascending=False) if not df.empty else df
+
+def _symbol_row():
+    return {'Calls': 0, 'Errors': 0, 'Total (s)': 0.0, 'Max (ms)': 0.0, 'KB': 0.0, 'Cache Hits': 0, 'Cache Misses': 0}
+
+def symbol_table(snapshot):
+    """One row per (page, symbol): upstream totals plus cache hits/misses"""
+    rows = {}
+    for (operation, page, symbol), stats in snapshot['symbols'].items():
+        row = rows.setdefault((page, symbol), _symbol_row())
+        row['Calls'] += stats['calls']
+        row['Errors'] += stats['errors']
+        row['Total (s)'] += stats['seconds']
+        row['Max (ms)'] = max(row['Max (ms)'], stats['max_seconds'] * 1000)
+        row['KB'] += stats['bytes'] / 1024
+    for (page, symbol), (hits, misses) in snapshot['cache'].items():
+        row = rows.setdefault((page, symbol), _symbol_row())
+        row['Cache Hits'] = hits
+        row['Cache Misses'] = misses
+    if not rows:
+        return pd.DataFrame()
+    df = pd.DataFrame.from_dict(rows, orient='index')
+    df.index = df.index.set_names(['Page', 'Symbol'])
+    df = df.reset_index()
+    lookups = df['Cache Hits'] + df['Cache Misses']
+    df['Hit Rate (%)'] = (df['Cache Hits'] / lookups.where(lookups > 0) * 100)
+    return df.sort_values(['Total (s)', 'Errors'], ascending=False)
+
+def over_budget(values, budget_ms=LATENCY_BUDGET * 1000):
+    """Highlight latencies above the budget"""
+    return [OVER_BUDGET_STYLE if v > budget_ms else '' for v in values]
+
+def main():
+    st.set_page_config(page_title="Diagnostics", layout="wide")
+    set_page("diagnostics")
+
+    st.title("🩺 Diagnostics")
+    metrics = get_metrics()
+    snapshot = metrics.snapshot()
+    st.caption(f"Since {datetime.fromtimestamp(snapshot['started']).strftime('%d %b %Y %H:%M:%S')} • "
+               f"latency budget {LATENCY_BUDGET * 1000:,.0f} ms per upstream call")
+
+    col1, col2 = st.columns([1, 5])
+    with col1:
+        if st.button("🔄 Refresh"):
+            st.rerun()
+    with col2:
+        if st.button("🧹 Reset metrics"):
+            metrics.reset()
+            st.rerun()
+
+    # Headline numbers
+    calls = sum(s['calls'] for s in snapshot['symbols'].values())
+    errors = sum(s['errors'] for s in snapshot['symbols'].values())
+    cache = get_cache().stats()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Upstream calls", f"{calls:,}")
+    c2.metric("Upstream errors", f"{errors:,}")
+    c3.metric("Cache hit rate", f"{cache['hit_rate'] * 100:.1f}%")
+    c4.metric("Cache entries", f"{cache['entries']:,} / {cache['max_entries']:,}")
+
+    st.subheader("Latency by Operation and Page")
+    latency = latency_table(snapshot)
+    if latency.empty:
+        st.info("No upstream calls recorded yet.")
+    else:
+        st.dataframe(
+            latency.style.format(precision=1).apply(over_budget, subset=['p50 (ms)', 'p95 (ms)', 'p99 (ms)']),
+            hide_index=True, use_container_width=True
+        )
+
+    st.subheader("Symbols by Upstream Time")
+    symbols = symbol_table(snapshot)
+    if not symbols.empty:
+        st.dataframe(
+            symbols.style.format(precision=1).apply(over_budget, subset=['Max (ms)']),
+            hide_index=True, use_container_width=True
+        )
+
+    st.subheader("Recent Errors")
+    if snapshot['errors']:
+        st.dataframe(pd.DataFrame(
+            [(datetime.fromtimestamp(t).strftime('%H:%M:%S'), op, page, symbol, message)
+             for t, op, page, symbol, message in reversed(snapshot['errors'])],
+            columns=['Time', 'Operation', 'Page', 'Symbol', 'Error']
+        ), hide_index=True, use_container_width=True)
+    else:
+        st.success("No upstream errors recorded.")
+
+    st.subheader("Prometheus Exposition")
+    text = prometheus_text(snapshot)
+    st.download_button("⬇️ Download metrics.txt", text, file_name="metrics.txt", mime="text/plain")
+    with st.expander("Show raw metrics"):
+        st.code(text, language="text")
+
+if __name__ == "__main__":
+    main()
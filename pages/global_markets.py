@@ -1,8 +1,10 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 from datetime import datetime
 from supabase_helper import get_watchlist  # Only if you need watchlist functionality
+from formatting import format_numbers, change_class_html, day_range_html, html_table
+from universe import get_market_quotes, get_universe
+from instrumentation import set_page
 
 # Initialize session states (if needed)
 if 'watchlist' not in st.session_state:
@@ -51,118 +53,56 @@ def show_footer():
         </div>
     """, unsafe_allow_html=True)
 
-# Function to format numbers with 2 decimal places
-def format_number(x, is_currency=False, is_percent=False):
-    try:
-        x = float(x)
-        if is_percent:
-            return f"{x:+.2f}%"
-        if is_currency:
-            return f"${x:,.2f}" if x >= 100 else f"${x:,.4f}"
-        return f"{x:,.2f}"
-    except (ValueError, TypeError):
-        return str(x)
-
-# Function to get market data
+# Page sections, in display order: catalogue group -> universe tag
+CATEGORIES = {
+    "Global Indices": "global",
+    "Commodities": "commodity",
+    "Indian Sectors": "sector",
+    "Cryptocurrencies": "crypto",
+    "Currencies": "currency"
+}
+
+# Function to build market data rows from the shared market snapshot
+def build_market_data(quotes):
+    universe = get_universe()
+    sections = {category: universe.tagged(tag) for category, tag in CATEGORIES.items()}
+    symbols = [i.symbol for instruments in sections.values() for i in instruments]
+    metrics = quotes.select(symbols).frame(index=True)
+
+    all_data, failed = [], {}
+    for category, instruments in sections.items():
+        for instrument in instruments:
+            symbol, name = instrument.symbol, instrument.label
+            if symbol not in metrics.index or pd.isna(metrics.loc[symbol, "Price"]):
+                failed[name] = "no price data"
+                continue
+            row = metrics.loc[symbol]
+            all_data.append({
+                "Category": category,
+                "Name": name,
+                "Symbol": symbol,
+                "Price": row["Price"],
+                "Change (%)": row["Intraday %"],
+                "Day Range": f"{row['Day Low']:.2f} - {row['Day High']:.2f}"
+            })
+
+    return {'df': pd.DataFrame(all_data), 'errors': failed}
+
+# Function to get market data from the snapshot shared with the other pages
 def get_market_data():
-    # Major Global Indices with country flags and full names
-    global_indices = {
-        "🇮🇳 NIFTY 50 (India)": "^NSEI",
-        "🇮🇳 SENSEX (India)": "^BSESN",
-        "🇮🇳 NIFTY BANK (India)": "^NSEBANK",
-        "🇺🇸 NASDAQ (United States)": "^IXIC",
-        "🇺🇸 S&P 500 (United States)": "^GSPC",
-        "🇺🇸 DOW JONES (United States)": "^DJI",
-        "🇬🇧 FTSE 100 (United Kingdom)": "^FTSE",
-        "🇩🇪 DAX (Germany)": "^GDAXI",
-        "🇫🇷 CAC 40 (France)": "^FCHI",
-        "🇯🇵 NIKKEI 225 (Japan)": "^N225",
-        "🇭🇰 HANG SENG (Hong Kong)": "^HSI",
-        "🇨🇳 SHANGHAI COMP (China)": "000001.SS"
-    }
-
-    # Commodities with more details
-    commodities = {
-        "🟡 GOLD (COMEX)": "GC=F",
-        "⚪ SILVER (COMEX)": "SI=F",
-        "🛢️ CRUDE OIL (WTI)": "CL=F",
-        "🛢️ BRENT CRUDE": "BZ=F",
-        "💨 NATURAL GAS": "NG=F",
-        "🟠 COPPER": "HG=F"
-    }
-
-    # Indian Sectoral Indices with more sectors
-    indian_sectors = {
-        "💻 NIFTY IT": "^CNXIT",
-        "🚗 NIFTY AUTO": "^CNXAUTO",
-        "🏦 NIFTY BANK": "^CNXBANK",
-        "💰 NIFTY FIN SERVICE": "^CNXFIN",
-        "🛒 NIFTY FMCG": "^CNXFMCG",
-        "🎬 NIFTY MEDIA": "^CNXMEDIA",
-        "🏗️ NIFTY METAL": "^CNXMETAL",
-        "💊 NIFTY PHARMA": "^CNXPHARMA",
-        "🏛️ NIFTY PSU BANK": "^CNXPSUBANK",
-        "🏢 NIFTY REALTY": "^CNXREALTY"
-    }
-
-    # Cryptocurrencies with more coins
-    cryptocurrencies = {
-        "₿ BITCOIN": "BTC-USD",
-        "Ξ ETHEREUM": "ETH-USD",
-        "🅱️ BNB": "BNB-USD",
-        "✕ XRP": "XRP-USD",
-        "◎ SOLANA": "SOL-USD"
-    }
-
-    # Currency pairs
-    currencies = {
-        "💵 USD/INR": "INR=X",
-        "💶 EUR/INR": "EURINR=X",
-        "💷 GBP/INR": "GBPINR=X",
-        "💴 JPY/INR": "JPYINR=X"
-    }
-
-    # Get all data
-    all_data = []
-    
-    def fetch_data(category, items):
-        for name, symbol in items.items():
-            try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period="1d")
-                if not hist.empty:
-                    current = hist["Close"][-1]
-                    previous = hist["Open"][0] if "Open" in hist.columns else hist["Close"][0]
-                    change = ((current - previous) / previous) * 100 if previous != 0 else 0
-                    
-                    # Handle potential missing columns
-                    day_low = hist["Low"][-1] if "Low" in hist.columns else current
-                    day_high = hist["High"][-1] if "High" in hist.columns else current
-                    day_range = f"{day_low:.2f} - {day_high:.2f}"
-                    
-                    all_data.append({
-                        "Category": category,
-                        "Name": name,
-                        "Symbol": symbol,
-                        "Price": current,
-                        "Change (%)": change,
-                        "Day Range": day_range
-                    })
-            except Exception as e:
-                st.warning(f"Could not load {name}: {str(e)}")
-
-    # Fetch all categories
-    fetch_data("Global Indices", global_indices)
-    fetch_data("Commodities", commodities)
-    fetch_data("Indian Sectors", indian_sectors)
-    fetch_data("Cryptocurrencies", cryptocurrencies)
-    fetch_data("Currencies", currencies)
-
-    return pd.DataFrame(all_data)
+    snapshot = get_market_quotes()
+    if snapshot.value is None:
+        st.warning(f"Could not load market data: {str(snapshot.error)}")
+        return pd.DataFrame(columns=["Category", "Name", "Symbol", "Price", "Change (%)", "Day Range"])
+    market_data = build_market_data(snapshot.value)
+    for name, error in market_data['errors'].items():
+        st.warning(f"Could not load {name}: {error}")
+    return market_data['df']
 
 # Main page function
 def main():
     st.set_page_config(page_title="Global Market Dashboard", layout="wide")
+    set_page("global_markets")
     
     # Show header
     show_header()
@@ -212,31 +152,17 @@ def main():
         display_df = df.copy()
         
         # Format the Price column
-        display_df["Price"] = display_df["Price"].apply(lambda x: f"{currency_symbol}{format_number(x)}")
+        display_df["Price"] = format_numbers(display_df["Price"], prefix=currency_symbol)
         
         # Format the Change (%) column with color
-        def format_change(x):
-            try:
-                x = float(x)
-                color = "positive" if x >= 0 else "negative"
-                return f"<span class='{color}'>{format_number(x, is_percent=True)}</span>"
-            except:
-                return str(x)
-        
-        display_df["Change (%)"] = display_df["Change (%)"].apply(format_change)
+        display_df["Change (%)"] = change_class_html(display_df["Change (%)"])
         
         # Format the Day Range column with two colors
-        def format_day_range(x):
-            if isinstance(x, str) and ' - ' in x:
-                low, high = x.split(' - ')
-                return f"<span class='day-range-low'>{low}</span> - <span class='day-range-high'>{high}</span>"
-            return x
-        
-        display_df["Day Range"] = display_df["Day Range"].apply(format_day_range)
+        display_df["Day Range"] = day_range_html(display_df["Day Range"])
         
         # Display the HTML table
         st.markdown(
-            display_df[["Name", "Price", "Change (%)", "Day Range"]].to_html(escape=False, index=False),
+            html_table(display_df[["Name", "Price", "Change (%)", "Day Range"]]),
             unsafe_allow_html=True
         )
     
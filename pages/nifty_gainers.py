@@ -1,235 +1,236 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-from datetime import datetime, timedelta
-import pytz
+from market_data import iter_summaries
+from market_calendar import get_calendar
+from quote_snapshot import QuoteSnapshot
+from formatting import change_arrow_html, format_numbers, html_table
+from refresh_scheduler import get_scheduler
+from instrumentation import set_page
+from market_cache import get_cache
+from history_store import get_store
+from universe import get_universe, refresh_nse_lists
+from nse_lists import REFRESH_SECONDS
+from market_breadth import BREADTH_UNIVERSES, breadth_chunk_size, compute_breadth
 
 # Configuration
-IST = pytz.timezone('Asia/Kolkata')
-MARKET_OPEN_TIME = (9, 15)  # 9:15 AM IST
-MARKET_CLOSE_TIME = (15, 30)  # 3:30 PM IST
 ROWS_PER_PAGE = 10
-
-# Complete Nifty 50 stocks with symbols
-NIFTY_50_STOCKS = {
-    'ADANI PORTS': 'ADANIPORTS.NS',
-    'ASIAN PAINT': 'ASIANPAINT.NS',
-    'AXIS BANK': 'AXISBANK.NS',
-    'BAJAJ AUTO': 'BAJAJ-AUTO.NS',
-    'BAJAJ FINSV': 'BAJAJFINSV.NS',
-    'BAJAJ FINANCE': 'BAJFINANCE.NS',
-    'BHARTI AIRTEL': 'BHARTIARTL.NS',
-    'BPCL': 'BPCL.NS',
-    'BRITANNIA': 'BRITANNIA.NS',
-    'CIPLA': 'CIPLA.NS',
-    'COAL INDIA': 'COALINDIA.NS',
-    'DIVIS LAB': 'DIVISLAB.NS',
-    'DR. REDDYS': 'DRREDDY.NS',
-    'EICHER MOTORS': 'EICHERMOT.NS',
-    'GRASIM': 'GRASIM.NS',
-    'HCL TECH': 'HCLTECH.NS',
-    'HDFC BANK': 'HDFCBANK.NS',
-    'HDFC LIFE': 'HDFCLIFE.NS',
-    'HERO MOTOCORP': 'HEROMOTOCO.NS',
-    'HINDALCO': 'HINDALCO.NS',
-    'HINDUNILVR': 'HINDUNILVR.NS',
-    'ICICI BANK': 'ICICIBANK.NS',
-    'INDUSIND BANK': 'INDUSINDBK.NS',
-    'INFOSYS': 'INFY.NS',
-    'ITC': 'ITC.NS',
-    'JSW STEEL': 'JSWSTEEL.NS',
-    'KOTAK BANK': 'KOTAKBANK.NS',
-    'LT': 'LT.NS',
-    'M&M': 'M&M.NS',
-    'MARUTI': 'MARUTI.NS',
-    'NESTLE': 'NESTLEIND.NS',
-    'NTPC': 'NTPC.NS',
-    'ONGC': 'ONGC.NS',
-    'POWERGRID': 'POWERGRID.NS',
-    'RELIANCE': 'RELIANCE.NS',
-    'SBILIFE': 'SBILIFE.NS',
-    'SBIN': 'SBIN.NS',
-    'SUN PHARMA': 'SUNPHARMA.NS',
-    'TATA CONSUMER': 'TATACONSUM.NS',
-    'TATA MOTORS': 'TATAMOTORS.NS',
-    'TATA STEEL': 'TATASTEEL.NS',
-    'TCS': 'TCS.NS',
-    'TECH MAHINDRA': 'TECHM.NS',
-    'TITAN': 'TITAN.NS',
-    'ULTRATECH CEMENT': 'ULTRACEMCO.NS',
-    'UPL': 'UPL.NS',
-    'WIPRO': 'WIPRO.NS'
-}
+SORT_COLUMNS = ['Daily Change (%)', 'Weekly Change (%)', 'Monthly Change (%)']
+RANKINGS = {"Top gainers": True, "Top losers": False}  # label -> descending
+DEFAULT_UNIVERSE = "nifty50"  # constituent tag in the shared universe catalogue
 
 # Initialize session state for pagination
 if 'page_number' not in st.session_state:
     st.session_state.page_number = 0
-if 'df' not in st.session_state:
-    st.session_state.df = None
-
-def is_market_open():
-    """Check if market is currently open in IST"""
-    now_ist = datetime.now(IST)
-    if now_ist.weekday() >= 5:  # Weekend
-        return False
-    market_open = now_ist.replace(hour=MARKET_OPEN_TIME[0], minute=MARKET_OPEN_TIME[1], second=0, microsecond=0)
-    market_close = now_ist.replace(hour=MARKET_CLOSE_TIME[0], minute=MARKET_CLOSE_TIME[1], second=0, microsecond=0)
-    return market_open <= now_ist <= market_close
-
-def get_last_trading_day():
-    """Get the most recent trading day (skips weekends)"""
-    day = datetime.now(IST)
-    for i in range(1, 6):  # Check up to 5 days back
-        prev_day = day - timedelta(days=i)
-        if prev_day.weekday() < 5:  # Monday-Friday
-            return prev_day
-    return day  # fallback
-
-def safe_float(value, default=0.0):
-    """Safely convert to float with fallback"""
-    try:
-        return float(value)
-    except (TypeError, ValueError):
-        return default
-
-def format_change(value):
-    """Format percentage change with color"""
-    if value is None:
-        return "N/A"
-    value = safe_float(value)
-    color = "green" if value >= 0 else "red"
-    arrow = "↑" if value >= 0 else "↓"
-    return f"<span style='color: {color}'>{arrow} {abs(value):.2f}%</span>"
-
-def format_price(value):
-    """Format price with INR symbol"""
-    if value is None:
-        return "N/A"
-    return f"₹{safe_float(value):,.2f}"
 
-def get_paginated_data(df, page_number, rows_per_page):
-    """Return a slice of data for the current page"""
+def format_change(values):
+    """Format a column of percentage changes with color"""
+    return change_arrow_html(values)
+
+def format_price(values):
+    """Format a column of prices with INR symbol"""
+    return format_numbers(values, prefix="₹")
+
+def reset_page():
+    st.session_state.page_number = 0
+
+def rank_quotes(view, sort_by, descending=True, min_move=0.0):
+    """Rows moving at least min_move % in the ranking's direction (all rows when 0)"""
+    if not min_move:
+        return view
+    if descending:
+        return view.between(sort_by, minimum=min_move)
+    return view.between(sort_by, maximum=-min_move)
+
+def get_paginated_data(view, page_number, rows_per_page, sort_by, descending=True):
+    """Return the rows of a quote view for the current page, ranked by sort_by.
+    
+    Only the rows up to the end of the page are ranked (partial selection), so
+    early pages of a large universe never sort the whole view.
+    """
     start_idx = page_number * rows_per_page
     end_idx = start_idx + rows_per_page
-    return df.iloc[start_idx:end_idx]
-
-def load_all_data():
-    """Load data for all stocks"""
-    data = []
-    progress_bar = st.progress(0)
-    total_stocks = len(NIFTY_50_STOCKS)
-    
-    for i, (name, symbol) in enumerate(NIFTY_50_STOCKS.items()):
-        try:
-            ticker = yf.Ticker(symbol)
-            
-            if is_market_open():
-                # During market hours - get current price and previous close separately
-                current_data = ticker.history(period="1d", interval="5m")
-                if current_data.empty:
-                    continue
-                current_price = safe_float(current_data.iloc[-1]['Close'])
-                
-                # Get previous day's close separately
-                prev_data = ticker.history(period="2d")
-                if len(prev_data) < 2:
-                    continue
-                prev_close = safe_float(prev_data.iloc[-2]['Close'])
+    return view.top(sort_by, end_idx, descending, start=start_idx)
+
+def nifty_row(name, symbol, summary):
+    return {
+        'Company': name,
+        'Symbol': symbol,
+        'Current Price': summary['Price'],
+        'Daily Change (%)': summary['Day %'],
+        'Weekly Change (%)': summary['Week %'],
+        'Monthly Change (%)': summary['Month %'],
+        '52-Week High': summary['52W High'],
+        '52-Week Low': summary['52W Low']
+    }
+
+def available_universes():
+    """{tag: label} for the BREADTH_UNIVERSES whose constituent list is installed"""
+    universe = get_universe()
+    return {tag: label for tag, label in BREADTH_UNIVERSES.items() if universe.tagged(tag)}
+
+def stream_nifty_data(tag=DEFAULT_UNIVERSE, on_update=None):
+    """Summaries and market breadth for every constituent of an index, fetched in
+    concurrent chunks (one round of bulk requests, however large the index).
+    
+    After each chunk lands, on_update(df) gets every row so far in index order,
+    so rows never jump around as slower chunks fill in the gaps.
+    """
+    instruments = get_universe().tagged(tag)
+    symbols = [i.symbol for i in instruments]
+    names = {i.symbol: i.name for i in instruments}
+    rows, failed, frames = {}, {}, []
+    for chunk, summaries, error in iter_summaries(symbols, market_open=get_calendar().is_open(),
+                                                  chunk_size=breadth_chunk_size(len(symbols))):
+        for symbol in chunk:
+            if error is not None:
+                failed[symbol] = str(error)
+            elif symbol in summaries.index:
+                rows[symbol] = nifty_row(names[symbol], symbol, summaries.loc[symbol])
             else:
-                # When market is closed
-                current_data = ticker.history(period="5d")
-                trading_days = current_data[current_data['Volume'] > 0]
-                if trading_days.empty:
-                    continue
-                current_price = safe_float(trading_days.iloc[-1]['Close'])
-                prev_close = safe_float(trading_days.iloc[-2]['Close'] if len(trading_days) > 1 else trading_days.iloc[-1]['Open'])
-            
-            # Calculate daily change
-            day_change = ((current_price - prev_close) / prev_close) * 100 if prev_close != 0 else 0
-            
-            # Get 52-week data
-            yearly_data = ticker.history(period="1y")
-            high_52w = yearly_data['High'].max() if not yearly_data.empty else None
-            low_52w = yearly_data['Low'].min() if not yearly_data.empty else None
-            
-            # Get weekly change (5 trading days)
-            weekly_data = ticker.history(period="5d")
-            week_change = ((current_price - weekly_data.iloc[0]['Close']) / weekly_data.iloc[0]['Close']) * 100 if not weekly_data.empty and len(weekly_data) > 1 else None
-            
-            # Get monthly change (1 month)
-            monthly_data = ticker.history(period="1mo")
-            month_change = ((current_price - monthly_data.iloc[0]['Close']) / monthly_data.iloc[0]['Close']) * 100 if not monthly_data.empty and len(monthly_data) > 1 else None
-            
-            data.append({
-                'Company': name,
-                'Current Price': current_price,
-                'Daily Change (%)': day_change,
-                'Weekly Change (%)': week_change,
-                'Monthly Change (%)': month_change,
-                '52-Week High': high_52w,
-                '52-Week Low': low_52w
-            })
-            
-        except Exception as e:
-            st.error(f"Error processing {name}: {str(e)}")
-            continue
-            
-        progress_bar.progress((i + 1) / total_stocks)
-    
-    return pd.DataFrame(data) if data else None
+                failed[symbol] = "no price data"
+        if error is None and not summaries.empty:
+            frames.append(summaries)
+        if on_update and rows:
+            on_update(pd.DataFrame([rows[s] for s in symbols if s in rows]))
+    
+    data = [rows[s] for s in symbols if s in rows]
+    errors = {names[symbol]: failed[symbol] for symbol in symbols if symbol in failed}
+    quotes = QuoteSnapshot.from_frame(pd.DataFrame(data), 'Symbol', labels=['Company']) if data else None
+    breadth = compute_breadth(pd.concat(frames), {i.symbol: i.group for i in instruments}) if frames else None
+    return {'quotes': quotes, 'breadth': breadth, 'errors': errors}
+
+def build_nifty_data(tag=DEFAULT_UNIVERSE):
+    """Summaries for every constituent (runs on the background refresh scheduler)"""
+    return stream_nifty_data(tag)
+
+def load_all_data(tag=DEFAULT_UNIVERSE, force=False, on_update=None):
+    """Latest {'quotes': QuoteSnapshot, 'breadth': ...} for an index, shared read-only by
+    every session (one scheduler job per index, named by its tag).
+    
+    With no snapshot yet (or on refresh) the rows are streamed to on_update as
+    they arrive and the finished table becomes the shared snapshot.
+    """
+    scheduler = get_scheduler()
+    snapshot = None if force else scheduler.snapshot(tag)
+    if snapshot is None:
+        if force:
+            symbols = get_universe().symbols(tag)
+            get_cache().invalidate(symbols)
+            get_store().expire(symbols)
+        value = stream_nifty_data(tag, on_update)
+        scheduler.publish(tag, lambda: build_nifty_data(tag), value)
+    else:
+        value = snapshot.value
+    
+    if value is None or value['quotes'] is None:
+        return None
+    for name, error in value['errors'].items():
+        st.error(f"Error processing {name}: {error}")
+    return value
+
+def render_table(df):
+    """HTML table for a slice of the Nifty data"""
+    display_df = df.copy()
+    display_df['Current Price'] = format_price(display_df['Current Price'])
+    display_df['Daily Change (%)'] = format_change(display_df['Daily Change (%)'])
+    display_df['Weekly Change (%)'] = format_change(display_df['Weekly Change (%)'])
+    display_df['Monthly Change (%)'] = format_change(display_df['Monthly Change (%)'])
+    display_df['52-Week High'] = format_price(display_df['52-Week High'])
+    display_df['52-Week Low'] = format_price(display_df['52-Week Low'])
+    return html_table(display_df[[
+        'Company', 'Current Price', 'Daily Change (%)',
+        'Weekly Change (%)', 'Monthly Change (%)',
+        '52-Week High', '52-Week Low'
+    ]])
+
+def display_breadth(breadth):
+    """Advance/decline and 52W high/low counts, then breadth by sector"""
+    totals = breadth['totals']
+    cols = st.columns(6)
+    cols[0].metric("Advances", totals['Advances'])
+    cols[1].metric("Declines", totals['Declines'])
+    cols[2].metric("Unchanged", totals['Unchanged'])
+    cols[3].metric("A/D Ratio", f"{totals['A/D Ratio']:.2f}" if pd.notna(totals['A/D Ratio']) else "N/A")
+    cols[4].metric("New 52W Highs", totals['New 52W Highs'])
+    cols[5].metric("New 52W Lows", totals['New 52W Lows'])
+    
+    st.subheader("Sector Breadth")
+    st.dataframe(
+        breadth['sectors'].style.format({"Advancing (%)": "{:.0f}%", "Avg Change (%)": "{:+.2f}%"}, na_rep="N/A"),
+        use_container_width=True,
+        hide_index=True
+    )
 
 def main():
     st.set_page_config(
-        page_title="Nifty 50 Dashboard",
+        page_title="Nifty Dashboard",
         layout="wide",
         initial_sidebar_state="expanded"
     )
+    set_page("nifty_gainers")
+    # NSE's constituent lists are downloaded in the background; an index shows up once its list has landed
+    get_scheduler().register("nse_lists", refresh_nse_lists, lambda: REFRESH_SECONDS)
     
-    st.title("📊 Nifty 50 Market Dashboard")
+    # Which index to cover; every universe is one shared snapshot, loaded in one round of bulk requests
+    universes = available_universes()
+    tag = st.sidebar.selectbox("Universe", list(universes), format_func=universes.get,
+                               key="universe", on_change=reset_page)
+    st.title(f"📊 {universes[tag]} Market Dashboard")
     
     # Market status
-    market_open = is_market_open()
-    last_trading_day = get_last_trading_day()
+    calendar = get_calendar()
     
-    if market_open:
+    if calendar.is_open():
         st.success("✅ **Market Status:** OPEN (Live data)")
     else:
+        last_trading_day = calendar.last_trading_day()
+        next_open = calendar.next_open()
         st.warning(f"""
         ⚠️ **Market Status:** CLOSED  
-        📅 **Last trading day:** {last_trading_day.strftime('%A, %d %B %Y')}
+        📅 **Last trading day:** {last_trading_day.strftime('%A, %d %B %Y')}  
+        🔔 **Next session:** {next_open.strftime('%A, %d %B %Y %H:%M')} IST
         """)
     
-    # Load data only if not already loaded or refresh requested
-    if st.button("🔄 Refresh Data") or st.session_state.df is None:
-        with st.spinner("Loading market data..."):
-            st.session_state.df = load_all_data()
-            st.session_state.page_number = 0  # Reset to first page on refresh
+    # Ranking controls; only these settings live in the session, never the rows
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        sort_by = st.selectbox("Sort by", SORT_COLUMNS, key="sort_by", on_change=reset_page)
+    with col2:
+        descending = RANKINGS[st.radio("Show", list(RANKINGS), key="ranking", horizontal=True, on_change=reset_page)]
+    with col3:
+        min_move = st.number_input("Min move (%)", min_value=0.0, step=0.5, key="min_move", on_change=reset_page)
+    
+    # Read the shared snapshot; a cold start or refresh streams rows in as they load
+    refresh = st.button("🔄 Refresh Data")
+    table = st.empty()
+    with st.spinner("Loading market data..."):
+        value = load_all_data(
+            tag,
+            force=refresh,
+            on_update=lambda df: table.markdown(render_table(
+                df.sort_values(sort_by, ascending=not descending, kind="stable").head(ROWS_PER_PAGE)
+            ), unsafe_allow_html=True)
+        )
+    if refresh:
+        st.session_state.page_number = 0  # Reset to first page on refresh
     
-    if st.session_state.df is None:
+    if value is None:
         st.error("No data available. Please try again later.")
         return
+    quotes = value['quotes']
+    
+    # Market breadth mode: A/D, new highs/lows and sector breadth above the ranked table
+    if st.toggle("Market breadth", key="breadth_mode") and value['breadth'] is not None:
+        display_breadth(value['breadth'])
     
-    # Get paginated data
-    total_pages = (len(st.session_state.df) // ROWS_PER_PAGE) + (1 if len(st.session_state.df) % ROWS_PER_PAGE else 0)
-    paginated_df = get_paginated_data(st.session_state.df, st.session_state.page_number, ROWS_PER_PAGE)
+    # Get paginated data; only this page's rows are ever turned into a DataFrame
+    view = rank_quotes(quotes.view(), sort_by, descending, min_move)
+    total_pages = max(1, (len(view) // ROWS_PER_PAGE) + (1 if len(view) % ROWS_PER_PAGE else 0))
+    st.session_state.page_number = min(st.session_state.page_number, total_pages - 1)
+    paginated = get_paginated_data(view, st.session_state.page_number, ROWS_PER_PAGE, sort_by, descending)
     
     # Display the table
-    display_df = paginated_df.copy()
-    display_df['Current Price'] = display_df['Current Price'].apply(format_price)
-    display_df['Daily Change (%)'] = display_df['Daily Change (%)'].apply(format_change)
-    display_df['Weekly Change (%)'] = display_df['Weekly Change (%)'].apply(format_change)
-    display_df['Monthly Change (%)'] = display_df['Monthly Change (%)'].apply(format_change)
-    display_df['52-Week High'] = display_df['52-Week High'].apply(format_price)
-    display_df['52-Week Low'] = display_df['52-Week Low'].apply(format_price)
-    
-    st.markdown(
-        display_df[[
-            'Company', 'Current Price', 'Daily Change (%)',
-            'Weekly Change (%)', 'Monthly Change (%)',
-            '52-Week High', '52-Week Low'
-        ]].to_html(escape=False, index=False),
-        unsafe_allow_html=True
-    )
+    table.markdown(render_table(paginated.frame()), unsafe_allow_html=True)
     
     # Pagination controls at the bottom
     st.markdown("---")
@@ -246,7 +247,7 @@ def main():
             st.rerun()
     
     with col3:
-        st.markdown(f"**Page {st.session_state.page_number + 1} of {total_pages} | Showing {len(paginated_df)} stocks**")
+        st.markdown(f"**Page {st.session_state.page_number + 1} of {total_pages} | Showing {len(paginated)} of {len(view)} stocks**")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
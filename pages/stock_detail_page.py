@@ -1,10 +1,22 @@
 import streamlit as st
 import yfinance as yf
+import numpy as np
 import pandas as pd
+import time
 from datetime import datetime
+from fetch_pool import fetch_all
+from fundamentals_store import get_fundamentals_store
+from instrumentation import set_page, upstream
+from market_cache import get_cache
+from market_data import get_data_source
+from prefetcher import get_prefetcher
+from reference_store import get_reference_store
+from refresh_scheduler import get_scheduler
+from universe import get_universe
 
 # Configuration
 st.set_page_config(page_title="Stock Analysis Dashboard", layout="wide")
+set_page("stock_detail")
 
 # Custom CSS
 st.markdown("""
@@ -55,59 +67,8 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Nifty 50 stocks with symbols
-NIFTY_50 = {
-    'RELIANCE': 'RELIANCE.NS',
-    'TCS': 'TCS.NS',
-    'HDFC BANK': 'HDFCBANK.NS',
-    'ICICI BANK': 'ICICIBANK.NS',
-    'HUL': 'HINDUNILVR.NS',
-    'INFOSYS': 'INFY.NS',
-    'ITC': 'ITC.NS',
-    'SBIN': 'SBIN.NS',
-    'BHARTI AIRTEL': 'BHARTIARTL.NS',
-    'LT': 'LT.NS',
-    'KOTAK BANK': 'KOTAKBANK.NS',
-    'HDFC': 'HDFC.NS',
-    'ASIAN PAINT': 'ASIANPAINT.NS',
-    'DMART': 'DMART.NS',
-    'ULTRACEMCO': 'ULTRACEMCO.NS',
-    'BAJFINANCE': 'BAJFINANCE.NS',
-    'WIPRO': 'WIPRO.NS',
-    'ONGC': 'ONGC.NS',
-    'NTPC': 'NTPC.NS',
-    'NESTLE': 'NESTLEIND.NS',
-    'TITAN': 'TITAN.NS',
-    'ADANI PORTS': 'ADANIPORTS.NS',
-    'M&M': 'M&M.NS',
-    'SUN PHARMA': 'SUNPHARMA.NS',
-    'BAJAJ AUTO': 'BAJAJ-AUTO.NS',
-    'TATA STEEL': 'TATASTEEL.NS',
-    'POWERGRID': 'POWERGRID.NS',
-    'JSW STEEL': 'JSWSTEEL.NS',
-    'AXIS BANK': 'AXISBANK.NS',
-    'TECHM': 'TECHM.NS',
-    'HCLTECH': 'HCLTECH.NS',
-    'GRASIM': 'GRASIM.NS',
-    'BRITANNIA': 'BRITANNIA.NS',
-    'EICHERMOT': 'EICHERMOT.NS',
-    'DIVISLAB': 'DIVISLAB.NS',
-    'DRREDDY': 'DRREDDY.NS',
-    'CIPLA': 'CIPLA.NS',
-    'UPL': 'UPL.NS',
-    'BAJAJFINSV': 'BAJAJFINSV.NS',
-    'MARUTI': 'MARUTI.NS',
-    'COALINDIA': 'COALINDIA.NS',
-    'TATAMOTORS': 'TATAMOTORS.NS',
-    'BPCL': 'BPCL.NS',
-    'INDUSINDBK': 'INDUSINDBK.NS',
-    'HEROMOTOCO': 'HEROMOTOCO.NS',
-    'HINDALCO': 'HINDALCO.NS',
-    'TATACONSUM': 'TATACONSUM.NS',
-    'SHREECEM': 'SHREECEM.NS',
-    'SBILIFE': 'SBILIFE.NS',
-    'HDFCLIFE': 'HDFCLIFE.NS'
-}
+# Nifty 50 stocks from the shared universe catalogue
+NIFTY_50 = get_universe().names("nifty50")
 
 def format_number(value, decimal_places=2, is_currency=False, is_percentage=False, in_cr=False):
     """Format numbers with specified decimal places and optional formatting"""
@@ -125,47 +86,123 @@ def format_number(value, decimal_places=2, is_currency=False, is_percentage=Fals
     except:
         return str(value)
 
+def _ticker(attribute):
+    """Loader reading one yf.Ticker attribute, recorded as an upstream call"""
+    return lambda stock, symbol: upstream(f"yf.{attribute}", symbol, lambda: getattr(stock, attribute))
+
+def _statement(name, attribute):
+    """Loader for a financial statement, served from disk until a new reporting period is due"""
+    fetch = _ticker(attribute)
+    return lambda stock, symbol: get_fundamentals_store().get_or_fetch(symbol, name, lambda: fetch(stock, symbol))
+
+def _info(stock, symbol):
+    """Ticker.info for the price and valuation figures; its static fields also refresh the reference store"""
+    info = _ticker('info')(stock, symbol)
+    if info.get('longName'):
+        get_reference_store().put({symbol: info})
+    return info
+
+# Every dataset the page can show, fetched independently
+DATASETS = {
+    'info': _info,
+    'hist': lambda stock, symbol: get_data_source().history(symbol, period="1y"),
+    'financials': _statement('financials', 'financials'),
+    'balance_sheet': _statement('balance_sheet', 'balance_sheet'),
+    'cashflow': _statement('cashflow', 'cashflow'),
+    'quarterly_results': _statement('quarterly_results', 'quarterly_financials'),
+    'major_holders': _ticker('major_holders'),
+}
+
+class StockDetails:
+    """Lazy view of one stock's datasets: each is fetched on first access and cached on its own"""
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.stock = yf.Ticker(symbol)
+        self.timings = {}  # dataset -> seconds spent fetching it (cache hits add nothing)
+
+    def _fetch(self, name):
+        start = time.perf_counter()
+        try:
+            return DATASETS[name](self.stock, self.symbol)
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+    def __getitem__(self, name):
+        return get_cache().get_or_fetch((self.symbol, 'detail', name), lambda: self._fetch(name))
+
+    def load(self, *names):
+        """Fetch the given datasets concurrently; raises the first error"""
+        results, errors = fetch_all(lambda name: self[name], names)
+        if errors:
+            raise next(iter(errors.values()))
+        return [results[name] for name in names]
+
 def get_stock_details(symbol):
-    """Get comprehensive stock details from Yahoo Finance"""
-    try:
-        stock = yf.Ticker(symbol)
-        info = stock.info
-        hist = stock.history(period="1y")
-        financials = stock.financials
-        balance_sheet = stock.balance_sheet
-        cashflow = stock.cashflow
-        quarterly_results = stock.quarterly_financials
-        major_holders = stock.major_holders
-        institutional_holders = stock.institutional_holders
-        
-        return {
-            'info': info,
-            'hist': hist,
-            'financials': financials,
-            'balance_sheet': balance_sheet,
-            'cashflow': cashflow,
-            'quarterly_results': quarterly_results,
-            'major_holders': major_holders,
-            'institutional_holders': institutional_holders
-        }
-    except Exception as e:
-        st.error(f"Error fetching data: {str(e)}")
-        return None
+    """Lazy dataset loader for symbol, kept for the session so its timings accumulate"""
+    details = st.session_state.get('stock_details')
+    if details is None or details.symbol != symbol:
+        details = st.session_state.stock_details = StockDetails(symbol)
+    return details
+
+# Speculative prefetch of likely next selections
+OVERVIEW_DATASETS = ('info', 'hist')
+PREFETCH_NEIGHBOURS = 2  # selectbox entries on each side of the current one
+PREFETCH_MOVERS = 3  # biggest Nifty 50 movers, either direction
+
+def warm_overview(symbol):
+    """Fetch what the Overview needs for symbol into the shared cache (runs on the prefetcher)"""
+    details = StockDetails(symbol)
+    return [details[name] for name in OVERVIEW_DATASETS]
+
+def prefetch_candidates(selected_name, current_symbol):
+    """Likely next selections, best first: selectbox neighbours, watchlist, today's top movers"""
+    names = list(NIFTY_50)
+    i = names.index(selected_name)
+    candidates = []
+    for step in range(1, PREFETCH_NEIGHBOURS + 1):
+        candidates += [NIFTY_50[names[j]] for j in (i + step, i - step) if 0 <= j < len(names)]
+    candidates += st.session_state.get('watchlist', [])
+    
+    snapshot = get_scheduler().snapshot('nifty50')
+    quotes = snapshot.value['quotes'] if snapshot is not None and snapshot.value else None
+    if quotes is not None:
+        changes = np.nan_to_num(np.abs(quotes.column('Daily Change (%)')), nan=-1)
+        movers = np.argsort(-changes, kind="stable")[:PREFETCH_MOVERS]
+        symbols = quotes.symbols
+        candidates += [symbols[i] for i in movers]
+    
+    cache = get_cache()
+    return [symbol for symbol in dict.fromkeys(candidates)
+            if symbol != current_symbol and not all((symbol, 'detail', name) in cache for name in OVERVIEW_DATASETS)]
 
-def display_company_info(info):
-    """Display company description and key points"""
+def prefetch_likely_stocks(selected_name, current_symbol):
+    """Warm the cache for likely next selections in the background"""
+    get_prefetcher().schedule(
+        (symbol, lambda symbol=symbol: warm_overview(symbol))
+        for symbol in prefetch_candidates(selected_name, current_symbol)
+    )
+
+def display_load_timings(details):
+    """Per-dataset fetch times for the current stock"""
+    if details.timings:
+        with st.expander("⏱️ Data load timings"):
+            st.caption(" • ".join(f"{name}: {seconds * 1000:,.0f} ms" for name, seconds in details.timings.items()))
+
+def display_company_info(profile, info):
+    """Display company description (static reference fields) and key points"""
     st.subheader("About the Company")
-    st.write(info.get('longBusinessSummary', 'No description available.'))
+    st.write(profile.get('longBusinessSummary', 'No description available.'))
     
     st.subheader("Key Business Highlights")
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown(f"""
-        - **Sector**: {info.get('sector', 'N/A')}
-        - **Industry**: {info.get('industry', 'N/A')}
-        - **Employees**: {format_number(info.get('fullTimeEmployees'))}
-        - **Country**: {info.get('country', 'N/A')}
+        - **Sector**: {profile.get('sector', 'N/A')}
+        - **Industry**: {profile.get('industry', 'N/A')}
+        - **Employees**: {format_number(profile.get('fullTimeEmployees'))}
+        - **Country**: {profile.get('country', 'N/A')}
         """)
     
     with col2:
@@ -426,66 +463,93 @@ def main():
     # Search bar
     col1, col2 = st.columns([3, 1])
     with col1:
-        search_query = st.selectbox("Search for a stock:", list(NIFTY_50.keys()), index=0)
+        symbols = list(NIFTY_50.values())
+        current = symbols.index(st.session_state.selected_stock) if st.session_state.selected_stock in symbols else 0
+        search_query = st.selectbox("Search for a stock:", list(NIFTY_50.keys()), index=current)
     with col2:
         if st.button("Analyze"):
             st.session_state.selected_stock = NIFTY_50[search_query]
             st.rerun()
     
-    # Get stock data
-    with st.spinner("Fetching stock data..."):
-        stock_data = get_stock_details(st.session_state.selected_stock)
+    # Only the header and Overview are needed for first paint
+    stock_data = get_stock_details(st.session_state.selected_stock)
+    try:
+        with st.spinner("Fetching stock data..."):
+            info, hist = stock_data.load('info', 'hist')
+    except Exception as e:
+        st.error(f"Error fetching data: {str(e)}")
+        return
     
-    if stock_data:
-        info = stock_data['info']
-        hist = stock_data['hist']
+    if info:
+        # Company description and classification from the reference store; info is for prices
+        profile = get_reference_store().get(st.session_state.selected_stock) or info
         
         # Display stock header
         st.markdown(f"""
         <div class="stock-header">
-            <h1>{info.get('shortName', info.get('longName', 'N/A'))}</h1>
+            <h1>{profile.get('shortName', profile.get('longName', 'N/A'))}</h1>
             <h3>{format_number(info.get('currentPrice'), is_currency=True)} 
                 <span style="font-size: 18px; color: {'#4CAF50' if info.get('currentPrice', 0) >= info.get('previousClose', 1) else '#F44336'}">
                 {format_number(((info.get('currentPrice', 0) - info.get('previousClose', 1)) / info.get('previousClose', 1) * 100), is_percentage=True)} 
                 ({format_number(info.get('currentPrice', 0) - info.get('previousClose', 1), is_currency=True)})
                 </span>
             </h3>
-            <p>{info.get('sector', 'N/A')} • {info.get('industry', 'N/A')} • {info.get('country', 'N/A')}</p>
+            <p>{profile.get('sector', 'N/A')} • {profile.get('industry', 'N/A')} • {profile.get('country', 'N/A')}</p>
         </div>
         """, unsafe_allow_html=True)
         
-        # Main tabs
-        tab1, tab2, tab3, tab4, tab5 = st.tabs(["Overview", "Valuation", "Financials", "Holders", "Charts"])
+        # Main tabs; only the open tab runs, so its datasets are fetched on first visit
+        tab1, tab2, tab3, tab4, tab5 = st.tabs(["Overview", "Valuation", "Financials", "Holders", "Charts"],
+                                               key="detail_tab", on_change="rerun")
         
-        with tab1:
-            display_company_info(info)
-            display_pros_cons(info)
-            
-            st.subheader("Price Information")
-            display_price_info(info, hist)
+        if tab1.open:
+            with tab1:
+                display_company_info(profile, info)
+                display_pros_cons(info)
+                
+                st.subheader("Price Information")
+                display_price_info(info, hist)
         
-        with tab2:
-            display_valuation_metrics(info)
-            display_performance_metrics(info)
+        if tab2.open:
+            with tab2:
+                display_valuation_metrics(info)
+                display_performance_metrics(info)
         
-        with tab3:
-            display_quarterly_results(stock_data['quarterly_results'])
-            display_financial_statements(stock_data['financials'], 
-                                      stock_data['balance_sheet'], 
-                                      stock_data['cashflow'])
+        if tab3.open:
+            with tab3:
+                try:
+                    with st.spinner("Fetching financial statements..."):
+                        quarterly_results, financials, balance_sheet, cashflow = stock_data.load(
+                            'quarterly_results', 'financials', 'balance_sheet', 'cashflow')
+                    display_quarterly_results(quarterly_results)
+                    display_financial_statements(financials, balance_sheet, cashflow)
+                except Exception as e:
+                    st.error(f"Error fetching financial statements: {str(e)}")
         
-        with tab4:
-            display_shareholding_pattern(stock_data['major_holders'])
+        if tab4.open:
+            with tab4:
+                try:
+                    with st.spinner("Fetching shareholding..."):
+                        major_holders = stock_data['major_holders']
+                    display_shareholding_pattern(major_holders)
+                except Exception as e:
+                    st.error(f"Error fetching shareholding: {str(e)}")
         
-        with tab5:
-            if not hist.empty:
-                st.subheader("Price Chart (1 Year)")
-                st.line_chart(hist['Close'])
-                
-                st.subheader("Volume Chart")
-                st.bar_chart(hist['Volume'])
-            else:
-                st.warning("No historical data available")
+        if tab5.open:
+            with tab5:
+                if not hist.empty:
+                    st.subheader("Price Chart (1 Year)")
+                    st.line_chart(hist['Close'])
+                    
+                    st.subheader("Volume Chart")
+                    st.bar_chart(hist['Volume'])
+                else:
+                    st.warning("No historical data available")
+        
+        display_load_timings(stock_data)
+    
+    # Only after the page has painted
+    prefetch_likely_stocks(search_query, st.session_state.selected_stock)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
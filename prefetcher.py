@@ -0,0 +1,88 @@
+import threading
+import time
+import traceback
+from collections import OrderedDict
+
+from fetch_pool import RateLimiter, in_flight
+from instrumentation import page_scope
+
+# Configuration
+PREFETCH_PER_MINUTE = 12  # speculative jobs started per minute at most
+PREFETCH_BURST = 3  # jobs that may start back to back after an idle spell
+MAX_QUEUED = 8  # pending jobs kept; the rest of a candidate list is dropped
+IDLE_POLL = 0.05  # seconds between checks for foreground fetches finishing
+
+
+class Prefetcher:
+    """One low-priority background worker that warms caches for likely next requests.
+
+    The budget is deliberately small: a single job at a time, at most
+    PREFETCH_PER_MINUTE of them, and none while a foreground fetch_all is running.
+    schedule() replaces the pending queue, so candidates for a page the user has
+    already left are never fetched.
+    """
+
+    def __init__(self, per_minute=PREFETCH_PER_MINUTE, burst=PREFETCH_BURST, max_queued=MAX_QUEUED):
+        self.max_queued = max_queued
+        self.started = 0
+        self.failed = 0
+        self._limiter = RateLimiter(per_minute / 60.0, burst)
+        self._queue = OrderedDict()  # key -> func
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="prefetcher", daemon=True)
+                self._thread.start()
+
+    def schedule(self, jobs):
+        """Replace the pending queue with jobs, an iterable of (key, func) best first"""
+        with self._lock:
+            self._queue = OrderedDict()
+            for key, func in jobs:
+                if len(self._queue) >= self.max_queued:
+                    break
+                self._queue.setdefault(key, func)
+        self.start()
+        self._wake.set()
+
+    def pending(self):
+        with self._lock:
+            return list(self._queue)
+
+    def _next(self):
+        with self._lock:
+            if not self._queue:
+                return None
+            return self._queue.popitem(last=False)
+
+    def _loop(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            while self.pending():
+                # Foreground fetches go first
+                while in_flight():
+                    time.sleep(IDLE_POLL)
+                self._limiter.acquire()
+                job = self._next()
+                if job is None:
+                    break
+                self.started += 1
+                try:
+                    with page_scope("prefetch"):
+                        job[1]()
+                except Exception:
+                    self.failed += 1
+                    traceback.print_exc()
+
+
+_prefetcher = Prefetcher()
+
+
+def get_prefetcher():
+    """The process-wide prefetcher"""
+    return _prefetcher
@@ -0,0 +1,183 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Configuration
+VALUE_DTYPE = np.float32  # prices and changes; ~7 significant digits, plenty for 2-decimal display
+ROW_DTYPE = np.int32
+PARTIAL_SORT_MIN = 1000  # rows below which top() just sorts everything (cheaper at that size)
+
+_symbol_ids = {}  # symbol -> id, shared by every snapshot in the process
+_symbol_names = []  # id -> symbol
+_symbol_lock = threading.Lock()
+
+
+def intern_symbol(symbol):
+    """Process-wide integer id for symbol (one string object per symbol, however many snapshots)"""
+    symbol_id = _symbol_ids.get(symbol)
+    if symbol_id is None:
+        with _symbol_lock:
+            symbol_id = _symbol_ids.get(symbol)
+            if symbol_id is None:
+                symbol_id = _symbol_ids[symbol] = len(_symbol_names)
+                _symbol_names.append(symbol)
+    return symbol_id
+
+
+def _read_only(array):
+    array.setflags(write=False)
+    return array
+
+
+class QuoteSnapshot:
+    """Immutable columnar table of per-symbol figures, shared read-only by every session.
+
+    Numeric columns are float32 arrays, text columns are integer codes into a
+    tuple of labels and symbols are interned ids. Sessions never copy it: they
+    hold a QuoteView, which is just an array of row numbers.
+    """
+
+    def __init__(self, symbols, values=None, labels=None, columns=None):
+        symbols = list(symbols)
+        self.ids = _read_only(np.array([intern_symbol(s) for s in symbols], dtype=ROW_DTYPE))
+        self._rows = {symbol_id: row for row, symbol_id in enumerate(self.ids.tolist())}
+        self.values = {
+            name: _read_only(np.asarray(pd.to_numeric(pd.Series(column), errors="coerce"), dtype=VALUE_DTYPE))
+            for name, column in (values or {}).items()
+        }
+        self.labels = {}  # name -> (codes, categories)
+        for name, column in (labels or {}).items():
+            codes, categories = pd.factorize(pd.Series(column, dtype=object), use_na_sentinel=False)
+            dtype = np.int16 if len(categories) < np.iinfo(np.int16).max else np.int32
+            self.labels[name] = (_read_only(codes.astype(dtype)), tuple(categories))
+        self.columns = list(columns) if columns is not None else [*self.labels, *self.values]
+
+    @classmethod
+    def from_frame(cls, frame, symbol_column=None, labels=()):
+        """Snapshot of a DataFrame; symbols from symbol_column or the index, `labels` kept as text"""
+        symbols = frame[symbol_column] if symbol_column else frame.index
+        text = [c for c in frame.columns if c in labels or c == symbol_column]
+        return cls(
+            symbols,
+            values={c: frame[c].to_numpy() for c in frame.columns if c not in text},
+            labels={c: frame[c].to_numpy() for c in text},
+            columns=list(frame.columns),
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, symbol):
+        return _symbol_ids.get(symbol) in self._rows
+
+    @property
+    def nbytes(self):
+        return (self.ids.nbytes + sum(v.nbytes for v in self.values.values())
+                + sum(codes.nbytes for codes, _ in self.labels.values()))
+
+    @property
+    def symbols(self):
+        return [_symbol_names[i] for i in self.ids.tolist()]
+
+    def column(self, name, rows=None):
+        """One column (decoded for text columns), for rows or all of them"""
+        if name in self.values:
+            values = self.values[name]
+            return values if rows is None else values[rows]
+        codes, categories = self.labels[name]
+        codes = codes if rows is None else codes[rows]
+        return np.array(categories, dtype=object)[codes] if len(categories) else np.array([], dtype=object)
+
+    def view(self):
+        return QuoteView(self, np.arange(len(self), dtype=ROW_DTYPE))
+
+    def select(self, symbols):
+        """View of the given symbols in the given order, skipping any not in the snapshot"""
+        rows = [self._rows.get(_symbol_ids.get(s)) for s in symbols]
+        return QuoteView(self, np.array([r for r in rows if r is not None], dtype=ROW_DTYPE))
+
+
+class QuoteView:
+    """A subset and ordering of a snapshot's rows; the only per-session state is the row array"""
+
+    def __init__(self, snapshot, rows):
+        self.snapshot = snapshot
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def symbols(self):
+        return [_symbol_names[i] for i in self.snapshot.ids[self.rows].tolist()]
+
+    def column(self, name):
+        return self.snapshot.column(name, self.rows)
+
+    def where(self, name, allowed):
+        """Rows whose text column `name` is one of allowed"""
+        codes, categories = self.snapshot.labels[name]
+        allowed = set(allowed)
+        wanted = [i for i, label in enumerate(categories) if label in allowed]
+        return QuoteView(self.snapshot, self.rows[np.isin(codes[self.rows], wanted)])
+
+    def between(self, name, minimum=None, maximum=None):
+        """Rows whose numeric column `name` lies within [minimum, maximum]; NaN never matches"""
+        values = self.snapshot.values[name][self.rows]
+        keep = ~np.isnan(values)
+        if minimum is not None:
+            keep &= values >= minimum
+        if maximum is not None:
+            keep &= values <= maximum
+        return QuoteView(self.snapshot, self.rows[keep])
+
+    def _keys(self, name, descending):
+        """Ascending sort keys giving the wanted order on a numeric column, NaN last"""
+        values = self.snapshot.values[name][self.rows]
+        return np.where(np.isnan(values), np.inf, -values if descending else values)
+
+    def sort(self, name, descending=True):
+        """Stable sort on a numeric column, NaN last"""
+        keys = self._keys(name, descending)
+        return QuoteView(self.snapshot, self.rows[np.argsort(keys, kind="stable")])
+
+    def top(self, name, k, descending=True, start=0):
+        """The first k rows of sort(name, descending), found by partial selection.
+
+        np.partition finds the k-th best key in O(n); the rows better than it, plus
+        as many of its ties as fit (in row order, as the stable sort would pick
+        them), are the top k, and only those are sorted. Views smaller than
+        PARTIAL_SORT_MIN are fully sorted instead. Rows from `start` on are
+        returned, which makes top(name, stop, start=start) one page.
+        """
+        keys = self._keys(name, descending)
+        k = min(max(k, 0), len(keys))
+        if k == 0:
+            return QuoteView(self.snapshot, self.rows[:0])
+        if k < len(keys) and len(keys) >= PARTIAL_SORT_MIN:
+            # Everything strictly better than the k-th key, then its ties in row order
+            kth = np.partition(keys, k - 1)[k - 1]
+            better = np.flatnonzero(keys < kth)
+            picked = np.concatenate([better, np.flatnonzero(keys == kth)[:k - len(better)]])
+            order = picked[np.argsort(keys[picked], kind="stable")]
+        else:
+            order = np.argsort(keys, kind="stable")[:k]
+        return QuoteView(self.snapshot, self.rows[order[start:]])
+
+    def page(self, start, stop):
+        """Rows start..stop; a slice of the row array, no copy"""
+        return QuoteView(self.snapshot, self.rows[start:stop])
+
+    def head(self, n):
+        return self.page(0, n)
+
+    def frame(self, columns=None, index=False):
+        """Materialize the view as a DataFrame for display (float32 values widened to float64),
+        indexed by symbol when index is set"""
+        columns = columns or self.snapshot.columns
+        data = {}
+        for name in columns:
+            values = self.column(name)
+            data[name] = values.astype(float) if values.dtype == VALUE_DTYPE else values
+        return pd.DataFrame(data, columns=columns, index=self.symbols if index else None)
@@ -0,0 +1,72 @@
+from market_calendar import get_calendar
+from market_data import summarize_symbols
+from reference_store import get_reference_store
+from symbol_master import get_symbol_index
+
+
+def profile(fields):
+    return {"name": fields.get("longName"), "sector": fields.get("sector")}
+
+
+class QuoteSummaryService:
+    """Price, company name and sector for many symbols at once.
+
+    Prices come from one bulk download through the data source stack (live from
+    the bar engine while NSE is open), so they follow the market-hours cache.
+    Name and sector come from the reference store; symbols it does not know yet
+    are fetched concurrently by iter_profiles() and kept there, including the
+    ones Yahoo has no profile for, until they go stale.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or get_reference_store()
+
+    def prices(self, symbols):
+        """{symbol: last price} for every symbol with data, from one bulk request"""
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        prices = summarize_symbols(symbols, market_open=get_calendar().is_open())["Price"]
+        return {symbol: float(price) for symbol, price in prices.items()}
+
+    def cached_profile(self, symbol):
+        """Profile for symbol if the reference store has it, else None (never calls upstream)"""
+        fields = self.store.get(symbol)
+        return profile(fields) if fields else None
+
+    def iter_profiles(self, symbols):
+        """Yield (symbol, profile) for each symbol ({} if there is none), fetching concurrently
+        only the ones the reference store is missing or holds stale"""
+        symbols = list(dict.fromkeys(symbols))
+        stale = self.store.stale(symbols)
+        for symbol in symbols:
+            if symbol not in stale:
+                yield symbol, self.cached_profile(symbol) or {}
+        for symbol, fields in self.store.iter_refresh(stale):
+            yield symbol, profile(fields) if fields else {}
+
+    def summaries(self, symbols):
+        """{symbol: {'price', 'name', 'sector'}} from one price request and the reference store.
+
+        Fields not known yet are None; use iter_profiles() to fill in the missing
+        profiles without holding up the rest.
+        """
+        prices = self.prices(symbols)
+        index = get_symbol_index()
+        summaries = {}
+        for symbol in dict.fromkeys(symbols):
+            known = self.cached_profile(symbol) or {}
+            summaries[symbol] = {
+                "price": prices.get(symbol),
+                "name": known.get("name") or index.name(symbol),
+                "sector": known.get("sector"),
+            }
+        return summaries
+
+
+_service = QuoteSummaryService()
+
+
+def get_quote_summaries():
+    """The process-wide quote summary service shared by every Streamlit session"""
+    return _service
@@ -0,0 +1,151 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import yfinance as yf
+
+from fetch_pool import fetch_iter
+from instrumentation import upstream
+
+# Configuration
+REFERENCE_DB = os.environ.get(
+    "NSE_REFERENCE_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".market_data", "reference.sqlite3")
+)
+REFRESH_SECONDS = 7 * 24 * 60 * 60  # static fields are re-fetched weekly
+# Ticker.info fields that describe the company rather than its price
+STATIC_FIELDS = ["longName", "shortName", "sector", "industry", "fullTimeEmployees", "country",
+                 "longBusinessSummary"]
+
+
+def static_fields(info):
+    """The STATIC_FIELDS present in an info-like dict (missing ones left out, as Yahoo does)"""
+    return {field: info[field] for field in STATIC_FIELDS if info.get(field) is not None}
+
+
+def fetch_reference(symbol):
+    """Static fields of one symbol from Ticker.info"""
+    return static_fields(upstream("yf.info", symbol, lambda: yf.Ticker(symbol).info))
+
+
+class ReferenceStore:
+    """Static per-symbol reference data (name, sector, industry, ...) in a local SQLite
+    table, served from memory.
+
+    The table is read once on first use; reads after that are dict lookups and
+    never touch the network. refresh() re-fetches rows not attempted for
+    REFRESH_SECONDS in bulk and is meant to run on the background refresh
+    scheduler. Each row records when its fields were fetched (updated_at) and
+    when a fetch was last attempted (checked_at), so a failing symbol is retried
+    once per max_age rather than on every refresh.
+    """
+
+    def __init__(self, path=REFERENCE_DB, fetch=fetch_reference, max_age=REFRESH_SECONDS):
+        self.path = path
+        self.fetch = fetch
+        self.max_age = max_age
+        self._rows = None  # symbol -> {field: value}
+        self._checked = {}  # symbol -> epoch seconds of the last fetch attempt
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        db = sqlite3.connect(self.path)
+        db.execute("CREATE TABLE IF NOT EXISTS reference "
+                   f"(symbol TEXT PRIMARY KEY, {', '.join(STATIC_FIELDS)}, updated_at REAL, checked_at REAL)")
+        if "checked_at" not in {column[1] for column in db.execute("PRAGMA table_info(reference)")}:
+            db.execute("ALTER TABLE reference ADD COLUMN checked_at REAL")  # tables made before it existed
+        return db
+
+    def _load(self):
+        if self._rows is None:
+            rows, checked = {}, {}
+            with closing(self._connect()) as db:
+                for symbol, *values, updated_at, checked_at in db.execute(
+                        f"SELECT symbol, {', '.join(STATIC_FIELDS)}, updated_at, checked_at FROM reference"):
+                    rows[symbol] = static_fields(dict(zip(STATIC_FIELDS, values)))
+                    checked[symbol] = max(updated_at or 0, checked_at or 0)
+            self._rows, self._checked = rows, checked
+        return self._rows
+
+    def get(self, symbol, default=None):
+        """Stored fields for symbol (shared, treat as read-only; {} if Yahoo had none), or default"""
+        with self._lock:
+            return self._load().get(symbol, default)
+
+    def __contains__(self, symbol):
+        with self._lock:
+            return symbol in self._load()
+
+    def symbols(self):
+        with self._lock:
+            return list(self._load())
+
+    def stale(self, symbols):
+        """Symbols with no row, or whose last fetch attempt is older than max_age"""
+        cutoff = time.time() - self.max_age
+        with self._lock:
+            self._load()
+            return [s for s in dict.fromkeys(symbols) if self._checked.get(s, 0) < cutoff]
+
+    def put(self, rows):
+        """Store {symbol: info-like dict} (only STATIC_FIELDS are kept) in one transaction"""
+        rows = {symbol: static_fields(fields) for symbol, fields in rows.items()}
+        if not rows:
+            return
+        now = time.time()
+        with self._lock:
+            self._load()
+            with closing(self._connect()) as db, db:
+                db.executemany(
+                    f"INSERT OR REPLACE INTO reference (symbol, {', '.join(STATIC_FIELDS)}, updated_at, checked_at) "
+                    f"VALUES ({', '.join('?' * (len(STATIC_FIELDS) + 3))})",
+                    [(symbol, *(fields.get(f) for f in STATIC_FIELDS), now, now) for symbol, fields in rows.items()]
+                )
+            for symbol, fields in rows.items():
+                self._rows[symbol] = fields
+                self._checked[symbol] = now
+
+    def _mark_checked(self, symbols):
+        """Record a fetch attempt for stored symbols without touching their fields"""
+        now = time.time()
+        with self._lock:
+            self._load()
+            with closing(self._connect()) as db, db:
+                db.executemany("UPDATE reference SET checked_at = ? WHERE symbol = ?",
+                               [(now, symbol) for symbol in symbols])
+            for symbol in symbols:
+                self._checked[symbol] = now
+
+    def iter_refresh(self, symbols):
+        """Fetch the given symbols concurrently, storing and yielding (symbol, fields) as each
+        arrives; fields is None when the fetch failed or Yahoo knows no such company.
+
+        A symbol with no row yet that comes back empty (or fails) is stored as an
+        empty row; a stored row is never replaced by an empty one, only marked as
+        checked. Either way the symbol is not asked for again until it goes stale.
+        """
+        for symbol, fields, error in fetch_iter(self.fetch, dict.fromkeys(symbols)):
+            if error is None and fields.get("longName"):
+                self.put({symbol: fields})
+                yield symbol, self.get(symbol)
+            else:
+                if symbol in self:
+                    self._mark_checked([symbol])
+                else:
+                    self.put({symbol: {}})
+                yield symbol, None
+
+    def refresh(self, symbols=()):
+        """Re-fetch stale rows for the given symbols plus every stored one; returns the count stored"""
+        return sum(1 for _, fields in self.iter_refresh(self.stale([*symbols, *self.symbols()])) if fields)
+
+
+_store = ReferenceStore()
+
+
+def get_reference_store():
+    """The process-wide reference data store"""
+    return _store
@@ -0,0 +1,134 @@
+import threading
+import time
+import traceback
+
+from instrumentation import page_scope
+from market_cache import market_ttl
+
+
+class Snapshot:
+    """Latest result of a refresh job"""
+
+    def __init__(self, value, updated_at, error=None):
+        self.value = value
+        self.updated_at = updated_at
+        self.error = error
+
+    @property
+    def age(self):
+        return time.time() - self.updated_at
+
+
+class RefreshScheduler:
+    """One background thread per server process that re-runs registered loaders on a
+    market-aware schedule and publishes their results as shared snapshots.
+
+    Page scripts call ensure(name, loader): the first caller for a universe runs the
+    loader inline, every later rerun just reads the latest snapshot. Loaders run
+    outside any Streamlit script, so they must not call st.* themselves.
+    """
+
+    def __init__(self, interval=market_ttl, tick=1.0):
+        self.interval = interval
+        self.tick = tick
+        self._jobs = {}  # name -> loader
+        self._intervals = {}  # name -> interval callable, for jobs that override the default
+        self._due = {}  # name -> monotonic time of next run
+        self._snapshots = {}  # name -> Snapshot
+        self._running = {}  # name -> threading.Event while a loader runs
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="refresh-scheduler", daemon=True)
+                self._thread.start()
+
+    def register(self, name, loader, interval=None):
+        """Add or replace the loader for a universe; interval() overrides the default
+        seconds between runs"""
+        with self._lock:
+            self._jobs[name] = loader
+            if interval is not None:
+                self._intervals[name] = interval
+            self._due.setdefault(name, time.monotonic())
+        self.start()
+        self._wake.set()
+
+    def snapshot(self, name):
+        """Latest snapshot for name, or None if it has never loaded"""
+        with self._lock:
+            return self._snapshots.get(name)
+
+    def ensure(self, name, loader, interval=None):
+        """Register loader and return its snapshot, loading inline if there is none yet"""
+        self.register(name, loader, interval)
+        snapshot = self.snapshot(name)
+        if snapshot is None:
+            snapshot = self.refresh_now(name)
+        return snapshot
+
+    def publish(self, name, loader, value):
+        """Register loader and store a value already computed for it (e.g. streamed by a
+        page) as the latest snapshot, so the next scheduled run starts from now"""
+        with self._lock:
+            self._jobs[name] = loader
+            self._snapshots[name] = Snapshot(value, time.time())
+            self._due[name] = time.monotonic() + self._interval(name)
+        self.start()
+
+    def _interval(self, name):
+        return self._intervals.get(name, self.interval)()
+
+    def refresh_now(self, name):
+        """Run name's loader now (or wait for the run already in progress)"""
+        with self._lock:
+            running = self._running.get(name)
+            if running is None:
+                running = self._running[name] = threading.Event()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            running.wait()
+            return self.snapshot(name)
+
+        try:
+            with page_scope(f"refresh:{name}"):
+                value, error = self._jobs[name](), None
+        except Exception as e:
+            traceback.print_exc()
+            value, error = None, e
+
+        with self._lock:
+            previous = self._snapshots.get(name)
+            if error is None or previous is None:
+                self._snapshots[name] = Snapshot(value, time.time(), error)
+            else:
+                # Keep serving the last good data if a refresh fails
+                previous.error = error
+            self._due[name] = time.monotonic() + self._interval(name)
+            del self._running[name]
+        running.set()
+        return self.snapshot(name)
+
+    def _loop(self):
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                due = [name for name, at in self._due.items() if at <= now and name not in self._running]
+            for name in due:
+                self.refresh_now(name)
+            self._wake.wait(self.tick)
+            self._wake.clear()
+
+
+_scheduler = RefreshScheduler()
+
+
+def get_scheduler():
+    """The process-wide refresh scheduler"""
+    return _scheduler
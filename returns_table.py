@@ -0,0 +1,127 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from fetch_pool import fetch_iter
+from history_store import get_store, period_start
+from market_data import STREAM_CHUNK, get_data_source
+
+# Change column -> yfinance period whose first close is the anchor ('max' = inception)
+ANCHOR_PERIODS = {
+    '1W': '1wk',
+    '1M': '1mo',
+    '3M': '3mo',
+    '1Y': '1y',
+    'Max': 'max',
+}
+
+
+class ReturnsTable:
+    """Per-symbol anchor prices for each lookback window, recomputed at most once per new bar.
+
+    Full history is fetched once per symbol into the history store; after that a
+    refresh is one bulk tail download and each change column is an O(1) lookup.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or get_store()
+        self._anchors = {}  # symbol -> {'as_of', 'complete', 'prev_close', '1W', ..., 'Max'}
+        self._lock = threading.Lock()
+
+    def _backfilled(self, symbol):
+        """True if the stored bars hold the symbol's full history (a 'max' fetch that returned
+        bars, and nothing has dropped them since)"""
+        meta = self.store.meta(symbol)
+        bars = self.store.bars(symbol)
+        return (meta.get('since') == 'max' and bars is not None and len(bars) > 0
+                and meta.get('first') == str(bars['date'][0]))
+
+    def _compute_anchors(self, symbol, bars, complete):
+        """Anchor closes for bars; a window reaching back before the first stored bar gets
+        None unless the bars are the complete history (a listing younger than the window)"""
+        dates = bars['date']
+        closes = bars['Close']
+        anchors = {
+            'as_of': dates[-1],
+            'prev_close': float(closes[-2]) if len(bars) > 1 else float(bars['Open'][-1]),
+        }
+        for column, period in ANCHOR_PERIODS.items():
+            start = period_start(period, today=dates[-1].astype(object))
+            if start is None:
+                anchors[column] = float(closes[0]) if complete else None
+            elif np.datetime64(start, 'D') < dates[0] and not complete:
+                anchors[column] = None
+            else:
+                i = int(np.searchsorted(dates, np.datetime64(start, 'D')))
+                anchors[column] = float(closes[min(i, len(bars) - 1)])
+        return anchors
+
+    def refresh(self, symbols):
+        """Bring the stored history and anchors up to date for symbols"""
+        symbols = list(dict.fromkeys(symbols))
+        source = get_data_source()
+
+        # Full-history backfill for symbols never seen before, retried until a 'max'
+        # fetch actually returns their bars
+        missing = [s for s in symbols if not self._backfilled(s)]
+        if missing:
+            self.store.forget_coverage(missing)
+            source.download(missing, period='max')
+        # Latest bars for everything in one bulk request
+        source.download(symbols, period='5d')
+
+        with self._lock:
+            for symbol in symbols:
+                bars = self.store.bars(symbol)
+                if bars is None or len(bars) == 0:
+                    self._anchors.pop(symbol, None)
+                    continue
+                complete = self._backfilled(symbol)
+                cached = self._anchors.get(symbol)
+                if cached is None or cached['as_of'] != bars['date'][-1] or cached['complete'] != complete:
+                    self._anchors[symbol] = self._compute_anchors(symbol, bars, complete)
+                    self._anchors[symbol]['complete'] = complete
+
+    def performance(self, symbols):
+        """Current price, volume and 1D..Max change (%) per symbol as a DataFrame"""
+        symbols = list(symbols)
+        self.refresh(symbols)
+
+        rows = {}
+        for symbol in symbols:
+            anchors = self._anchors.get(symbol)
+            bars = self.store.bars(symbol)
+            if anchors is None or bars is None or len(bars) < 2:
+                continue
+            current_price = float(bars['Close'][-1])
+
+            def change(anchor):
+                return (current_price - anchor) / anchor * 100 if anchor else None
+
+            row = {
+                'Current Price': current_price,
+                'Volume': float(bars['Volume'][-1]),
+                '1D Change (%)': change(anchors['prev_close']),
+            }
+            for column in ANCHOR_PERIODS:
+                row[f'{column} Change (%)'] = change(anchors[column])
+            row['Last Updated'] = str(bars['date'][-1])
+            rows[symbol] = row
+
+        return pd.DataFrame.from_dict(rows, orient='index')
+
+    def iter_performance(self, symbols, chunk_size=STREAM_CHUNK):
+        """performance() over chunks of symbols fetched concurrently, yielding
+        (chunk, frame, error) as each chunk completes"""
+        symbols = list(dict.fromkeys(symbols))
+        chunks = [tuple(symbols[i:i + chunk_size]) for i in range(0, len(symbols), chunk_size)]
+        yield from fetch_iter(self.performance, chunks)
+
+
+_returns_table = ReturnsTable()
+
+
+def get_returns_table():
+    """Process-wide returns table shared by every session"""
+    return _returns_table
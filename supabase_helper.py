@@ -1,5 +1,11 @@
 from supabase import create_client
 import streamlit as st
+import threading
+import time
+
+from instrumentation import BATCH, upstream
+
+WATCHLIST_VERSION_CHECK_SECONDS = 300  # how often a cached watchlist is checked against the table
 
 @st.cache_resource
 def get_supabase_client():
@@ -15,12 +21,108 @@ def sign_in(email, password):
 def sign_up(email, password):
     return supabase.auth.sign_up({"email": email, "password": password})
 
+class WatchlistCache:
+    """Write-through cache of every user's watchlist.
+
+    Mutations are applied locally and then written with a single statement; the
+    cached list is only re-selected when a write fails or when the periodic
+    row-count check finds it out of date.
+    """
+
+    def __init__(self, client, version_check_seconds=WATCHLIST_VERSION_CHECK_SECONDS):
+        self.client = client
+        self.version_check_seconds = version_check_seconds
+        self._lists = {}  # user_id -> list of symbols
+        self._checked_at = {}  # user_id -> monotonic time of last load/check
+        self._lock = threading.Lock()
+
+    def _table(self):
+        return self.client.table("watchlists")
+
+    def _load(self, user_id):
+        result = upstream("supabase.select", BATCH, self._table().select("symbol").eq("user_id", user_id).execute)
+        with self._lock:
+            self._lists[user_id] = [row["symbol"] for row in result.data]
+            self._checked_at[user_id] = time.monotonic()
+            return list(self._lists[user_id])
+
+    def _is_current(self, user_id):
+        """Cheap version check: compare the row count without fetching rows"""
+        result = upstream("supabase.count", BATCH,
+                          self._table().select("symbol", count="exact", head=True).eq("user_id", user_id).execute)
+        with self._lock:
+            current = result.count == len(self._lists.get(user_id, []))
+            if current:
+                self._checked_at[user_id] = time.monotonic()
+            return current
+
+    def get(self, user_id):
+        with self._lock:
+            cached = self._lists.get(user_id)
+            due = time.monotonic() - self._checked_at.get(user_id, 0) > self.version_check_seconds
+            if cached is not None and not due:
+                return list(cached)
+        if cached is not None and self._is_current(user_id):
+            return list(cached)
+        return self._load(user_id)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._lists.pop(user_id, None)
+            self._checked_at.pop(user_id, None)
+
+    def _write(self, user_id, operation, symbols, statement):
+        try:
+            return upstream(operation, symbols[0] if len(symbols) == 1 else BATCH, statement.execute)
+        except Exception:
+            # Local state may now disagree with the table; reconcile before re-raising
+            self.invalidate(user_id)
+            self._load(user_id)
+            raise
+
+    def add_many(self, user_id, symbols):
+        """Add symbols (skipping ones already present) with one multi-row insert"""
+        current = self.get(user_id)
+        new = [symbol for symbol in dict.fromkeys(symbols) if symbol not in current]
+        if not new:
+            return None
+        with self._lock:
+            self._lists.setdefault(user_id, []).extend(new)
+        return self._write(user_id, "supabase.insert", new, self._table().insert([{"user_id": user_id, "symbol": symbol} for symbol in new]))
+
+    def remove_many(self, user_id, symbols):
+        """Remove symbols with one delete ... where symbol in (...)"""
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return None
+        with self._lock:
+            if user_id in self._lists:
+                self._lists[user_id] = [s for s in self._lists[user_id] if s not in symbols]
+        return self._write(user_id, "supabase.delete", symbols, self._table().delete().eq("user_id", user_id).in_("symbol", symbols))
+
+    def add(self, user_id, symbol):
+        return self.add_many(user_id, [symbol])
+
+    def remove(self, user_id, symbol):
+        return self.remove_many(user_id, [symbol])
+
+watchlists = WatchlistCache(supabase)
+
 def add_to_watchlist(user_id, symbol):
-    return supabase.table("watchlists").insert({"user_id": user_id, "symbol": symbol}).execute()
+    return watchlists.add(user_id, symbol)
+
+def add_many_to_watchlist(user_id, symbols):
+    return watchlists.add_many(user_id, symbols)
 
 def get_watchlist(user_id):
-    result = supabase.table("watchlists").select("symbol").eq("user_id", user_id).execute()
-    return [row["symbol"] for row in result.data]
+    return watchlists.get(user_id)
 
 def remove_from_watchlist(user_id, symbol):
-    return supabase.table("watchlists").delete().eq("user_id", user_id).eq("symbol", symbol).execute()
\ No newline at end of file
+    return watchlists.remove(user_id, symbol)
+
+def remove_many_from_watchlist(user_id, symbols):
+    return watchlists.remove_many(user_id, symbols)
+
+def get_all_watchlist_symbols():
+    result = upstream("supabase.select", BATCH, supabase.table("watchlists").select("symbol").execute)
+    return sorted({row["symbol"] for row in result.data})
\ No newline at end of file
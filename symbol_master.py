@@ -0,0 +1,222 @@
+import bisect
+import csv
+import os
+import threading
+from collections import Counter, defaultdict
+
+from nse_lists import SYMBOL_LISTS, downloaded
+
+# Configuration
+SYMBOLS_CSV = os.environ.get(
+    "NSE_SYMBOLS_CSV",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "nse_symbols.csv")
+)
+DEFAULT_LIMIT = 12
+MIN_QUERY = 2  # shorter queries return nothing
+FUZZY_MIN_QUERY = 4  # typo matching only kicks in from this length
+FUZZY_CANDIDATES = 32  # tokens sharing the most trigrams that get an edit-distance check
+
+# Match tiers, best first
+EXACT, PREFIX, SUBSTRING, FUZZY = range(4)
+
+
+def load_symbols(path=SYMBOLS_CSV, kind=None):
+    """Rows of (symbol, name, type, popularity) from the bundled symbol master.
+
+    Also reads NSE's own EQUITY_L.csv (SYMBOL, NAME OF COMPANY, SERIES) and ETF
+    list (Symbol, SecurityName) exports as-is; kind overrides every row's type.
+    """
+    rows = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            row = {key.strip().lower(): (value or "").strip() for key, value in row.items() if key}
+            symbol = row.get("symbol", "")
+            if not symbol:
+                continue
+            if "." not in symbol:
+                symbol += ".NS"
+            name = row.get("name") or row.get("name of company") or row.get("securityname") or symbol
+            try:
+                popularity = float(row.get("popularity") or 0)
+            except ValueError:
+                popularity = 0.0
+            rows.append((symbol, name, kind or row.get("type") or row.get("series") or "EQ", popularity))
+    return rows
+
+
+def load_symbol_master(path=SYMBOLS_CSV):
+    """The bundled symbol master brought up to date with NSE's equity and ETF lists.
+
+    Once a list has been downloaded (see nse_lists) it is authoritative for its
+    kind of security: new listings are added, symbols it no longer has are
+    dropped as delisted and names follow NSE's. Popularity comes from the
+    bundled file (0 for symbols it doesn't know).
+    """
+    bundled = load_symbols(path)
+    popularity = {symbol: rank for symbol, _, _, rank in bundled}
+    listed = {}
+    replaced = set()  # True for ETFs, False for equities
+    for name in SYMBOL_LISTS:
+        list_file = downloaded(name)
+        if list_file is None:
+            continue
+        etf = name == "etfs"
+        replaced.add(etf)
+        for symbol, company, kind, _ in load_symbols(list_file, kind="ETF" if etf else None):
+            listed[symbol] = (symbol, company, kind, popularity.get(symbol, 0.0))
+
+    rows = [listed.get(row[0], row) for row in bundled
+            if (row[2] == "ETF") not in replaced or row[0] in listed]
+    known = {row[0] for row in rows}
+    rows += [row for symbol, row in listed.items() if symbol not in known]
+    return rows
+
+
+def _normalize(text):
+    text = text.strip().lower()
+    return text[:-3] if text.endswith(".ns") else text
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _within(a, b, limit):
+    """True if the edit distance between a and b is at most limit"""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+class SymbolIndex:
+    """Prebuilt search index over the symbol master.
+
+    Prefix matches come from a sorted token list (bisect), substring matches from
+    a trigram index over "symbol name", and typo-tolerant matches from trigram
+    candidates checked with a bounded edit distance (only when nothing matched
+    literally). Results are ranked by match tier, then popularity.
+    """
+
+    def __init__(self, rows):
+        self.entries = []  # (symbol, name, type, popularity)
+        self._ids = {}  # symbol -> entry id
+        self._bases = {}  # "reliance" -> entry id
+        self._texts = []  # "reliance reliance industries limited" per entry
+        prefix = []  # (token, entry id)
+        self._grams = defaultdict(set)  # trigram -> entry ids
+        self._tokens = defaultdict(set)  # token -> entry ids
+        self._token_grams = defaultdict(set)  # padded trigram -> tokens
+
+        for symbol, name, kind, popularity in rows:
+            if symbol in self._ids:
+                continue
+            i = len(self.entries)
+            self.entries.append((symbol, name, kind, popularity))
+            self._ids[symbol] = i
+            base = _normalize(symbol)
+            self._bases[base] = i
+            text = f"{base} {name.lower()}"
+            self._texts.append(text)
+            for gram in _trigrams(text):
+                self._grams[gram].add(i)
+            tokens = {base, name.lower(), *name.lower().replace("(", " ").replace(")", " ").split()}
+            for token in tokens:
+                prefix.append((token, i))
+                self._tokens[token].add(i)
+                for gram in _trigrams(f" {token} "):
+                    self._token_grams[gram].add(token)
+
+        prefix.sort()
+        self._prefix_tokens = [token for token, _ in prefix]
+        self._prefix_ids = [i for _, i in prefix]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, symbol):
+        return symbol in self._ids
+
+    def name(self, symbol, default=None):
+        i = self._ids.get(symbol)
+        return self.entries[i][1] if i is not None else default
+
+    def _prefix(self, query):
+        start = bisect.bisect_left(self._prefix_tokens, query)
+        end = bisect.bisect_right(self._prefix_tokens, query + "￿", start)
+        return self._prefix_ids[start:end]
+
+    def _substring(self, query):
+        grams = _trigrams(query)
+        if not grams:
+            return []
+        postings = sorted((self._grams.get(gram, set()) for gram in grams), key=len)
+        candidates = set.intersection(*postings)
+        return [i for i in candidates if query in self._texts[i]]
+
+    def _fuzzy(self, query):
+        grams = _trigrams(f" {query} ")
+        shared = Counter(token for gram in grams for token in self._token_grams.get(gram, ()))
+        limit = 1 if len(query) < 7 else 2
+        needed = max(1, len(grams) - 3 * limit)
+        matches = set()
+        for token, count in shared.most_common(FUZZY_CANDIDATES):
+            if count < needed:
+                break
+            if _within(query, token, limit) or (len(query) >= 5 and _within(query, token[:len(query)], limit)):
+                matches.update(self._tokens[token])
+        return matches
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """{symbol: name} for the best matches of query, best first"""
+        query = _normalize(query)
+        if len(query) < MIN_QUERY:
+            return {}
+
+        tiers = {}
+
+        def add(ids, tier):
+            for i in ids:
+                if tier < tiers.get(i, FUZZY + 1):
+                    tiers[i] = tier
+
+        if query in self._bases:
+            add([self._bases[query]], EXACT)
+        add(self._prefix(query), PREFIX)
+        add(self._substring(query), SUBSTRING)
+        if not tiers and len(query) >= FUZZY_MIN_QUERY:
+            add(self._fuzzy(query), FUZZY)
+
+        ranked = sorted(tiers, key=lambda i: (tiers[i], -self.entries[i][3], self.entries[i][0]))
+        return {self.entries[i][0]: self.entries[i][1] for i in ranked[:limit]}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_symbol_index():
+    """The process-wide symbol index, built from the symbol master on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SymbolIndex(load_symbol_master())
+    return _index
+
+
+def reload_symbol_index():
+    """Rebuild the process-wide index (after NSE's lists were downloaded again); searches
+    keep using the old one until the new one is ready"""
+    global _index
+    index = SymbolIndex(load_symbol_master())
+    with _index_lock:
+        _index = index
+    return index
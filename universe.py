@@ -0,0 +1,181 @@
+import csv
+import os
+import threading
+from collections import namedtuple
+
+from analytics import compute_frame_metrics
+from market_cache import market_ttl
+from market_data import fetch_history
+from nse_lists import LISTS, LISTS_DIR, SYMBOL_LISTS, downloaded, refresh_lists
+from quote_snapshot import QuoteSnapshot
+from refresh_scheduler import get_scheduler
+from symbol_master import reload_symbol_index
+
+# Configuration
+UNIVERSE_CSV = os.environ.get(
+    "NSE_UNIVERSE_CSV",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "universe.csv")
+)
+CONSTITUENTS_DIR = os.environ.get(
+    "NSE_CONSTITUENTS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "constituents")
+)
+# Index tag -> constituent file in CONSTITUENTS_DIR (NSE's download names), smallest index
+# first. A list downloaded from NSE (see nse_lists) takes precedence over the bundled copy,
+# so an index without one is enabled by the first list refresh.
+CONSTITUENT_FILES = {
+    "nifty50": "ind_nifty50list.csv",
+    "nifty100": "ind_nifty100list.csv",
+    "nifty200": "ind_nifty200list.csv",
+    "nifty500": "ind_nifty500list.csv",
+}
+MARKET_TAGS = {"index", "commodity", "crypto", "currency"}  # instruments the market loader covers
+MARKET_PERIOD = "3mo"  # enough history for every page's Day/Week/Month columns
+
+# One catalogue entry; `label` is the decorated display name (defaults to name),
+# `group` the heading it is listed under and `aum` only set for ETFs (₹ Cr)
+Instrument = namedtuple("Instrument", "symbol name label group tags aum")
+
+
+def _add(instruments, instrument):
+    """Add instrument, or merge its tags into the entry already listed for its symbol"""
+    known = instruments.get(instrument.symbol)
+    if known is None:
+        instruments[instrument.symbol] = instrument
+    else:
+        instruments[instrument.symbol] = known._replace(tags=known.tags | instrument.tags)
+
+
+def load_constituents(path, tag):
+    """Instruments of one index from a constituent file, tagged (tag, 'equity', 'constituent').
+
+    Reads NSE's own index list format (Company Name, Industry, Symbol, Series), so
+    a list downloaded from NSE can be used as-is; the industry becomes the
+    instrument's group.
+    """
+    tags = frozenset((tag, "equity", "constituent"))
+    instruments = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            row = {key.strip().lower(): (value or "").strip() for key, value in row.items() if key}
+            symbol = row.get("symbol", "")
+            if not symbol or row.get("series", "EQ") != "EQ":
+                continue
+            if "." not in symbol:
+                symbol += ".NS"
+            name = row.get("company name") or symbol
+            instruments.append(Instrument(symbol, name, name, row.get("industry", ""), tags, None))
+    return instruments
+
+
+def load_universe(path=UNIVERSE_CSV, constituents_dir=CONSTITUENTS_DIR, lists_dir=LISTS_DIR):
+    """Instruments from the bundled catalogue and constituent files, one per symbol.
+
+    A symbol listed more than once keeps its first row and gains the tags of
+    every later one, so overlapping lists (a Nifty 50 name is also in the
+    Nifty 100, 200 and 500) can be appended as-is.
+    """
+    instruments = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            row = {key: (value or "").strip() for key, value in row.items()}
+            symbol = row["symbol"]
+            tags = frozenset(tag.strip() for tag in row.get("tags", "").split(";") if tag.strip())
+            name = row.get("name") or symbol
+            aum = float(row["aum"]) if row.get("aum") else None
+            _add(instruments, Instrument(symbol, name, row.get("label") or name, row.get("group", ""), tags, aum))
+    for tag, filename in CONSTITUENT_FILES.items():
+        path = downloaded(tag, lists_dir) or os.path.join(constituents_dir, filename)
+        if os.path.exists(path):
+            for instrument in load_constituents(path, tag):
+                _add(instruments, instrument)
+    return list(instruments.values())
+
+
+class Universe:
+    """The symbol catalogue every page draws its lists from"""
+
+    def __init__(self, instruments):
+        self.instruments = list(instruments)
+        self._by_symbol = {i.symbol: i for i in self.instruments}
+
+    def __len__(self):
+        return len(self.instruments)
+
+    def __iter__(self):
+        return iter(self.instruments)
+
+    def __contains__(self, symbol):
+        return symbol in self._by_symbol
+
+    def get(self, symbol, default=None):
+        return self._by_symbol.get(symbol, default)
+
+    def tagged(self, *tags):
+        """Instruments carrying every one of tags, in catalogue order"""
+        return [i for i in self.instruments if i.tags.issuperset(tags)]
+
+    def symbols(self, *tags):
+        return [i.symbol for i in self.tagged(*tags)]
+
+    def names(self, *tags):
+        """{name: symbol} for the tagged instruments, in catalogue order"""
+        return {i.name: i.symbol for i in self.tagged(*tags)}
+
+
+_universe = None
+_universe_lock = threading.Lock()
+
+
+def get_universe():
+    """The process-wide universe, built from UNIVERSE_CSV on first use"""
+    global _universe
+    if _universe is None:
+        with _universe_lock:
+            if _universe is None:
+                _universe = Universe(load_universe())
+    return _universe
+
+
+def reload_universe():
+    """Rebuild the process-wide universe (after NSE's lists were downloaded again); pages
+    keep using the old one until the new one is ready"""
+    global _universe
+    universe = Universe(load_universe())
+    with _universe_lock:
+        _universe = universe
+    return universe
+
+
+def refresh_nse_lists():
+    """Download NSE's security and index lists when stale, rebuilding the search index and
+    the universe from the ones that changed (runs on the background refresh scheduler)"""
+    refreshed, errors = refresh_lists(LISTS)
+    if set(refreshed) & set(SYMBOL_LISTS):
+        reload_symbol_index()
+    if set(refreshed) - set(SYMBOL_LISTS):
+        reload_universe()
+    if errors:
+        raise RuntimeError(f"Could not download NSE lists: {errors}")
+    return refreshed
+
+
+def market_symbols():
+    return [i.symbol for i in get_universe() if i.tags & MARKET_TAGS]
+
+
+def market_quotes_ttl():
+    """Seconds between market loader runs: the lifetime of its shortest-lived instrument"""
+    return min(market_ttl(symbol) for symbol in market_symbols())
+
+
+def build_market_quotes():
+    """Metrics for every market instrument from one bulk download (runs on the background
+    refresh scheduler)"""
+    symbols = market_symbols()
+    return QuoteSnapshot.from_frame(compute_frame_metrics(fetch_history(symbols, period=MARKET_PERIOD)))
+
+
+def get_market_quotes():
+    """Latest snapshot of the market instruments, loaded once per refresh cycle for every page"""
+    return get_scheduler().ensure("markets", build_market_quotes, market_quotes_ttl)